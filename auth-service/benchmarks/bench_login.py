@@ -0,0 +1,119 @@
+"""Пропускная способность логина и задержка /me под волной логинов.
+
+Поднимает uvicorn с auth-service на временной SQLite, регистрирует
+пользователя и одновременно:
+
+- --logins клиентов без пауз шлют POST /api/auth/login;
+- --me-clients клиентов без пауз шлют GET /api/auth/me с готовым токеном.
+
+Режимы:
+
+- `inline` — как до пула: bcrypt в threadpool процесса сервиса, без лимита
+  очереди (PASSWORD_HASH_WORKERS=0);
+- `pool` — bcrypt в пуле из --workers процессов, очередь не больше
+  --max-pending, сверх неё — 503.
+
+Rate limiting отключается (RATELIMIT_ENABLED=false).
+
+    python benchmarks/bench_login.py --duration 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EMAIL, PASSWORD = "bench@example.com", "bench-password"
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(base: str, duration: float, logins: int, me_clients: int) -> dict:
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=httpx.Limits(max_connections=None)) as client:
+        await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        token = (await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        deadline = time.perf_counter() + duration
+        statuses: dict[int, int] = {}
+        login_latencies: list[float] = []
+        me_latencies: list[float] = []
+
+        async def login_worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    login_latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    # Клиент получил 503 — повторяет не сразу, как по Retry-After
+                    await asyncio.sleep(0.1)
+
+        async def me_worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/auth/me", headers=headers)
+                assert response.status_code == 200, response.status_code
+                me_latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(logins)), *(me_worker() for _ in range(me_clients)))
+        elapsed = time.perf_counter() - started
+    return {
+        "logins/s": statuses.get(200, 0) / elapsed,
+        "503": statuses.get(503, 0),
+        "login p50": statistics.median(login_latencies) if login_latencies else float("nan"),
+        "me/s": len(me_latencies) / elapsed,
+        "me p50": statistics.median(me_latencies),
+        "me p99": percentile(me_latencies, 0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--me-clients", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    modes = {
+        "inline": {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_MAX_PENDING": "1000000"},
+        "pool": {"PASSWORD_HASH_WORKERS": str(args.workers), "PASSWORD_HASH_MAX_PENDING": str(args.max_pending)},
+    }
+    print(f"logins={args.logins} me_clients={args.me_clients} duration={args.duration}s")
+    print(f"{'mode':>7} | {'logins/s':>8} | {'503':>5} | {'login p50, ms':>13} | {'me/s':>6} | {'me p50, ms':>10} | {'me p99, ms':>10}")
+    print("-" * 80)
+    for mode, env in modes.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(args.port),
+                 "--log-level", "warning", "--no-access-log"],
+                cwd=SERVICE_ROOT,
+                env={**os.environ, **env, "LOG_LEVEL": "WARNING", "RATELIMIT_ENABLED": "false",
+                     "JWT_EPHEMERAL_KEY": "true", "DATABASE_URL": f"sqlite:///{tmp}/auth.db"},
+            )
+            try:
+                time.sleep(4)
+                r = asyncio.run(run(f"http://127.0.0.1:{args.port}", args.duration, args.logins, args.me_clients))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{mode:>7} | {r['logins/s']:>8.1f} | {r['503']:>5} | {r['login p50']:>13.0f} | "
+              f"{r['me/s']:>6.0f} | {r['me p50']:>10.1f} | {r['me p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,13 @@ class RegisterUser:
         self.repo = repo
         self.hasher = hasher
 
-    def execute(self, email: str, password: str) -> User:
+    def validate(self, email: str) -> None:
         if "@" not in email:
             raise ValueError("Invalid email")
         if self.repo.get_by_email(email):
             raise ValueError("Email already registered")
+
+    def execute(self, email: str, password: str) -> User:
+        self.validate(email)
         pwd_hash = self.hasher.hash(password)
         return self.repo.create(email, pwd_hash)
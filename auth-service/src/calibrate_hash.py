@@ -0,0 +1,87 @@
+"""Подбор стоимости хэширования паролей под целевое время проверки на этой машине.
+
+Для bcrypt_sha256 перебирает rounds (каждый шаг удваивает время), для argon2 —
+time_cost при заданной памяти, и выбирает самый дорогой вариант, проверка
+которого укладывается в --target-ms (медиана по --samples замерам). Печатает
+переменные окружения для .env; после смены профиля старые хэши пересчитываются
+при следующем логине пользователя.
+
+Запускать на железе сервиса (в контейнере) без нагрузки:
+
+    python -m src.calibrate_hash --target-ms 250
+    python -m src.calibrate_hash --scheme argon2 --memory-kib 65536 --target-ms 250
+"""
+import argparse
+import statistics
+import time
+
+from .config import settings
+from .infrastructure.security import HASH_SCHEMES, build_context
+
+PASSWORD = "calibration-password"
+
+
+def verify_ms(scheme: str, samples: int, **cost: int) -> float:
+    """Медиана времени verify, ms, для хэша с заданной стоимостью"""
+    ctx = build_context(scheme, **cost)
+    hashed = ctx.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        ctx.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> list[str]:
+    best = None
+    for rounds in range(4, 32):
+        elapsed = verify_ms("bcrypt_sha256", samples, bcrypt_rounds=rounds)
+        print(f"  rounds={rounds:<2} {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    if best is None:
+        raise SystemExit("even rounds=4 exceeds the target")
+    return ["PASSWORD_HASH_SCHEME=bcrypt_sha256", f"PASSWORD_BCRYPT_ROUNDS={best}"]
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_kib: int, parallelism: int) -> list[str]:
+    best = None
+    for time_cost in range(1, 65):
+        elapsed = verify_ms("argon2", samples, argon2_memory_kib=memory_kib,
+                            argon2_time_cost=time_cost, argon2_parallelism=parallelism)
+        print(f"  time_cost={time_cost:<2} {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    if best is None:
+        raise SystemExit(f"even time_cost=1 exceeds the target, lower --memory-kib (now {memory_kib})")
+    return [
+        "PASSWORD_HASH_SCHEME=argon2",
+        f"PASSWORD_ARGON2_MEMORY_KIB={memory_kib}",
+        f"PASSWORD_ARGON2_TIME_COST={best}",
+        f"PASSWORD_ARGON2_PARALLELISM={parallelism}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", choices=HASH_SCHEMES, default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-kib", type=int, default=settings.PASSWORD_ARGON2_MEMORY_KIB)
+    parser.add_argument("--parallelism", type=int, default=settings.PASSWORD_ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    print(f"{args.scheme}, target {args.target_ms:.0f} ms per verify")
+    if args.scheme == "argon2":
+        lines = calibrate_argon2(args.target_ms, args.samples, args.memory_kib, args.parallelism)
+    else:
+        lines = calibrate_bcrypt(args.target_ms, args.samples)
+    print()
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
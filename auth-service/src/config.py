@@ -4,10 +4,35 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./auth.db"
     REDIS_URL: str = "redis://localhost:6379/1"
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # seconds; недоступный Redis не должен тормозить /me дольше этого
     SECRET_KEY: str = "dev-secret-auth"
-    JWT_ALGORITHM: str = "HS256"
+    # RS256/ES256 — подпись ключом из JWT_PRIVATE_KEY_FILE, ключи проверки публикуются в /.well-known/jwks.json;
+    # HS256 — общий SECRET_KEY, как раньше (сервисам нужен тот же SECRET_KEY вместо JWT_JWKS_URL)
+    JWT_ALGORITHM: str = "RS256"
+    JWT_PRIVATE_KEY_FILE: str = ""  # PEM; без него сервис не стартует, если не разрешён JWT_EPHEMERAL_KEY
+    # Временный ключ процесса вместо файла: каждый рестарт обесценивает все выданные токены (разработка, тесты)
+    JWT_EPHEMERAL_KEY: bool = False
+    JWT_RETIRED_KEY_FILES: str = ""  # PEM прежних ключей через запятую: остаются в JWKS, пока живут их токены
+    JWKS_MAX_AGE: int = 300  # seconds, Cache-Control ответа JWKS
     LOG_LEVEL: str = "INFO"
+    JSON_BACKEND: str = "auto"  # auto | orjson | msgspec | json — сериализатор кэша и HTTP-ответов
     RATE_LIMIT_PER_MINUTE: int = 60
+    # bcrypt в отдельных процессах; 0 — в threadpool процесса сервиса
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16  # хэширований в работе и в очереди; сверх — сразу 503
+    PASSWORD_HASH_NICENESS: int = 10  # nice воркеров пула: CPU сначала остальным запросам
+    # Кэш профиля для /api/auth/me: L1 в процессе + Redis
+    PROFILE_CACHE_TTL: int = 300  # seconds в Redis; предел устаревания при изменениях мимо UserRepository
+    PROFILE_LOCAL_CACHE_TTL: int = 10  # seconds; предел устаревания L1, если сообщение pub/sub потерялось
+    PROFILE_LOCAL_CACHE_MAXSIZE: int = 10000
+    PROFILE_INVALIDATION_CHANNEL: str = "auth:profile:invalidate"
+    # Профиль хэширования: новые хэши — в PASSWORD_HASH_SCHEME с этими параметрами, хэши с другой
+    # схемой или стоимостью пересчитываются при следующем логине. Подбор: python -m src.calibrate_hash
+    PASSWORD_HASH_SCHEME: str = "bcrypt_sha256"  # bcrypt_sha256 | argon2 (argon2id)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # log2 числа итераций
+    PASSWORD_ARGON2_MEMORY_KIB: int = 65536
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_PARALLELISM: int = 1  # воркер пула — один процесс, потоки argon2 делят с ним CPU
     
     class Config:
         env_file = ".env"
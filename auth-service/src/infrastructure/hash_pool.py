@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import structlog
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+logger = structlog.get_logger()
+
+
+class HashPoolOverloaded(Exception):
+    """В работе и в очереди уже max_pending хэширований паролей"""
+
+
+def _init_worker(niceness: int) -> None:
+    # Ниже приоритет — ядро отдаёт CPU процессу сервиса (/health, /me) раньше, чем bcrypt
+    if niceness:
+        os.nice(niceness)
+
+
+def _ready() -> None:
+    """Пустая задача: пул поднимает процесс заранее, а не на первом логине"""
+
+
+class HashPool:
+    """Процессы для bcrypt: хэширование не занимает threadpool и CPU event loop сервиса.
+
+    Задачи сверх max_pending (выполняемые плюс ожидающие) отклоняются сразу:
+    под волной логинов клиент быстро получает 503, а не ждёт в растущей очереди,
+    и /health, /me продолжают отвечать.
+    """
+
+    def __init__(self, workers: int, max_pending: int, niceness: int = 0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.niceness = niceness
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # spawn: fork процесса с потоками и запущенным event loop небезопасен
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.niceness,),
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_ready)
+        logger.info("Password hash pool started", workers=self.workers, max_pending=self.max_pending)
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            raise HashPoolOverloaded()
+        self.pending += 1
+        try:
+            if self._executor is None:
+                # Пул не запущен (PASSWORD_HASH_WORKERS=0, тесты без startup) — считаем в threadpool
+                return await run_in_threadpool(fn, *args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            except BrokenProcessPool:
+                # Воркер упал (например, OOM killer) — пул больше не принимает задачи, пересоздаём
+                logger.error("Password hash pool is broken, restarting")
+                self.stop()
+                self.start()
+                raise
+        finally:
+            self.pending -= 1
+
+
+hash_pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING,
+                     settings.PASSWORD_HASH_NICENESS)
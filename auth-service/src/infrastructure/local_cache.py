@@ -0,0 +1,88 @@
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Any
+
+
+class LocalCache:
+    """In-process LRU кэш (L1) с ограничением по размеру и TTL.
+
+    Хранит уже декодированные значения, поэтому попадание в L1 не требует
+    ни обращения к Redis, ни json.loads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Растёт при каждом удалении: по нему set_if_unchanged узнаёт, что
+        # между чтением из Redis и записью в L1 прошла инвалидация
+        self._epoch = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def set_if_unchanged(self, key: str, value: Any, epoch: int, ttl: Optional[float] = None) -> bool:
+        """set, если с момента чтения epoch ничего не удалялось.
+
+        Значение, прочитанное из Redis до инвалидации, иначе легло бы в L1
+        уже после неё и жило бы до истечения TTL.
+        """
+        if self.maxsize <= 0:
+            return False
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            if self._epoch != epoch:
+                return False
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Удалить ключи по glob-паттерну (тот же синтаксис, что у Redis KEYS)"""
+        with self._lock:
+            self._epoch += 1
+            keys = [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
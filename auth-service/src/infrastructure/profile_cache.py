@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Optional
+
+import redis
+import redis.asyncio as aioredis
+import structlog
+
+from ..config import settings
+from .local_cache import LocalCache
+from .serialization import dumps, loads
+
+logger = structlog.get_logger()
+
+# Профиль пользователя для /api/auth/me: L1 в процессе, L2 в Redis (REDIS_URL).
+# Запись удаляется при смене роли или активности через UserRepository.update_profile
+# (PATCH /api/auth/users/{id}): из Redis и, через pub/sub PROFILE_INVALIDATION_CHANNEL,
+# из L1 всех реплик. Изменения мимо репозитория (SQL руками) видны не позже PROFILE_CACHE_TTL.
+local_cache = LocalCache(settings.PROFILE_LOCAL_CACHE_MAXSIZE, settings.PROFILE_LOCAL_CACHE_TTL)
+
+_redis_client: Optional[redis.Redis] = None
+_listener_thread: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+# Асинхронный клиент привязан к event loop, поэтому храним по одному на loop
+_async_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def profile_key(email: str) -> str:
+    return f"auth:profile:{email}"
+
+
+def _version_key(email: str) -> str:
+    # Растёт при каждой инвалидации: профиль, прочитанный из БД до неё, в Redis не пишется
+    return f"auth:profile:{email}:ver"
+
+
+# Записать профиль, только если версия не менялась с момента промаха
+_SET_IF_VERSION_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '') == ARGV[1] then
+    redis.call('setex', KEYS[1], ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def get_redis() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                                             socket_timeout=settings.REDIS_SOCKET_TIMEOUT)
+    return _redis_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                                         socket_timeout=settings.REDIS_SOCKET_TIMEOUT)
+        _async_redis_clients[loop] = client
+    return client
+
+
+async def close_async_redis() -> None:
+    client = _async_redis_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aget_profile(email: str, load: Callable[[], Awaitable[Optional[dict[str, Any]]]]) -> Optional[dict[str, Any]]:
+    """Профиль из L1, затем из Redis, иначе load() из БД; None — пользователя нет.
+
+    Загруженный профиль кладётся в кэш, только если за время загрузки его не
+    инвалидировали: иначе роль до PATCH вернулась бы в Redis на PROFILE_CACHE_TTL.
+    """
+    key = profile_key(email)
+    profile = local_cache.get(key)
+    if profile is not None:
+        return profile
+    epoch = local_cache.epoch
+    client = None
+    try:
+        client = get_async_redis()
+        raw, version = await client.mget(key, _version_key(email))
+    except Exception:
+        # Redis недоступен — профиль читается из БД
+        client, raw, version = None, None, None
+    if raw is not None:
+        profile = loads(raw)
+        local_cache.set_if_unchanged(key, profile, epoch)
+        return profile
+    profile = await load()
+    if profile is None:
+        return None
+    local_cache.set_if_unchanged(key, profile, epoch)
+    if client is not None:
+        try:
+            await client.eval(_SET_IF_VERSION_SCRIPT, 2, key, _version_key(email),
+                              version.decode() if version else "", settings.PROFILE_CACHE_TTL, dumps(profile))
+        except Exception:
+            pass
+    return profile
+
+
+def invalidate_profile(email: str) -> None:
+    """Удалить профиль из Redis и из L1 всех реплик"""
+    key = profile_key(email)
+    local_cache.delete(key)
+    try:
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.incr(_version_key(email))
+        # Версия нужна, пока идут промахи, начатые до инвалидации; без ключа запись тоже отклоняется
+        pipe.expire(_version_key(email), settings.PROFILE_CACHE_TTL)
+        pipe.delete(key)
+        pipe.publish(settings.PROFILE_INVALIDATION_CHANNEL, key)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Profile cache invalidation failed", key=key, error=str(e))
+
+
+def _listen_invalidations() -> None:
+    """Слушает канал инвалидации профилей и чистит L1; переподключается при обрыве связи с Redis"""
+    backoff = 1.0
+    while not _listener_stop.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(settings.PROFILE_INVALIDATION_CHANNEL)
+            # Пока не было подписки, могли пропустить инвалидации
+            local_cache.clear()
+            backoff = 1.0
+            while not _listener_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    data = message["data"]
+                    local_cache.delete(data.decode() if isinstance(data, bytes) else data)
+        except Exception as e:
+            logger.warning("Profile invalidation listener error", error=str(e))
+            local_cache.clear()
+            _listener_stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_invalidation_listener() -> None:
+    """Запустить фоновый поток подписки на инвалидации профилей"""
+    global _listener_thread
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen_invalidations, name="profile-invalidation-listener", daemon=True)
+    _listener_thread.start()
+
+
+def stop_invalidation_listener(timeout: float = 2.0) -> None:
+    global _listener_thread
+    _listener_stop.set()
+    if _listener_thread is not None:
+        _listener_thread.join(timeout)
+        _listener_thread = None
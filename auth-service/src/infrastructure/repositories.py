@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from .models import UserORM
+from .profile_cache import invalidate_profile
 from ..domain.entities import User
 from ..application.use_cases.register_user import IUserRepository
 
@@ -17,3 +18,25 @@ class UserRepository(IUserRepository):
         row = UserORM(email=email, password_hash=password_hash, role=role)
         self.db.add(row); self.db.commit(); self.db.refresh(row)
         return to_domain(row)
+
+    def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Заменить хэш, если его не сменили параллельно (смена пароля важнее рехэша)"""
+        updated = (
+            self.db.query(UserORM)
+            .filter(UserORM.id == user_id, UserORM.password_hash == old_hash)
+            .update({UserORM.password_hash: new_hash}, synchronize_session=False)
+        )
+        self.db.commit()
+        return bool(updated)
+
+    def update_profile(self, user_id: int, role: str | None = None, is_active: bool | None = None) -> User | None:
+        """Сменить роль и/или активность; None — поле не меняется. Кэш профиля сбрасывается"""
+        row = self.db.get(UserORM, user_id)
+        if row is None:
+            return None
+        if role is not None: row.role = role
+        if is_active is not None: row.is_active = is_active
+        self.db.commit()
+        # После коммита: иначе /me успеет закэшировать старое значение заново
+        invalidate_profile(row.email)
+        return to_domain(row)
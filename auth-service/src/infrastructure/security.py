@@ -2,27 +2,88 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from ..config import settings
+from .hash_pool import hash_pool
+from .signing_keys import ASYMMETRIC_ALGORITHMS, get_key_set
 
-pwd = CryptContext(
-    schemes=["bcrypt_sha256"],
-    deprecated="auto",
-    bcrypt_sha256__truncate_error=False,
-)
+HASH_SCHEMES = ("bcrypt_sha256", "argon2")
+
+
+def build_context(
+    scheme: str = settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_memory_kib: int = settings.PASSWORD_ARGON2_MEMORY_KIB,
+    argon2_time_cost: int = settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_parallelism: int = settings.PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    """Контекст с профилем: хэширует в scheme, проверяет все HASH_SCHEMES.
+
+    Хэши другой схемы или с другой стоимостью (min = max = заданной) считаются
+    устаревшими — verify_and_update возвращает для них новый хэш.
+    """
+    if scheme not in HASH_SCHEMES:
+        raise ValueError(f"unknown password hash scheme {scheme!r}")
+    return CryptContext(
+        schemes=[scheme, *(s for s in HASH_SCHEMES if s != scheme)],
+        deprecated="auto",
+        bcrypt_sha256__truncate_error=False,
+        bcrypt_sha256__default_rounds=bcrypt_rounds,
+        bcrypt_sha256__min_rounds=bcrypt_rounds,
+        bcrypt_sha256__max_rounds=bcrypt_rounds,
+        argon2__memory_cost=argon2_memory_kib,
+        argon2__default_rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__max_rounds=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd = build_context()
+
+# Функции уровня модуля: их вызывают воркеры пула по имени (pickle)
+def hash_password(plain: str) -> str: return pwd.hash(plain)
+def verify_password(plain: str, hashed: str) -> bool: return pwd.verify(plain, hashed)
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """(пароль верен, новый хэш или None); новый хэш — если текущий не по профилю"""
+    return pwd.verify_and_update(plain, hashed)
 
 class PasswordHasher:
-    def hash(self, plain: str) -> str: return pwd.hash(plain)
-    def verify(self, plain: str, hashed: str) -> bool: return pwd.verify(plain, hashed)
+    def hash(self, plain: str) -> str: return hash_password(plain)
+    def verify(self, plain: str, hashed: str) -> bool: return verify_password(plain, hashed)
+    def verify_and_update(self, plain: str, hashed: str) -> tuple[bool, str | None]:
+        return verify_and_update_password(plain, hashed)
+
+    # Для async-эндпоинтов: bcrypt в пуле процессов, при переполнении — HashPoolOverloaded
+    async def ahash(self, plain: str) -> str: return await hash_pool.run(hash_password, plain)
+    async def averify(self, plain: str, hashed: str) -> bool: return await hash_pool.run(verify_password, plain, hashed)
+    async def averify_and_update(self, plain: str, hashed: str) -> tuple[bool, str | None]:
+        # Проверка и пересчёт — одна задача пула: при рехэше пароль не передаётся воркеру дважды
+        return await hash_pool.run(verify_and_update_password, plain, hashed)
 
 def create_access_token(sub: str, role: str = "student", minutes: int = 60) -> str:
     exp = datetime.now(timezone.utc) + timedelta(minutes=minutes)
     payload = {"sub": sub, "role": role, "exp": exp}
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    keys = get_key_set()
+    # kid в заголовке: сервисы выбирают по нему ключ из JWKS и замечают ротацию
+    return jwt.encode(payload, keys.private_pem, algorithm=keys.algorithm, headers={"kid": keys.kid})
 
 
 def decode_token(token: str) -> str:
     """Возвращает email (sub) из токена или кидает JWTError."""
-    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-    sub = payload.get("sub")
-    if not sub:
+    return decode_claims(token)["sub"]
+
+
+def decode_claims(token: str) -> dict:
+    """Проверенные claims токена (sub, role, exp) или JWTError."""
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    else:
+        keys = get_key_set()
+        key = keys.public_keys.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise JWTError("Unknown signing key")
+        payload = jwt.decode(token, key, algorithms=[keys.algorithm])
+    if not payload.get("sub"):
         raise JWTError("No subject")
-    return sub
+    return payload
@@ -0,0 +1,79 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import structlog
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+
+from ..config import settings
+
+logger = structlog.get_logger()
+
+# Алгоритмы с открытым ключом, которые умеет python-jose; HS* подписывается SECRET_KEY без JWKS
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# Поля JWK, по которым считается отпечаток (RFC 7638)
+_THUMBPRINT_FIELDS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def thumbprint(public_jwk: dict[str, Any]) -> str:
+    """kid = отпечаток ключа: одинаков на всех репликах с тем же ключом"""
+    fields = {name: public_jwk[name] for name in _THUMBPRINT_FIELDS[public_jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(fields, separators=(",", ":"), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def public_jwk(pem: str, algorithm: str) -> dict[str, Any]:
+    """Публичная часть ключа (PEM закрытого или открытого) в виде JWK с kid"""
+    key = jwk.construct(pem, algorithm).public_key().to_dict()
+    return {**key, "kid": thumbprint(key), "use": "sig"}
+
+
+def generate_private_key(algorithm: str) -> str:
+    if algorithm.startswith("RS"):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        key = ec.generate_private_key({"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}[algorithm])
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption()).decode()
+
+
+@dataclass(frozen=True)
+class KeySet:
+    algorithm: str
+    private_pem: str
+    kid: str
+    # kid → публичный JWK: текущий ключ подписи и выведенные, чьи токены ещё не истекли
+    public_keys: dict[str, dict[str, Any]]
+
+    def jwks(self) -> dict[str, Any]:
+        return {"keys": list(self.public_keys.values())}
+
+
+@lru_cache
+def get_key_set() -> KeySet:
+    """Ключи подписи; читаются при первом выпуске токена, а не при импорте (воркеры hash_pool их не грузят)"""
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"{algorithm} is not an asymmetric JWT algorithm")
+    if settings.JWT_PRIVATE_KEY_FILE:
+        private_pem = Path(settings.JWT_PRIVATE_KEY_FILE).read_text()
+    elif settings.JWT_EPHEMERAL_KEY:
+        # У каждого процесса свой ключ, рестарт разлогинивает всех: только для разработки и тестов
+        logger.warning("JWT_PRIVATE_KEY_FILE is not set, signing with an ephemeral key", algorithm=algorithm)
+        private_pem = generate_private_key(algorithm)
+    else:
+        raise RuntimeError(f"{algorithm} needs JWT_PRIVATE_KEY_FILE (or JWT_EPHEMERAL_KEY=true for development)")
+    current = public_jwk(private_pem, algorithm)
+    public_keys = {current["kid"]: current}
+    for path in filter(None, (p.strip() for p in settings.JWT_RETIRED_KEY_FILES.split(","))):
+        retired = public_jwk(Path(path).read_text(), algorithm)
+        public_keys.setdefault(retired["kid"], retired)
+    logger.info("JWT signing keys loaded", algorithm=algorithm, kid=current["kid"], published=len(public_keys))
+    return KeySet(algorithm, private_pem, current["kid"], public_keys)
@@ -1,16 +1,21 @@
+import structlog
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ....infrastructure.db import get_db
 from ....infrastructure.repositories import UserRepository
-from ....infrastructure.security import PasswordHasher, create_access_token, decode_token
+from ....infrastructure.profile_cache import aget_profile
+from ....infrastructure.security import PasswordHasher, create_access_token, decode_claims, decode_token
 from ....application.use_cases.register_user import RegisterUser
-from ....interfaces.http.schemas import RegisterReq, LoginReq, UserResp, TokenResp
+from ....interfaces.http.schemas import RegisterReq, LoginReq, UserResp, UserUpdateReq, TokenResp
 from ....infrastructure.models import UserORM
 from ....config import settings
 
+logger = structlog.get_logger()
+
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 bearer = HTTPBearer()
 
@@ -21,20 +26,25 @@ def get_limiter(request: Request) -> Limiter:
 def health():
     return {"status": "ok"}
 
-def _register_impl(
+async def _register_impl(
     request: Request,
     payload: RegisterReq,
     db: Session,
 ):
-    uc = RegisterUser(repo=UserRepository(db), hasher=PasswordHasher())
+    # Запросы к БД — в threadpool, bcrypt — в пуле процессов (hash_pool)
+    repo = UserRepository(db)
+    hasher = PasswordHasher()
+    uc = RegisterUser(repo=repo, hasher=hasher)
     try:
-        user = uc.execute(payload.email, payload.password)
+        await run_in_threadpool(uc.validate, payload.email)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    pwd_hash = await hasher.ahash(payload.password)
+    user = await run_in_threadpool(repo.create, payload.email, pwd_hash)
     return UserResp(id=user.id, email=user.email, role=user.role)
 
 @router.post("/register", response_model=UserResp, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     request: Request,
     payload: RegisterReq,
     db: Session = Depends(get_db),
@@ -42,22 +52,38 @@ def register(
 ):
     # Применяем rate limiting через декоратор
     limited_func = limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")(_register_impl)
-    return limited_func(request, payload, db)
+    return await limited_func(request, payload, db)
+
+def _find_user(db: Session, email: str) -> UserORM | None:
+    return db.query(UserORM).filter(UserORM.email == email).first()
 
-def _login_impl(
+async def _login_impl(
     request: Request,
     payload: LoginReq,
     db: Session,
 ):
-    row = db.query(UserORM).filter(UserORM.email == payload.email).first()
-    if not row or not PasswordHasher().verify(payload.password, row.password_hash):
+    row = await run_in_threadpool(_find_user, db, payload.email)
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    # commit и rollback рехэша протухают row: ленивая догрузка атрибутов была бы SELECT в event loop
+    user_id, email, role, password_hash = row.id, row.email, row.role, row.password_hash
+    ok, new_hash = await PasswordHasher().averify_and_update(payload.password, password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Хэш не по текущему профилю (схема, стоимость) — пароль известен только сейчас, пересчитываем
+        try:
+            await run_in_threadpool(UserRepository(db).update_password_hash, user_id, password_hash, new_hash)
+        except Exception as e:
+            # Не удалось записать — пользователь всё равно вошёл, попробуем на следующем логине
+            await run_in_threadpool(db.rollback)
+            logger.warning("Password rehash failed", user_id=user_id, error=str(e))
     # добавим роль в токен
-    token = create_access_token(sub=row.email, role=row.role)
+    token = create_access_token(sub=email, role=role)
     return TokenResp(access_token=token)
 
 @router.post("/login", response_model=TokenResp)
-def login(
+async def login(
     request: Request,
     payload: LoginReq,
     db: Session = Depends(get_db),
@@ -65,11 +91,11 @@ def login(
 ):
     # Более строгий лимит для логина (защита от брутфорса)
     limited_func = limiter.limit("10/minute")(_login_impl)
-    return limited_func(request, payload, db)
+    return await limited_func(request, payload, db)
 
 
 @router.get("/me", response_model=UserResp)
-def me(
+async def me(
     creds: HTTPAuthorizationCredentials = Depends(bearer),
     db: Session = Depends(get_db),
 ):
@@ -79,7 +105,35 @@ def me(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    row = db.query(UserORM).filter(UserORM.email == email).first()
-    if not row:
+    # Фронтенд зовёт /me на каждой странице: обычно профиль берётся из кэша, без БД
+    async def load() -> dict | None:
+        row = await run_in_threadpool(_find_user, db, email)
+        return {"id": row.id, "email": row.email, "role": row.role} if row else None
+
+    profile = await aget_profile(email, load)
+    if profile is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return UserResp(id=row.id, email=row.email, role=row.role)
+    return UserResp(id=profile["id"], email=profile["email"], role=profile["role"])
+
+
+def require_admin(creds: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
+    try:
+        claims = decode_claims(creds.credentials)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if claims.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return claims
+
+
+@router.patch("/users/{user_id}", response_model=UserResp, dependencies=[Depends(require_admin)])
+async def update_user(
+    user_id: int,
+    payload: UserUpdateReq,
+    db: Session = Depends(get_db),
+):
+    # Роль и активность меняются только через UserRepository: он сбрасывает кэш профиля /me
+    user = await run_in_threadpool(UserRepository(db).update_profile, user_id, payload.role, payload.is_active)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserResp(id=user.id, email=user.email, role=user.role)
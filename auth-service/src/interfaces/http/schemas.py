@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 class RegisterReq(BaseModel):
     email: EmailStr
@@ -13,6 +13,10 @@ class UserResp(BaseModel):
     email: EmailStr
     role: str
 
+class UserUpdateReq(BaseModel):
+    role: str | None = Field(None, min_length=1, max_length=32)
+    is_active: bool | None = None
+
 class TokenResp(BaseModel):
     access_token: str
     token_type: str = "bearer"
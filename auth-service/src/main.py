@@ -1,12 +1,17 @@
 import logging
 import structlog
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy import text
 from .infrastructure.db import engine
+from .infrastructure.hash_pool import HashPoolOverloaded, hash_pool
 from .infrastructure.models import Base
+from .infrastructure.profile_cache import close_async_redis, start_invalidation_listener, stop_invalidation_listener
+from .infrastructure.serialization import FastJSONResponse
+from .infrastructure.signing_keys import ASYMMETRIC_ALGORITHMS, get_key_set
 from .interfaces.http.routers import auth as auth_router
 from .config import settings
 
@@ -26,13 +31,20 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-app = FastAPI(title="Auth Service", version="0.1.0")
+app = FastAPI(title="Auth Service", version="0.1.0", default_response_class=FastJSONResponse)
 
 # Rate limiting
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(HashPoolOverloaded)
+async def hash_pool_overloaded(request: Request, exc: HashPoolOverloaded):
+    # Очередь на bcrypt заполнена: быстрый отказ вместо ожидания в ней
+    return JSONResponse({"detail": "Too many concurrent password checks, retry later"},
+                        status_code=503, headers={"Retry-After": "1"})
+
 # Middleware для логирования
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -63,9 +75,26 @@ def on_startup():
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
     logger.info("Database connection established")
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        get_key_set()  # неверный ключ — ошибка на старте, а не на первом логине
+    hash_pool.start()
+    start_invalidation_listener()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    hash_pool.stop()
+    stop_invalidation_listener()
+    await close_async_redis()
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/.well-known/jwks.json")
+def jwks():
+    """Открытые ключи проверки токенов (RFC 7517); сервисы кэшируют их у себя и выбирают ключ по kid"""
+    keys = get_key_set().jwks() if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS else {"keys": []}
+    return JSONResponse(keys, headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"})
+
 app.include_router(auth_router.router)
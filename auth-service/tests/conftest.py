@@ -7,6 +7,9 @@ SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
 if SERVICE_ROOT not in sys.path:
     sys.path.insert(0, SERVICE_ROOT)
 
+# Ключ подписи генерируется на время прогона; задаётся до первого импорта src.config
+os.environ.setdefault("JWT_EPHEMERAL_KEY", "true")
+
 @pytest.fixture(autouse=True)
 def setup_test_environment(monkeypatch):
     """Настройка тестового окружения"""
@@ -14,3 +17,37 @@ def setup_test_environment(monkeypatch):
     monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/99")
     monkeypatch.setenv("DATABASE_URL", "sqlite:///./test_auth.db")
 
+
+
+@pytest.fixture(autouse=True)
+def clear_profile_cache():
+    """Изолируем тесты друг от друга: L1 профилей живёт в памяти процесса"""
+    from src.infrastructure.profile_cache import local_cache
+    local_cache.clear()
+    yield
+    local_cache.clear()
+
+
+@pytest.fixture
+def engine():
+    """Настоящая SQLite в памяти со схемой; StaticPool — одно соединение на весь тест"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from src.infrastructure.models import Base
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Сессия тестовой БД; get_db приложения отдаёт её же"""
+    from sqlalchemy.orm import sessionmaker
+    from src.infrastructure.db import get_db
+    from src.main import app
+    session = sessionmaker(bind=engine)()
+    app.dependency_overrides[get_db] = lambda: session
+    yield session
+    app.dependency_overrides.pop(get_db)
+    session.close()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import threading
+import pytest
+from unittest.mock import MagicMock, Mock
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+from src.infrastructure.db import get_db
+from src.infrastructure.hash_pool import HashPool, HashPoolOverloaded, hash_pool
+from src.infrastructure.security import hash_password, verify_password
+from src.interfaces.http.routers.auth import get_limiter
+from src.main import app
+
+
+def test_pool_verifies_in_worker_process():
+    """bcrypt считается в отдельном процессе, результат тот же"""
+    pool = HashPool(workers=1, max_pending=4)
+    pool.start()
+    try:
+        hashed = asyncio.run(pool.run(hash_password, "password123"))
+        assert asyncio.run(pool.run(verify_password, "password123", hashed)) is True
+        assert asyncio.run(pool.run(verify_password, "wrong", hashed)) is False
+    finally:
+        pool.stop()
+
+
+def test_pool_rejects_over_max_pending():
+    """Сверх max_pending задача отклоняется сразу, а не встаёт в очередь"""
+    pool = HashPool(workers=0, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HashPoolOverloaded):
+            await pool.run(hash_password, "x")
+        release.set()
+        assert await first is True
+        assert pool.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_login_returns_503_when_pool_is_full(monkeypatch):
+    user = Mock(email="test@example.com", password_hash=hash_password("password123"), role="student")
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = user
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_limiter] = lambda: Mock(limit=lambda *a, **k: (lambda f: f))
+    monkeypatch.setattr(hash_pool, "pending", hash_pool.max_pending)
+    try:
+        response = TestClient(app).post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+    finally:
+        app.dependency_overrides.pop(get_db)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
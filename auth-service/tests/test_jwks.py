@@ -0,0 +1,74 @@
+import os
+import sys
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from src.config import settings
+from src.infrastructure.security import create_access_token, decode_token
+from src.infrastructure.signing_keys import generate_private_key, get_key_set, public_jwk
+from src.main import app
+
+
+@pytest.fixture
+def key_files(tmp_path, monkeypatch):
+    """Текущий и выведенный ключи в файлах, как их монтирует деплой"""
+    current, retired = tmp_path / "current.pem", tmp_path / "retired.pem"
+    current.write_text(generate_private_key("RS256"))
+    retired.write_text(generate_private_key("RS256"))
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_FILE", str(current))
+    monkeypatch.setattr(settings, "JWT_RETIRED_KEY_FILES", str(retired))
+    get_key_set.cache_clear()
+    yield current, retired
+    get_key_set.cache_clear()
+
+
+def test_jwks_publishes_current_and_retired_keys(key_files):
+    current, retired = key_files
+    response = TestClient(app).get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.JWKS_MAX_AGE}"
+    keys = {key["kid"]: key for key in response.json()["keys"]}
+    assert set(keys) == {public_jwk(current.read_text(), "RS256")["kid"], public_jwk(retired.read_text(), "RS256")["kid"]}
+    # Только открытые части ключей
+    assert all(set(key) == {"kty", "alg", "n", "e", "kid", "use"} for key in keys.values())
+
+    token = create_access_token("user@example.com", role="admin")
+    kid = jwt.get_unverified_header(token)["kid"]
+    assert kid == public_jwk(current.read_text(), "RS256")["kid"]
+    assert jwt.decode(token, keys[kid], algorithms=["RS256"])["role"] == "admin"
+    assert decode_token(token) == "user@example.com"
+
+
+def test_kid_is_stable_across_restarts(key_files):
+    first = get_key_set().kid
+    get_key_set.cache_clear()
+    assert get_key_set().kid == first
+
+
+def test_hs256_mode_keeps_shared_secret(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "HS256")
+    token = create_access_token("user@example.com")
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])["sub"] == "user@example.com"
+    assert TestClient(app).get("/.well-known/jwks.json").json() == {"keys": []}
+
+
+def test_missing_key_file_fails_without_ephemeral_opt_in(monkeypatch):
+    """Без файла ключа и без JWT_EPHEMERAL_KEY сервис не стартует молча с временным ключом"""
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_FILE", "")
+    monkeypatch.setattr(settings, "JWT_EPHEMERAL_KEY", False)
+    get_key_set.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="JWT_PRIVATE_KEY_FILE"):
+            get_key_set()
+    finally:
+        get_key_set.cache_clear()
@@ -0,0 +1,97 @@
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, Mock
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+from src.infrastructure import security
+from src.infrastructure.db import get_db
+from src.infrastructure.security import build_context
+from src.interfaces.http.routers.auth import get_limiter
+from src.main import app
+
+
+def test_hash_with_other_cost_is_rehashed():
+    old = build_context("bcrypt_sha256", bcrypt_rounds=4).hash("password123")
+    ok, new_hash = build_context("bcrypt_sha256", bcrypt_rounds=5).verify_and_update("password123", old)
+    assert ok is True
+    assert ",r=5$" in new_hash
+    # Хэш по текущему профилю не пересчитывается
+    assert build_context("bcrypt_sha256", bcrypt_rounds=4).verify_and_update("password123", old) == (True, None)
+
+
+def test_hash_migrates_between_schemes():
+    old = build_context("argon2", argon2_memory_kib=1024, argon2_time_cost=1).hash("password123")
+    ok, new_hash = build_context("bcrypt_sha256", bcrypt_rounds=4).verify_and_update("password123", old)
+    assert ok is True
+    assert new_hash.startswith("$bcrypt-sha256$")
+    assert build_context("bcrypt_sha256", bcrypt_rounds=4).verify("password123", new_hash)
+
+
+def test_unknown_scheme_is_rejected():
+    with pytest.raises(ValueError):
+        build_context("md5_crypt")
+
+
+@pytest.fixture
+def login_client(monkeypatch):
+    monkeypatch.setattr(security, "pwd", build_context("bcrypt_sha256", bcrypt_rounds=5))
+    db = MagicMock()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_limiter] = lambda: Mock(limit=lambda *a, **k: (lambda f: f))
+    yield TestClient(app), db
+    app.dependency_overrides.pop(get_db)
+
+
+def test_login_writes_back_rehashed_password(login_client):
+    client, db = login_client
+    old = build_context("bcrypt_sha256", bcrypt_rounds=4).hash("password123")
+    db.query.return_value.filter.return_value.first.return_value = Mock(
+        id=1, email="test@example.com", password_hash=old, role="student")
+
+    response = client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+
+    assert response.status_code == 200
+    update = db.query.return_value.filter.return_value.update
+    update.assert_called_once()
+    new_hash = next(iter(update.call_args.args[0].values()))
+    assert ",r=5$" in new_hash and security.verify_password("password123", new_hash)
+    db.commit.assert_called_once()
+
+
+def test_login_does_not_rehash_current_or_wrong_password(login_client):
+    client, db = login_client
+    current = security.hash_password("password123")
+    db.query.return_value.filter.return_value.first.return_value = Mock(
+        id=1, email="test@example.com", password_hash=current, role="student")
+
+    assert client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"}).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "test@example.com", "password": "wrong"}).status_code == 401
+    db.query.return_value.filter.return_value.update.assert_not_called()
+
+
+def test_login_after_rehash_does_not_reload_user(monkeypatch, engine, db):
+    """После commit рехэша токен строится без догрузки протухшего row из БД"""
+    from sqlalchemy import event
+    from src.infrastructure.models import UserORM
+    monkeypatch.setattr(security, "pwd", build_context("bcrypt_sha256", bcrypt_rounds=5))
+    app.dependency_overrides[get_limiter] = lambda: Mock(limit=lambda *a, **k: (lambda f: f))
+    old = build_context("bcrypt_sha256", bcrypt_rounds=4).hash("password123")
+    db.add(UserORM(id=1, email="test@example.com", password_hash=old, role="admin"))
+    db.commit()
+    db.expunge_all()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = TestClient(app).post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+
+    assert response.status_code == 200
+    assert security.decode_claims(response.json()["access_token"])["role"] == "admin"
+    after_update = statements[[s.startswith("UPDATE users") for s in statements].index(True) + 1:]
+    assert not any(s.startswith("SELECT") for s in after_update)
+    assert ",r=5$" in db.get(UserORM, 1).password_hash
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import sys
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+
+from src.infrastructure import profile_cache
+from src.infrastructure.models import UserORM
+from src.infrastructure.security import create_access_token
+from src.main import app
+
+
+class FakeRedis:
+    """Словарь вместо Redis: профилю нужны mget/eval (async), pipeline и delete (sync)"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, store: FakeRedis):
+        self.store = store
+        self.ops = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.ops.append((name, args))
+
+    def execute(self):
+        data = self.store.data
+        for name, args in self.ops:
+            if name == "incr":
+                data[args[0]] = str(int(data.get(args[0], b"0")) + 1).encode()
+            elif name == "delete":
+                data.pop(args[0], None)
+            elif name == "publish":
+                self.store.published.append(args)
+
+
+class FakeAsyncRedis:
+    def __init__(self, store: FakeRedis):
+        self.store = store
+
+    async def mget(self, *keys):
+        return [self.store.data.get(key) for key in keys]
+
+    async def eval(self, script, numkeys, key, version_key, version, ttl, value):
+        # Тот же контракт, что у _SET_IF_VERSION_SCRIPT
+        if self.store.data.get(version_key, b"").decode() != version:
+            return 0
+        self.store.data[key] = value.encode() if isinstance(value, str) else value
+        return 1
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    store = FakeRedis()
+    monkeypatch.setattr(profile_cache, "get_redis", lambda: store)
+    monkeypatch.setattr(profile_cache, "get_async_redis", lambda: FakeAsyncRedis(store))
+    return store
+
+
+@pytest.fixture
+def session(db):
+    db.add(UserORM(id=1, email="user@example.com", password_hash="x", role="student"))
+    db.commit()
+    queries = []
+    real_query = db.query
+    db.query = lambda *a, **k: queries.append(a) or real_query(*a, **k)
+    yield db, queries
+
+
+def me(client: TestClient):
+    token = create_access_token("user@example.com")
+    return client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_me_reads_db_once(session, redis_store):
+    _, queries = session
+    client = TestClient(app)
+    for _ in range(3):
+        assert me(client).json() == {"id": 1, "email": "user@example.com", "role": "student"}
+    assert len(queries) == 1
+    assert profile_cache.profile_key("user@example.com") in redis_store.data
+
+
+def test_profile_is_shared_through_redis(session, redis_store):
+    _, queries = session
+    client = TestClient(app)
+    me(client)
+    # Другая реплика: своего L1 нет, профиль приходит из Redis
+    profile_cache.local_cache.clear()
+    assert me(client).json()["role"] == "student"
+    assert len(queries) == 1
+
+
+def admin_headers() -> dict:
+    return {"Authorization": f"Bearer {create_access_token('admin@example.com', role='admin')}"}
+
+
+def test_role_change_invalidates_profile(session, redis_store):
+    _, queries = session
+    client = TestClient(app)
+    me(client)
+    response = client.patch("/api/auth/users/1", json={"role": "admin"}, headers=admin_headers())
+    assert response.json() == {"id": 1, "email": "user@example.com", "role": "admin"}
+    assert profile_cache.profile_key("user@example.com") not in redis_store.data
+    assert redis_store.published == [(profile_cache.settings.PROFILE_INVALIDATION_CHANNEL,
+                                      profile_cache.profile_key("user@example.com"))]
+    assert me(client).json()["role"] == "admin"
+    assert len(queries) == 2
+
+
+def test_update_user_requires_admin(session, redis_store):
+    db, _ = session
+    client = TestClient(app)
+    token = create_access_token("user@example.com")
+    response = client.patch("/api/auth/users/1", json={"role": "admin"},
+                            headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+    assert client.patch("/api/auth/users/404", json={"is_active": False}, headers=admin_headers()).status_code == 404
+    # Деактивация сбрасывает кэш; /me, как и до кэша, отдаёт профиль независимо от активности
+    assert client.patch("/api/auth/users/1", json={"is_active": False}, headers=admin_headers()).status_code == 200
+    assert db.get(UserORM, 1).is_active is False
+    assert me(client).status_code == 200
+
+
+def test_redis_outage_falls_back_to_db(session, monkeypatch):
+    _, queries = session
+
+    class Down:
+        async def mget(self, *keys):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(profile_cache, "get_async_redis", lambda: Down())
+    assert me(TestClient(app)).json()["email"] == "user@example.com"
+    assert len(queries) == 1
+
+
+def test_invalidation_during_load_does_not_cache_stale_profile(redis_store):
+    """PATCH между чтением из БД и записью в кэш: старая роль не возвращается ни в Redis, ни в L1"""
+    email = "user@example.com"
+
+    async def load():
+        profile_cache.invalidate_profile(email)
+        return {"id": 1, "email": email, "role": "student"}
+
+    assert asyncio.run(profile_cache.aget_profile(email, load))["role"] == "student"
+    assert profile_cache.profile_key(email) not in redis_store.data
+    assert profile_cache.local_cache.get(profile_cache.profile_key(email)) is None
+
+
+class FakePubSub:
+    def __init__(self, key):
+        self.key = key
+        self.channels = []
+        self.delivered = False
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def get_message(self, timeout=None):
+        if self.delivered:
+            profile_cache._listener_stop.set()
+            return None
+        self.delivered = True
+        # Профиль попал в L1 уже после сброса кэша при подписке
+        profile_cache.local_cache.set(self.key, {"role": "student"})
+        return {"type": "message", "data": self.key.encode()}
+
+    def close(self):
+        pass
+
+
+def test_listener_drops_invalidated_profile_from_l1(monkeypatch):
+    """Инвалидация с другой реплики приходит через pub/sub и чистит локальный L1"""
+    key = profile_cache.profile_key("user@example.com")
+    pubsub = FakePubSub(key)
+
+    class Client:
+        def pubsub(self, ignore_subscribe_messages=True):
+            return pubsub
+
+    monkeypatch.setattr(profile_cache, "get_redis", lambda: Client())
+    profile_cache._listener_stop.clear()
+    profile_cache._listen_invalidations()
+
+    assert pubsub.channels == [profile_cache.settings.PROFILE_INVALIDATION_CHANNEL]
+    assert profile_cache.local_cache.get(key) is None
@@ -0,0 +1,203 @@
+"""Нагрузочное сравнение пути попадания в кэш: async (redis.asyncio) против threadpool.
+
+Поднимает uvicorn с приложением сервиса и дополнительным маршрутом
+`/legacy/courses`, который повторяет прежнюю реализацию list_courses (def +
+синхронный клиент Redis), прогревает кэш и бьёт по обоим маршрутам с заданной
+конкурентностью. По умолчанию L1 отключается для значений (поколения остаются
+в L1), чтобы каждое попадание шло в Redis; `--with-l1` оставляет L1 включённым.
+
+С `--redis-latency-ms` сервис ходит в Redis через TCP-прокси, добавляющий
+задержку к каждому ответу — так моделируется медленный/удалённый Redis.
+
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/bench_async_cache.py --concurrency 500
+
+ВНИМАНИЕ: скрипт делает FLUSHDB в указанной базе Redis.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.main import app
+from src.infrastructure import cache
+from src.infrastructure.metrics import cache_hits_total
+from src.infrastructure.serialization import dumps, loads
+from src.interfaces.http.schemas import CourseOut
+
+if os.environ.get("BENCH_WITH_L1") != "1":
+    # Каждое попадание должно доходить до Redis: в L1 держим только поколения
+    _set_local = cache.local_cache.set
+    cache.local_cache.set = lambda key, value, ttl=None: key.endswith(":gen") and _set_local(key, value, ttl)
+
+
+# Прежние синхронные хелперы кэша: в сервисе их больше нет, бенчмарку они нужны для сравнения
+
+def legacy_versioned_key(namespace: str, *parts) -> str | None:
+    gen_key = f"{namespace}:gen"
+    gen = cache.local_cache.get(gen_key)
+    if gen is None:
+        try:
+            raw = cache.get_redis().get(gen_key)
+        except Exception:
+            return None
+        gen = int(raw) if raw is not None else 0
+        cache.local_cache.set(gen_key, gen)
+    return ":".join([namespace, str(gen), *map(str, parts)])
+
+
+def legacy_get_cache(key: str):
+    value = cache.local_cache.get(key)
+    if value is not None:
+        return value
+    try:
+        raw = cache.get_redis().get(key)
+    except Exception:
+        return None
+    if raw is None:
+        return None
+    value = loads(raw)
+    cache.local_cache.set(key, value)
+    return value
+
+
+def legacy_set_cache(key: str, value, ttl: int = None) -> None:
+    ttl = ttl or cache.settings.CACHE_TTL
+    cache.local_cache.set(key, value, ttl)
+    cache.get_redis().setex(key, ttl, dumps(value))
+
+
+@app.get("/legacy/courses", response_model=list[CourseOut])
+def legacy_list_courses(limit: int = 10, offset: int = 0):
+    """Прежний путь: def-эндпоинт в threadpool и синхронный Redis"""
+    cache_key = legacy_versioned_key("legacy:list", limit, offset)
+    cached = legacy_get_cache(cache_key) if cache_key else None
+    if cached is not None:
+        cache_hits_total.inc()
+        return cached
+    return []
+
+
+def start_latency_proxy(target_host: str, target_port: int, listen_port: int, delay: float) -> None:
+    """TCP-прокси к Redis, задерживающий каждый ответ на delay секунд"""
+
+    async def pipe(reader, writer, delayed: bool):
+        try:
+            while data := await reader.read(65536):
+                if delayed:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer, False),
+            pipe(upstream_reader, client_writer, True),
+        )
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", listen_port)
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+
+
+async def run_load(port: int, path: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    """Минимальный keep-alive HTTP/1.1 клиент: сам генератор нагрузки почти не тратит CPU"""
+    latencies: list[float] = []
+    request = f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+    remaining = iter(range(total))
+
+    async def worker():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            for _ in remaining:
+                start = time.perf_counter()
+                writer.write(request)
+                headers = await reader.readuntil(b"\r\n\r\n")
+                status = int(headers.split(b" ", 2)[1])
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                if status != 200:
+                    raise RuntimeError(f"unexpected status {status}")
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start), latencies
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--redis-latency-ms", type=float, default=0)
+    parser.add_argument("--with-l1", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    client = cache.get_redis()
+    client.flushdb()
+    payload = [{"id": i, "title": f"Курс {i}", "description": "Описание курса"} for i in range(10)]
+    legacy_set_cache(legacy_versioned_key("legacy:list", 10, 0), payload)
+    body = cache.CachedPayload(json.dumps(payload, ensure_ascii=False).encode(), {"headers": {}})
+    entry = cache._make_entry(body, 3600, 0.0)
+    client.setex(legacy_versioned_key("courses:list", 10, 0), 3600, cache._encode_entry(entry))
+
+    redis_url = os.environ.get("REDIS_URL", cache.settings.REDIS_URL)
+    if args.redis_latency_ms > 0:
+        parsed = urlparse(redis_url)
+        proxy_port = args.port + 1
+        start_latency_proxy(parsed.hostname, parsed.port or 6379, proxy_port, args.redis_latency_ms / 1000)
+        redis_url = parsed._replace(netloc=f"127.0.0.1:{proxy_port}").geturl()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_async_cache:app",
+         "--port", str(args.port), "--log-level", "warning", "--no-access-log",
+         "--timeout-keep-alive", "120"],
+        cwd=SERVICE_ROOT, env={**os.environ, "LOG_LEVEL": "WARNING", "REDIS_URL": redis_url,
+             "BENCH_WITH_L1": "1" if args.with_l1 else "0"},
+    )
+    try:
+        time.sleep(3)
+        print(f"concurrency={args.concurrency} requests={args.requests} "
+              f"redis_latency_ms={args.redis_latency_ms} l1={args.with_l1}")
+        print(f"{'path':>10} | {'req/s':>8} | {'p50, ms':>8} | {'p99, ms':>8}")
+        print("-" * 44)
+        for name, path in (("threadpool", "/legacy/courses"), ("async", "/api/courses")):
+            asyncio.run(run_load(args.port, path, 500, 20))  # прогрев
+            rps, lat = asyncio.run(run_load(args.port, path, args.requests, args.concurrency))
+            print(f"{name:>10} | {rps:>8.0f} | {statistics.median(lat):>8.1f} | {percentile(lat, 0.99):>8.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+        client.flushdb()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Размер записей кэша и CPU на попадание в L2: текстовый кадр против бинарного.
+
+Строит записи так же, как их заполняет aget_or_load (готовое JSON-тело, ETag,
+варианты gzip/br) для каталога из --courses курсов по --lessons уроков с
+русским текстом: страницы списка, уроки курса целиком и summary. Для каждого
+CACHE_VALUE_FORMAT считает суммарный размер значений и время _decode_entry —
+работу, которую попадание в L2 делает в event loop.
+
+С --redis значения пишутся в Redis из REDIS_URL и дополнительно замеряются
+MEMORY USAGE и GET + декодирование:
+
+    python benchmarks/bench_cache_format.py
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/bench_cache_format.py --redis
+
+ВНИМАНИЕ: с --redis скрипт делает FLUSHDB в указанной базе Redis.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure import cache
+from src.interfaces.http.compression import compress_variants
+from src.interfaces.http.conditional import make_etag
+from src.interfaces.http.routers.courses import _courses_adapter, _lesson_summaries_adapter, _lessons_adapter
+
+WORDS = ("урок", "данные", "функция", "пример", "запрос", "сервер", "модель", "значение", "список",
+         "таблица", "индекс", "кэш", "ответ", "клиент", "поток", "память", "задача", "проверка",
+         "результат", "структура", "алгоритм", "сложность", "транзакция", "соединение")
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def build_entries(courses: int, lessons: int) -> dict[str, dict]:
+    rng = random.Random(42)
+    rows = [SimpleNamespace(id=i, title=f"Курс {i}: {text(rng, 3)}", description=text(rng, 30))
+            for i in range(1, courses + 1)]
+    bodies = {}
+    for offset in range(0, courses, 20):
+        bodies[f"courses:list:0:20:{offset}"] = _courses_adapter.dump_json(
+            _courses_adapter.validate_python(rows[offset:offset + 20], from_attributes=True))
+    for course in rows:
+        items = [SimpleNamespace(id=course.id * 1000 + j, course_id=course.id, title=text(rng, 4),
+                                 content=text(rng, 400), order=j) for j in range(lessons)]
+        bodies[f"course:{course.id}:0:lessons"] = _lessons_adapter.dump_json(
+            _lessons_adapter.validate_python(items, from_attributes=True))
+        bodies[f"course:{course.id}:0:lessons:summary"] = _lesson_summaries_adapter.dump_json(
+            _lesson_summaries_adapter.validate_python(items, from_attributes=True))
+    return {
+        key: cache._make_entry(cache.CachedPayload(body, {"etag": make_etag(key, body)}, compress_variants(body)),
+                               300, 0.01)
+        for key, body in bodies.items()
+    }
+
+
+def decode_us(values: dict[str, bytes], repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        for raw in values.values():
+            cache._decode_entry(raw)
+    return (time.process_time() - start) / (repeat * len(values)) * 1e6
+
+
+async def redis_stats(values: dict[str, bytes]) -> tuple[int, float]:
+    """MEMORY USAGE всех ключей и медиана GET + декодирования, мкс"""
+    client = cache.get_async_redis()
+    await client.flushdb()
+    for key, raw in values.items():
+        await client.set(key, raw)
+    memory = 0
+    for key in values:
+        memory += await client.memory_usage(key, samples=0)
+    samples = []
+    for _ in range(3):
+        for key in values:
+            started = time.perf_counter()
+            cache._decode_entry(await client.get(key))
+            samples.append((time.perf_counter() - started) * 1e6)
+    await client.flushdb()
+    return memory, statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args()
+
+    entries = build_entries(args.courses, args.lessons)
+    print(f"{len(entries)} entries ({args.courses} courses x {args.lessons} lessons), "
+          f"msgpack={cache.msgpack is not None}, zstandard={cache.zstandard is not None}")
+    header = f"{'format':>8} | {'values, KiB':>11} | {'decode, us':>10}"
+    if args.redis:
+        header += f" | {'MEMORY USAGE, KiB':>17} | {'GET+decode p50, us':>18}"
+    print(header)
+    print("-" * len(header))
+    for value_format in ("json", "binary"):
+        cache.settings.CACHE_VALUE_FORMAT = value_format
+        values = {key: cache._encode_entry(entry) for key, entry in entries.items()}
+        row = f"{value_format:>8} | {sum(map(len, values.values())) / 1024:>11.0f} | {decode_us(values, args.repeat):>10.1f}"
+        if args.redis:
+            memory, latency = asyncio.run(redis_stats(values))
+            row += f" | {memory / 1024:>17.0f} | {latency:>18.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Бенчмарк инвалидации списка курсов: KEYS+DEL против счётчика поколений.
+
+Заполняет Redis N закэшированными страницами `courses:list:*` и замеряет
+время одной записи (инвалидации) для обеих схем.
+
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/bench_invalidation.py
+
+ВНИМАНИЕ: скрипт делает FLUSHDB в указанной базе Redis.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure.cache import get_redis, invalidate_namespace, local_cache
+
+PAGE_VALUE = '[{"id": 1, "title": "Курс", "description": "Описание"}]'
+
+
+def populate(client, count: int, gen: int) -> None:
+    pipe = client.pipeline(transaction=False)
+    for i in range(count):
+        pipe.set(f"courses:list:{gen}:100:{i * 100}", PAGE_VALUE)
+        if i % 10000 == 9999:
+            pipe.execute()
+    pipe.execute()
+
+
+def legacy_invalidate(client) -> int:
+    keys = client.keys("courses:list:*")
+    return client.delete(*keys) if keys else 0
+
+
+def timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000,300000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = get_redis()
+    print(f"{'pages':>8} | {'KEYS+DEL, ms':>14} | {'INCR gen, ms':>13}")
+    print("-" * 43)
+    for size in map(int, args.sizes.split(",")):
+        legacy = []
+        for _ in range(args.repeat):
+            client.flushdb()
+            populate(client, size, gen=0)
+            legacy += timed(lambda: legacy_invalidate(client), 1)
+
+        client.flushdb()
+        populate(client, size, gen=0)
+        local_cache.clear()
+        generation = timed(lambda: invalidate_namespace("courses:list"), args.repeat)
+
+        print(f"{size:>8} | {statistics.median(legacy):>14.2f} | {statistics.median(generation):>13.3f}")
+    client.flushdb()
+
+
+if __name__ == "__main__":
+    main()
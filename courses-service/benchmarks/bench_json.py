@@ -0,0 +1,75 @@
+"""CPU на сериализацию JSON: stdlib json против orjson и msgspec.
+
+Замеряет dumps (рендер ответа FastJSONResponse, запись в кэш, строка NDJSON)
+и loads (чтение из Redis, импорт каталога) для типичных тел ответов:
+
+- `CourseOut` — страница списка курсов;
+- `LessonOut` — уроки курса с текстом;
+- `ProgressItem` — GET /api/progress/my в progress-service (та же форма:
+  lesson_id и completed_at в ISO 8601).
+
+Каждое тело — list[dict], как после response_model. Бэкенды, которые не
+установлены, пропускаются.
+
+    python benchmarks/bench_json.py
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure.serialization import select_backend
+from src.interfaces.http.schemas import CourseOut, LessonOut
+
+START = datetime(2024, 9, 1, tzinfo=timezone.utc)
+PAYLOADS = {
+    "CourseOut x20": [CourseOut(id=i, title=f"Курс {i}", description="Описание курса " * 5).model_dump()
+                      for i in range(1, 21)],
+    "CourseOut x100": [CourseOut(id=i, title=f"Курс {i}", description="Описание курса " * 5).model_dump()
+                       for i in range(1, 101)],
+    "LessonOut x30": [LessonOut(id=i, course_id=1, title=f"Урок {i}", content="Текст урока. " * 150,
+                                order=i).model_dump() for i in range(1, 31)],
+    "ProgressItem x500": [{"lesson_id": i, "completed_at": (START + timedelta(minutes=i)).isoformat()}
+                          for i in range(1, 501)],
+}
+
+
+def cpu_per_call_us(fn, n: int) -> float:
+    start = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - start) / n * 1e6
+
+
+def main() -> None:
+    n = 2000
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            backends.append(select_backend(name))
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+
+    print(f"{n} calls per cell, CPU per call, us")
+    print(f"{'payload':>18} | {'bytes':>6} | " + " | ".join(f"{name:>16}" for name, _, _ in backends))
+    print(f"{'':>18} | {'':>6} | " + " | ".join(f"{'dumps':>7} {'loads':>8}" for _ in backends))
+    print("-" * (30 + 19 * len(backends)))
+    for label, payload in PAYLOADS.items():
+        raw = backends[0][1](payload)
+        cells = []
+        for _, dumps, loads in backends:
+            cpu_per_call_us(lambda: dumps(payload), 100)  # прогрев
+            encode = cpu_per_call_us(lambda: dumps(payload), n)
+            decode = cpu_per_call_us(lambda: loads(raw), n)
+            cells.append(f"{encode:>7.1f} {decode:>8.1f}")
+        print(f"{label:>18} | {len(raw):>6} | " + " | ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
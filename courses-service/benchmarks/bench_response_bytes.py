@@ -0,0 +1,117 @@
+"""CPU на запрос страницы из 100 курсов: кэш готовых байтов против кэша dict'ов.
+
+Вызывает ASGI-приложение напрямую (без сети и HTTP-клиента) и считает
+process_time на запрос для попадания в L1:
+
+- `dicts` — прежний путь: в кэше список dict'ов, FastAPI валидирует его по
+  response_model=list[CourseOut] и кодирует в JSON;
+- `bytes` — текущий list_courses: в кэше готовое тело, ответ — сырой Response.
+
+Отдельно замеряется сериализация на промахе: model_validate + model_dump +
+валидация response_model + json.dumps против TypeAdapter.dump_json.
+
+    python benchmarks/bench_response_bytes.py
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Redis не нужен: всё обслуживается из L1
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from pydantic import TypeAdapter
+
+from src.main import app
+from src.infrastructure import cache
+from src.interfaces.http.routers.courses import COURSES_LIST_NS, _courses_adapter
+from src.interfaces.http.schemas import CourseOut
+
+PAGE = 100
+ROWS = [SimpleNamespace(id=i, title=f"Курс {i}", description="Описание курса " * 5) for i in range(1, PAGE + 1)]
+DICTS = [CourseOut.model_validate(row).model_dump() for row in ROWS]
+
+
+@app.get("/legacy/courses", response_model=list[CourseOut])
+async def legacy_list_courses():
+    """Прежнее попадание: список dict'ов из L1 проходит через response_model"""
+    return cache.local_cache.get("legacy")
+
+
+async def call(path: str, query: bytes) -> None:
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+             "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+             "server": ("bench", 80)}
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, status
+
+
+def cpu_per_call_us(fn, n: int) -> float:
+    start = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - start) / n * 1e6
+
+
+def main() -> None:
+    n = 5000
+    gen_key = f"{COURSES_LIST_NS}:gen"
+    cache.local_cache.maxsize = 100
+    cache.local_cache.ttl = 3600
+    cache.local_cache.set(gen_key, 0)
+    cache.local_cache.set("legacy", DICTS)
+    key = f"{COURSES_LIST_NS}:0:{PAGE}:0"
+    payload = cache.CachedPayload(_courses_adapter.dump_json(_courses_adapter.validate_python(ROWS, from_attributes=True)),
+                                  {"headers": {}})
+    cache.local_cache.set(key, cache._make_entry(payload, 3600, 0.0))
+
+    loop = asyncio.new_event_loop()
+    run = lambda path, query: (lambda: loop.run_until_complete(call(path, query)))
+    for fn in (run("/legacy/courses", b""), run("/api/courses", f"limit={PAGE}".encode())):
+        cpu_per_call_us(fn, 200)  # прогрев
+    legacy = cpu_per_call_us(run("/legacy/courses", b""), n)
+    current = cpu_per_call_us(run("/api/courses", f"limit={PAGE}".encode()), n)
+
+    response_adapter = TypeAdapter(list[CourseOut])
+
+    def old_miss():
+        items = [CourseOut.model_validate(row).model_dump() for row in ROWS]
+        json.dumps(items)  # запись в кэш
+        # response_model: валидация и dump в режиме json, затем JSONResponse
+        validated = response_adapter.validate_python(items)
+        json.dumps(response_adapter.dump_python(validated, mode="json"), ensure_ascii=False).encode()
+
+    def new_miss():
+        _courses_adapter.dump_json(_courses_adapter.validate_python(ROWS, from_attributes=True))
+
+    old_ser = cpu_per_call_us(old_miss, n)
+    new_ser = cpu_per_call_us(new_miss, n)
+
+    print(f"page={PAGE} courses, {n} requests, CPU per request")
+    print(f"{'path':>24} | {'before, us':>10} | {'after, us':>10} | {'saved':>6}")
+    print("-" * 60)
+    for name, before, after in (("hit (full request)", legacy, current),
+                                ("miss serialization", old_ser, new_ser)):
+        print(f"{name:>24} | {before:>10.1f} | {after:>10.1f} | {1 - after / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""CPU на проверку bearer-токена: кэш проверенных JWT против jose.jwt.decode на каждый запрос.
+
+Вызывает ASGI-приложение напрямую (без сети и HTTP-клиента) с одним и тем же
+токеном, как в сессии пользователя, и считает process_time на запрос:
+
+- `anon` — маршрут без авторизации, база для вычитания;
+- `legacy` — прежняя зависимость: def get_claims (threadpool) + jwt.decode;
+- `no cache` — текущая async-зависимость с JWT_CACHE_MAXSIZE=0;
+- `cache` — текущая зависимость, токен уже в кэше.
+
+Отдельно — сама проверка: jwt.decode против TokenCache.get.
+
+    python benchmarks/bench_token_cache.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Токен подписывается SECRET_KEY (HS256): замеряется кэш, а не выбор ключа из JWKS
+os.environ["JWT_JWKS_URL"] = ""
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from src.config import settings
+from src.infrastructure.token_cache import token_cache
+from src.interfaces.http.authz import bearer, get_user_email
+
+TOKEN = jwt.encode({"sub": "bench@example.com", "role": "student", "exp": int(time.time()) + 3600},
+                   settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+app = FastAPI()
+
+
+def legacy_get_email(creds: HTTPAuthorizationCredentials = Depends(bearer)) -> str:
+    """Прежний get_claims + get_user_email: sync-зависимости, decode на каждый запрос"""
+    return jwt.decode(creds.credentials, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])["sub"]
+
+
+@app.get("/anon")
+async def anon():
+    return {"ok": True}
+
+
+@app.get("/legacy")
+async def legacy(email: str = Depends(legacy_get_email)):
+    return {"ok": True}
+
+
+@app.get("/auth")
+async def auth(email: str = Depends(get_user_email)):
+    return {"ok": True}
+
+
+async def call(path: str) -> None:
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {TOKEN}".encode())],
+             "client": ("127.0.0.1", 1), "server": ("bench", 80)}
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, status
+
+
+def cpu_per_call_us(fn, n: int) -> float:
+    start = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - start) / n * 1e6
+
+
+def main() -> None:
+    n, rounds = 5000, 5
+    loop = asyncio.new_event_loop()
+    run = lambda path: (lambda: loop.run_until_complete(call(path)))
+
+    # Варианты чередуются по кругам, берётся минимум: на одном ядре соседние процессы дают шум
+    results: dict[str, float] = {}
+    for _ in range(rounds):
+        for name, path, maxsize in (("anon", "/anon", 0), ("legacy", "/legacy", 0),
+                                    ("no cache", "/auth", 0), ("cache", "/auth", 10000)):
+            token_cache.maxsize = maxsize
+            token_cache.clear()
+            cpu_per_call_us(run(path), 200)  # прогрев (и заполнение кэша)
+            results[name] = min(results.get(name, float("inf")), cpu_per_call_us(run(path), n))
+
+    print(f"{n} requests x {rounds} rounds, same token, min CPU per request")
+    print(f"{'dependency':>10} | {'request, us':>11} | {'auth overhead, us':>17}")
+    print("-" * 45)
+    for name, value in results.items():
+        print(f"{name:>10} | {value:>11.1f} | {value - results['anon']:>17.1f}")
+
+    token_cache.maxsize = 10000
+    token_cache.set(TOKEN, jwt.decode(TOKEN, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]))
+    decode = cpu_per_call_us(lambda: jwt.decode(TOKEN, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]), n)
+    lookup = cpu_per_call_us(lambda: token_cache.get(TOKEN), n)
+    print()
+    print(f"jwt.decode {decode:.1f} us, TokenCache.get {lookup:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,56 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./courses.db"
+    # Асинхронный движок (asyncpg/aiosqlite) для сессий запросов; DDL на старте и выгрузка каталога — на синхронном
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str = ""  # пусто — выводится из DATABASE_URL
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Реплики чтения: URL через запятую; пусто — всё читается с primary
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_INTERVAL: float = 5.0  # seconds
+    DB_READ_YOUR_WRITES_TTL: int = 10  # seconds, сколько админ после записи читает с primary мимо кэша
     REDIS_URL: str = "redis://localhost:6379/0"
     SECRET_KEY: str = "dev-secret-courses"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # только без JWT_JWKS_URL, вместе с SECRET_KEY
+    # JWKS auth-service: токены проверяются локально ключом с kid из заголовка; пусто — HS256 с SECRET_KEY
+    JWT_JWKS_URL: str = "http://localhost:8000/.well-known/jwks.json"
+    JWT_JWKS_REFRESH_INTERVAL: float = 300.0  # seconds, фоновое обновление ключей
+    JWT_JWKS_MIN_REFRESH_INTERVAL: float = 5.0  # seconds, не чаще — внеочередное обновление на неизвестный kid
+    JWT_JWKS_TIMEOUT: float = 2.0  # seconds
+    JWT_CACHE_MAXSIZE: int = 10000  # проверенных токенов в in-process LRU; 0 отключает
     LOG_LEVEL: str = "INFO"
-    CACHE_TTL: int = 300  # 5 minutes
+    JSON_BACKEND: str = "auto"  # auto | orjson | msgspec | json — сериализатор кэша и HTTP-ответов
+    CACHE_TTL: int = 300  # 5 minutes, после этого запись отдаётся как stale и обновляется в фоне
+    CACHE_STALE_TTL: int = 60  # seconds, сколько stale-запись ещё живёт в Redis
+    CACHE_XFETCH_BETA: float = 1.0  # 0 отключает вероятностное досрочное обновление
+    REDIS_SOCKET_TIMEOUT: float = 1.0  # seconds
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds, ожидание свободного соединения в async-пуле
+    # Формат записей в Redis: json — текстовый кадр, binary — msgpack со сжатым телом (нужен msgpack)
+    CACHE_VALUE_FORMAT: str = "json"
+    CACHE_VALUE_COMPRESS_MIN_SIZE: int = 1024  # bytes; тело меньше порога хранится несжатым
+    CACHE_VALUE_ZSTD_LEVEL: int = 3
+    LOCAL_CACHE_MAXSIZE: int = 1024  # записей в in-process L1
+    LOCAL_CACHE_TTL: int = 30  # seconds, страховка на случай потерянной инвалидации
+    CACHE_INVALIDATION_CHANNEL: str = "courses:cache:invalidate"
+    # Защита от cache stampede между репликами
+    CACHE_DISTRIBUTED_LOCK: bool = True
+    CACHE_LOCK_TTL_MS: int = 5000
+    CACHE_LOCK_WAIT: float = 2.0  # seconds, сколько ждать чужого пересчёта
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05  # seconds
+    # Прогрев кэша на старте и после инвалидации admin-записями
+    CACHE_WARM_PAGES: int = 3  # первые страницы списка курсов для каждого размера страницы
+    CACHE_WARM_PAGE_SIZES: str = "10,20,50"  # limit, с которыми ходит фронтенд
+    CACHE_WARM_TOP_LESSONS: int = 20  # страниц уроков самых запрашиваемых курсов
+    CACHE_WARM_CONCURRENCY: int = 4  # одновременных запросов к БД при прогреве
+    CACHE_WARM_BUDGET: float = 10.0  # seconds; после него /ready отвечает 200 и с неполным прогревом
+    CACHE_HITS_FLUSH_INTERVAL: float = 10.0  # seconds, сброс счётчика обращений к урокам в Redis
+    # Сжатие ответов каталога: варианты считаются при заполнении кэша
+    COMPRESS_MIN_SIZE: int = 1024  # bytes; меньшие тела отдаются как есть
+    COMPRESS_GZIP_LEVEL: int = 9
+    COMPRESS_BROTLI_QUALITY: int = 9  # 11 заметно медленнее на промахе при выигрыше в единицы процентов
+    SEARCH_TS_CONFIG: str = "russian"  # конфигурация to_tsvector в PostgreSQL
 
     class Config:
         env_file = ".env"
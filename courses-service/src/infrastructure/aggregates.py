@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from typing import Iterable
+
+import structlog
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .metrics import db_queries_total
+from .models import Course, Lesson
+
+logger = structlog.get_logger()
+
+# Агрегаты курса по урокам (lesson_count, content_length, updated_at) хранятся в самой
+# строке courses. Одиночные записи уроков сдвигают их инкрементом в той же транзакции,
+# пакетные (bulk, импорт каталога) пересчитывают по затронутым курсам одним UPDATE.
+
+# Колонки, которых нет в базах, созданных до появления агрегатов (create_all их не добавит)
+_COLUMNS = {
+    "lesson_count": "INTEGER NOT NULL DEFAULT 0",
+    "content_length": "BIGINT NOT NULL DEFAULT 0",
+    "updated_at": "TIMESTAMP WITH TIME ZONE",
+}
+
+RECOUNT_BATCH = 500
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def bump_course_aggregates(db: Session, course_id: int, lessons: int = 0, length: int = 0) -> None:
+    """Сдвинуть агрегаты курса на дельту; инкремент в SQL не теряет конкурентные записи"""
+    db_queries_total.inc()
+    db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(lesson_count=Course.lesson_count + lessons,
+                content_length=Course.content_length + length,
+                updated_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount_course_aggregates(db: Session, course_ids: Iterable[int]) -> None:
+    """Пересчитать агрегаты курсов по их урокам (коррелированные подзапросы, по индексу course_id)"""
+    ids = sorted(course_ids)
+    count = select(func.count(Lesson.id)).where(Lesson.course_id == Course.id).scalar_subquery()
+    length = (
+        select(func.coalesce(func.sum(func.length(Lesson.content)), 0))
+        .where(Lesson.course_id == Course.id)
+        .scalar_subquery()
+    )
+    now = utcnow()
+    for start in range(0, len(ids), RECOUNT_BATCH):
+        db_queries_total.inc()
+        db.execute(
+            update(Course)
+            .where(Course.id.in_(ids[start:start + RECOUNT_BATCH]))
+            .values(lesson_count=count, content_length=length, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def setup_aggregates(engine: Engine) -> None:
+    """Добавить колонки агрегатов в существующую таблицу и заполнить их (идемпотентно, на старте)"""
+    with engine.begin() as conn:
+        existing = {column["name"] for column in inspect(conn).get_columns("courses")}
+        missing = [name for name in _COLUMNS if name not in existing]
+        if not missing:
+            return
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE courses ADD COLUMN {name} {_COLUMNS[name]}"))
+        ids = conn.scalars(select(Course.id)).all()
+        recount_course_aggregates(Session(bind=conn), ids)
+    logger.info("Course aggregates backfilled", columns=missing, courses=len(ids))
@@ -1,9 +1,81 @@
-import json
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+import weakref
 import redis
-from typing import Optional, Any
+import redis.asyncio as aioredis
+import structlog
+from typing import NamedTuple, Optional, Any, Awaitable, Callable
 from ..config import settings
+from .local_cache import LocalCache
+from .serialization import dumps, loads
+from .singleflight import SingleFlight
+from .metrics import (
+    cache_hits_total,
+    cache_misses_total,
+    cache_tier_hits_total,
+    cache_tier_misses_total,
+    cache_coalesced_waiters_total,
+    cache_refreshes_total,
+)
+
+try:
+    import msgpack
+except ImportError:  # без msgpack записи пишутся текстовым кадром
+    msgpack = None
+try:
+    import zstandard
+except ImportError:  # без zstandard тело в бинарном кадре сжимается zlib
+    zstandard = None
+
+logger = structlog.get_logger()
 
 _redis_client: Optional[redis.Redis] = None
+# Асинхронный клиент привязан к event loop, поэтому храним по одному на loop
+_async_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+# L1: in-process кэш перед Redis (L2)
+local_cache = LocalCache(maxsize=settings.LOCAL_CACHE_MAXSIZE, ttl=settings.LOCAL_CACHE_TTL)
+
+# Объединение конкурентных промахов по одному ключу внутри процесса
+_singleflight = SingleFlight()
+
+# Фоновые обновления stale-записей (держим ссылки, чтобы задачи не собрал GC)
+_background_tasks: set[asyncio.Task] = set()
+_refreshing: set[str] = set()
+
+# Снять блокировку, только если она всё ещё наша (могла истечь и достаться другому)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class _CachedPayloadFields(NamedTuple):
+    body: bytes
+    meta: dict
+    encoded: dict
+
+class CachedPayload(_CachedPayloadFields):
+    """Готовое тело ответа и его метаданные (например, заголовки).
+
+    Хранится в кэше как есть: попадание отдаёт байты без валидации и
+    повторной сериализации. encoded — то же тело, заранее сжатое
+    ({"gzip": ..., "br": ...}), чтобы попадание не тратило CPU на сжатие.
+    Незаданные meta и encoded — новые пустые словари у каждого экземпляра.
+    """
+    __slots__ = ()
+
+    def __new__(cls, body: bytes, meta: Optional[dict] = None, encoded: Optional[dict] = None):
+        return super().__new__(cls, body, {} if meta is None else meta, {} if encoded is None else encoded)
+
+_listener_thread: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
 
 def get_redis() -> redis.Redis:
     global _redis_client
@@ -11,52 +83,497 @@ def get_redis() -> redis.Redis:
         _redis_client = redis.from_url(
             settings.REDIS_URL,
             decode_responses=True,
-            socket_connect_timeout=5,
-            socket_timeout=5,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
             retry_on_timeout=True
         )
     return _redis_client
 
-def get_cache(key: str) -> Optional[Any]:
-    """Получить значение из кэша"""
+class _BoundedConnectionPool(aioredis.ConnectionPool):
+    """Пул, который ждёт свободное соединение вместо ошибки "Too many connections".
+
+    aioredis.BlockingConnectionPool в redis 5.0.1 зависает до таймаута, если
+    подключение к Redis не удалось, поэтому ограничиваем пул семафором.
+    """
+
+    def __init__(self, *args, pool_timeout: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool_timeout = pool_timeout
+        self._slots = asyncio.Semaphore(self.max_connections)
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._pool_timeout)
+        except asyncio.TimeoutError:
+            raise redis.ConnectionError("No connection available.") from None
+        # При ошибке подключения базовый класс сам вызывает release()
+        return await super().get_connection(command_name, *keys, **options)
+
+    async def release(self, connection) -> None:
+        await super().release(connection)
+        self._slots.release()
+
+def get_async_redis() -> aioredis.Redis:
+    """Асинхронный клиент Redis с общим пулом соединений для текущего event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        # Без decode_responses: записи aget_or_load хранят тело ответа байтами
+        pool = _BoundedConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            pool_timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            retry_on_timeout=True,
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _async_redis_clients[loop] = client
+    return client
+
+async def close_async_redis() -> None:
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+def _split_l1(keys: list[str]) -> tuple[dict[str, Any], list[str]]:
+    """Найденные в L1 значения и ключи, за которыми нужно идти в Redis"""
+    found, missing = {}, []
+    for key in keys:
+        value = local_cache.get(key)
+        if value is not None:
+            found[key] = value
+        else:
+            missing.append(key)
+    cache_tier_hits_total.labels(tier="l1").inc(len(found))
+    cache_tier_misses_total.labels(tier="l1").inc(len(missing))
+    return found, missing
+
+async def aget_many(keys: list[str]) -> dict[str, CachedPayload]:
+    """Готовые ответы по ключам: L1, затем один MGET в Redis для остальных.
+
+    Записи с истёкшим мягким сроком считаются промахом: вызывающий перечитывает
+    их вместе с остальными промахами одним запросом вместо фоновых обновлений
+    по ключу. Возвращает только найденные ключи.
+    """
+    entries, missing = _split_l1(keys)
+    if missing:
+        try:
+            raws = await get_async_redis().mget(missing)
+        except Exception:
+            raws = [None] * len(missing)
+        for key, raw in zip(missing, raws):
+            if raw is None:
+                continue
+            try:
+                entries[key] = _decode_entry(raw)
+            except Exception:
+                continue
+            local_cache.set(key, entries[key])
+        cache_tier_hits_total.labels(tier="l2").inc(sum(raw is not None for raw in raws))
+        cache_tier_misses_total.labels(tier="l2").inc(sum(raw is None for raw in raws))
+    now = time.time()
+    fresh = {key: entry["v"] for key, entry in entries.items() if now < entry["s"]}
+    cache_hits_total.inc(len(fresh))
+    cache_misses_total.inc(len(keys) - len(fresh))
+    return fresh
+
+async def aset_many(payloads: dict[str, CachedPayload], ttl: int = None) -> bool:
+    """Положить готовые ответы в L1 и одним pipeline в Redis"""
+    ttl = ttl or settings.CACHE_TTL
+    if not payloads:
+        return True
+    entries = {key: _make_entry(payload, ttl, 0.0) for key, payload in payloads.items()}
+    for key, entry in entries.items():
+        local_cache.set(key, entry, ttl)
     try:
-        client = get_redis()
-        value = client.get(key)
-        if value:
-            return json.loads(value)
+        pipe = get_async_redis().pipeline(transaction=False)
+        for key, entry in entries.items():
+            # Устаревшая запись aget_many всё равно не отдаст — храним без запаса на stale
+            pipe.setex(key, ttl, _encode_entry(entry))
+        await pipe.execute()
+        return True
+    except Exception:
+        return False
+
+def _make_entry(payload: CachedPayload, ttl: int, compute_time: float) -> dict:
+    """Запись с мягким сроком: v — значение, s — soft expiry (epoch), d — время пересчёта"""
+    return {"v": payload, "s": time.time() + ttl, "d": compute_time}
+
+# Бинарный кадр: b"\x00" (текстовый кадр начинается с "{"), версия формата, кодек тела, msgpack
+_BINARY_MAGIC = b"\x00"
+_BINARY_VERSION = 1
+_CODEC_NONE, _CODEC_ZSTD, _CODEC_ZLIB = 0, 1, 2
+
+def _compress_body(body: bytes) -> tuple[int, bytes]:
+    if len(body) < settings.CACHE_VALUE_COMPRESS_MIN_SIZE:
+        return _CODEC_NONE, body
+    if zstandard is not None:
+        return _CODEC_ZSTD, zstandard.compress(body, settings.CACHE_VALUE_ZSTD_LEVEL)
+    return _CODEC_ZLIB, zlib.compress(body)
+
+def _decompress_body(codec: int, data: bytes) -> bytes:
+    if codec == _CODEC_NONE:
+        return data
+    if codec == _CODEC_ZSTD:
+        return zstandard.decompress(data)
+    if codec == _CODEC_ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"unknown cache body codec {codec}")
+
+def _encode_binary(entry: dict) -> bytes:
+    """Бинарный кадр: заголовок из трёх байт и msgpack [s, d, meta, тело, сжатые варианты].
+
+    Тело от CACHE_VALUE_COMPRESS_MIN_SIZE байт сжимается zstd; варианты gzip/br
+    уже сжаты и кладутся как есть.
+    """
+    payload = entry["v"]
+    codec, body = _compress_body(payload.body)
+    packed = msgpack.packb([entry["s"], entry["d"], payload.meta, body, payload.encoded])
+    return bytes((_BINARY_MAGIC[0], _BINARY_VERSION, codec)) + packed
+
+def _decode_binary(raw: bytes) -> dict:
+    version, codec = raw[1], raw[2]
+    if version != _BINARY_VERSION:
+        raise ValueError(f"unsupported cache frame version {version}")
+    s, d, meta, body, encoded = msgpack.unpackb(raw[3:])
+    return {"v": CachedPayload(_decompress_body(codec, body), meta, encoded), "s": s, "d": d}
+
+def _encode_entry(entry: dict) -> bytes:
+    """Кадр для Redis: строка JSON с метаданными, перевод строки, тело ответа.
+
+    Сжатые варианты тела идут сразу за ним, их длины — в "z" заголовка.
+    С CACHE_VALUE_FORMAT=binary (и установленным msgpack) — бинарный кадр.
+    """
+    if settings.CACHE_VALUE_FORMAT == "binary" and msgpack is not None:
+        return _encode_binary(entry)
+    payload = entry["v"]
+    header = {"s": entry["s"], "d": entry["d"], "m": payload.meta}
+    if payload.encoded:
+        header["z"] = {encoding: len(data) for encoding, data in payload.encoded.items()}
+    return b"".join([dumps(header), b"\n", payload.body,
+                     *payload.encoded.values()])
+
+def _decode_entry(raw: bytes) -> dict:
+    """Читает оба формата: смена CACHE_VALUE_FORMAT не требует сброса кэша"""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    if raw[:1] == _BINARY_MAGIC:
+        if msgpack is None:
+            raise ValueError("binary cache frame requires msgpack")
+        return _decode_binary(raw)
+    header, _, body = raw.partition(b"\n")
+    header = loads(header)
+    encoded = {}
+    sizes = header.get("z")
+    if sizes:
+        offset = len(body) - sum(sizes.values())
+        body, tail = body[:offset], body[offset:]
+        offset = 0
+        for encoding, size in sizes.items():
+            encoded[encoding] = tail[offset:offset + size]
+            offset += size
+    return {"v": CachedPayload(body, header["m"], encoded), "s": header["s"], "d": header["d"]}
+
+async def _aget_entry(key: str) -> Optional[dict]:
+    entry = local_cache.get(key)
+    if entry is not None:
+        cache_tier_hits_total.labels(tier="l1").inc()
+        return entry
+    cache_tier_misses_total.labels(tier="l1").inc()
+
+    try:
+        raw = await get_async_redis().get(key)
+        if raw is not None:
+            cache_tier_hits_total.labels(tier="l2").inc()
+            entry = _decode_entry(raw)
+            local_cache.set(key, entry)
+            return entry
+        cache_tier_misses_total.labels(tier="l2").inc()
     except Exception:
-        # Если Redis недоступен, просто возвращаем None
         pass
     return None
 
-def set_cache(key: str, value: Any, ttl: int = None) -> bool:
-    """Сохранить значение в кэш"""
+async def _aset_entry(key: str, entry: dict, ttl: int) -> bool:
+    local_cache.set(key, entry, ttl)
     try:
-        client = get_redis()
-        ttl = ttl or settings.CACHE_TTL
-        client.setex(key, ttl, json.dumps(value, ensure_ascii=False))
+        await get_async_redis().setex(key, ttl, _encode_entry(entry))
         return True
     except Exception:
-        # Если Redis недоступен, просто игнорируем
         return False
 
-def delete_cache(key: str) -> bool:
-    """Удалить значение из кэша"""
+def _refresh_reason(entry: dict) -> Optional[str]:
+    """Пора ли обновлять запись: истёк мягкий срок или сработал XFetch"""
+    now = time.time()
+    if now >= entry["s"]:
+        return "stale"
+    beta = settings.CACHE_XFETCH_BETA
+    # XFetch: чем дороже пересчёт и ближе срок, тем вероятнее досрочное обновление
+    if beta > 0 and now - entry["d"] * beta * math.log(1.0 - random.random()) >= entry["s"]:
+        return "early"
+    return None
+
+async def aget_or_load(
+    key: str,
+    loader: Callable[[], Awaitable[CachedPayload]],
+    ttl: int = None,
+    refresh_loader: Optional[Callable[[], Awaitable[CachedPayload]]] = None,
+) -> CachedPayload:
+    """Готовый ответ из кэша или результат loader() с защитой от cache stampede.
+
+    Внутри процесса конкурентные промахи по ключу ждут одно вычисление
+    (single-flight); между репликами вычисление сериализуется блокировкой в Redis.
+
+    Запись живёт в Redis ttl + CACHE_STALE_TTL секунд. После ttl (или раньше,
+    по XFetch) она отдаётся как есть, а обновление идёт в фоне через refresh_loader.
+    Ни loader, ни refresh_loader не должны зависеть от ресурсов запроса (сессии БД
+    и т.п.): результат loader ждут все конкурентные промахи, и запрос, начавший
+    загрузку, может завершиться раньше неё.
+    """
+    ttl = ttl or settings.CACHE_TTL
+    entry = await _aget_entry(key)
+    if entry is not None:
+        cache_hits_total.inc()
+        reason = _refresh_reason(entry)
+        if reason is not None:
+            _schedule_refresh(key, refresh_loader or loader, ttl, reason)
+        return entry["v"]
+    cache_misses_total.inc()
+    return await _singleflight.do(key, lambda: _load_and_fill(key, loader, ttl))
+
+async def _fill(key: str, loader: Callable[[], Awaitable[CachedPayload]], ttl: int) -> CachedPayload:
+    started = time.perf_counter()
+    payload = await loader()
+    entry = _make_entry(payload, ttl, time.perf_counter() - started)
+    await _aset_entry(key, entry, ttl + settings.CACHE_STALE_TTL)
+    return payload
+
+async def _acquire_lock(lock_key: str, token: str) -> tuple[Optional[aioredis.Redis], bool]:
+    try:
+        client = get_async_redis()
+        acquired = await client.set(lock_key, token, nx=True, px=settings.CACHE_LOCK_TTL_MS)
+        return client, bool(acquired)
+    except Exception:
+        # Без Redis координировать реплики нечем — считаем себя лидером
+        return None, True
+
+async def _release_lock(client: Optional[aioredis.Redis], lock_key: str, token: str) -> None:
+    if client is None:
+        return
+    try:
+        await client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception:
+        pass
+
+async def _load_and_fill(key: str, loader: Callable[[], Awaitable[CachedPayload]], ttl: int) -> CachedPayload:
+    if not settings.CACHE_DISTRIBUTED_LOCK:
+        return await _fill(key, loader, ttl)
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    client, acquired = await _acquire_lock(lock_key, token)
+
+    if not acquired:
+        cache_coalesced_waiters_total.labels(scope="distributed").inc()
+        entry = await _wait_for_fill(client, key, lock_key)
+        if entry is not None:
+            return entry["v"]
+        # Лидер не успел или упал — вычисляем сами
+
+    try:
+        return await _fill(key, loader, ttl)
+    finally:
+        if acquired:
+            await _release_lock(client, lock_key, token)
+
+async def _wait_for_fill(client: aioredis.Redis, key: str, lock_key: str) -> Optional[dict]:
+    """Ждём, пока реплика-лидер положит значение в Redis, не дольше CACHE_LOCK_WAIT"""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    try:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+            raw = await client.get(key)
+            if raw is not None:
+                entry = _decode_entry(raw)
+                local_cache.set(key, entry)
+                return entry
+            if not await client.exists(lock_key):
+                return None
+    except Exception:
+        pass
+    return None
+
+def _schedule_refresh(key: str, loader: Callable[[], Awaitable[CachedPayload]], ttl: int, reason: str) -> None:
+    """Фоновое обновление записи; не больше одного на ключ в процессе"""
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+    cache_refreshes_total.labels(reason=reason).inc()
+    task = asyncio.ensure_future(_refresh(key, loader, ttl))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(lambda _: _refreshing.discard(key))
+
+async def _refresh(key: str, loader: Callable[[], Awaitable[CachedPayload]], ttl: int) -> None:
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    client, acquired = await _acquire_lock(lock_key, token)
+    if not acquired:
+        # Обновляет другая реплика, а до тех пор отдаём старое значение
+        return
+    try:
+        await _fill(key, loader, ttl)
+    except Exception as e:
+        logger.warning("Background cache refresh failed", key=key, error=str(e))
+    finally:
+        await _release_lock(client, lock_key, token)
+
+def publish_invalidation(pattern: str) -> None:
+    """Сообщить всем репликам, что L1-записи по паттерну устарели"""
+    try:
+        get_redis().publish(settings.CACHE_INVALIDATION_CHANNEL, pattern)
+    except Exception:
+        pass
+
+def _generation_key(namespace: str) -> str:
+    return f"{namespace}:gen"
+
+def _written_key(namespace: str) -> str:
+    # Живёт DB_READ_YOUR_WRITES_TTL после смены поколения: реплики ещё могут не видеть записи
+    return f"{namespace}:written"
+
+async def aget_generation(namespace: str) -> Optional[int]:
+    """Текущее поколение пространства имён кэша; None, если Redis недоступен"""
+    gen_key = _generation_key(namespace)
+    gen = local_cache.get(gen_key)
+    if gen is not None:
+        return gen
+    epoch = local_cache.epoch
+    try:
+        raw = await get_async_redis().get(gen_key)
+        gen = int(raw) if raw is not None else 0
+    except Exception:
+        return None
+    # Инвалидация могла пройти, пока шёл GET: тогда прочитанное поколение уже старое
+    local_cache.set_if_unchanged(gen_key, gen, epoch)
+    return gen
+
+async def aversioned_key(namespace: str, *parts: Any) -> Optional[str]:
+    """Ключ вида {namespace}:{gen}:{parts...}.
+
+    Возвращает None, если поколение узнать не удалось — в этом случае кэш
+    нужно обойти, иначе реплики могут отдать данные из старого поколения.
+    """
+    gen = await aget_generation(namespace)
+    if gen is None:
+        return None
+    return ":".join([namespace, str(gen), *map(str, parts)])
+
+def invalidate_namespace(namespace: str) -> bool:
+    """Инвалидировать все ключи пространства имён за O(1).
+
+    Увеличивает счётчик поколения: старые ключи становятся недостижимы и
+    доживают свой TTL в Redis (или вытесняются по maxmemory-policy).
+    """
     try:
         client = get_redis()
-        client.delete(key)
-        return True
+        # Метка ставится до INCR: кто увидел новое поколение, увидит и её
+        if settings.DB_READ_YOUR_WRITES_TTL > 0:
+            client.set(_written_key(namespace), 1, ex=settings.DB_READ_YOUR_WRITES_TTL)
+        client.incr(_generation_key(namespace))
+        ok = True
     except Exception:
+        ok = False
+    # Чистим L1 после INCR, иначе конкурентный запрос успеет закэшировать старое поколение
+    local_cache.delete_pattern(f"{namespace}:*")
+    if ok:
+        publish_invalidation(f"{namespace}:*")
+    return ok
+
+async def arecently_written(namespace: str) -> bool:
+    """Поколение сменилось меньше DB_READ_YOUR_WRITES_TTL назад.
+
+    Заполнять кэш нового поколения в это время нужно с primary: строки с
+    отстающей реплики легли бы под новый ключ и жили бы до его TTL. Без Redis
+    считаем, что запись была.
+    """
+    if settings.DB_READ_YOUR_WRITES_TTL <= 0:
         return False
+    try:
+        return bool(await get_async_redis().exists(_written_key(namespace)))
+    except Exception:
+        return True
 
-def delete_cache_pattern(pattern: str) -> int:
-    """Удалить все ключи по паттерну"""
+# Дальше точечная чистка L1 по паттернам дороже, чем сброс L1 целиком
+_L1_PATTERN_LIMIT = 100
+
+def invalidate_namespaces(namespaces: list[str]) -> bool:
+    """Пакетная версия invalidate_namespace: все INCR уходят одним pipeline"""
+    if not namespaces:
+        return True
     try:
-        client = get_redis()
-        keys = client.keys(pattern)
-        if keys:
-            return client.delete(*keys)
-        return 0
+        pipe = get_redis().pipeline(transaction=False)
+        for namespace in namespaces:
+            if settings.DB_READ_YOUR_WRITES_TTL > 0:
+                pipe.set(_written_key(namespace), 1, ex=settings.DB_READ_YOUR_WRITES_TTL)
+            pipe.incr(_generation_key(namespace))
+        pipe.execute()
+        ok = True
     except Exception:
-        return 0
+        ok = False
+    if len(namespaces) > _L1_PATTERN_LIMIT:
+        patterns = ["*"]
+    else:
+        patterns = [f"{namespace}:*" for namespace in namespaces]
+    for pattern in patterns:
+        local_cache.delete_pattern(pattern)
+    if ok:
+        for pattern in patterns:
+            publish_invalidation(pattern)
+    return ok
+
+def _listen_invalidations() -> None:
+    """Слушает канал инвалидации и чистит L1; переподключается при обрыве связи с Redis"""
+    backoff = 1.0
+    while not _listener_stop.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+            # Пока не было подписки, могли пропустить инвалидации
+            local_cache.clear()
+            backoff = 1.0
+            while not _listener_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    local_cache.delete_pattern(message["data"])
+        except Exception as e:
+            logger.warning("Cache invalidation listener error", error=str(e))
+            local_cache.clear()
+            _listener_stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+def start_invalidation_listener() -> None:
+    """Запустить фоновый поток подписки на инвалидации L1"""
+    global _listener_thread
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(
+        target=_listen_invalidations, name="cache-invalidation-listener", daemon=True
+    )
+    _listener_thread.start()
 
+def stop_invalidation_listener(timeout: float = 2.0) -> None:
+    global _listener_thread
+    _listener_stop.set()
+    if _listener_thread is not None:
+        _listener_thread.join(timeout)
+        _listener_thread = None
@@ -1,24 +1,179 @@
+from typing import Any, Callable, Optional, TypeVar
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 from ..config import settings
+from .replicas import ReplicaSet
 
-# Добавляем параметры кодировки для PostgreSQL
-connect_args = {}
-if settings.DATABASE_URL.startswith("postgresql"):
-    connect_args = {"client_encoding": "utf8"}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    connect_args=connect_args,
-    echo=False
-)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+T = TypeVar("T")
+
+
+def _create_engine(url: str) -> Engine:
+    # Добавляем параметры кодировки для PostgreSQL
+    connect_args = {}
+    if url.startswith("postgresql"):
+        connect_args = {"client_encoding": "utf8"}
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=3600,
+        connect_args=connect_args,
+        echo=False
+    )
+
+
+# Ключ в Session.info: движок реплики, на который уходят чтения этой сессии
+REPLICA_BIND = "replica_bind"
+
+
+class RoutingSession(Session):
+    """Сессия с маршрутизацией: чтения — на реплику из use_replica(), запись и flush — на primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get(REPLICA_BIND)
+        if replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+engine = _create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
 class Base(DeclarativeBase): pass
-def get_db():
+
+# Асинхронные драйверы для синхронных URL
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """URL для create_async_engine: postgresql[+psycopg2] -> +asyncpg, sqlite -> +aiosqlite"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"no async driver for {parsed.get_backend_name()!r}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    options: dict[str, Any] = {"pool_pre_ping": True, "pool_recycle": 3600, "echo": False}
+    if not url.startswith("sqlite"):
+        # asyncpg сам работает в UTF-8, client_encoding ему не передаётся
+        options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+    return create_async_engine(url, **options)
+
+
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+if settings.DB_ASYNC:
+    async_engine = _create_async_engine(settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL))
+    # expire_on_commit=False: после commit атрибуты не перечитываются лениво вне greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, sync_session_class=RoutingSession,
+                                           autoflush=False, expire_on_commit=False)
+
+# Реплики чтения; RoutingSession получает синхронный Engine (у AsyncEngine — его sync_engine)
+_replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+if settings.DB_ASYNC:
+    _replica_binds = [_create_async_engine(async_database_url(url)).sync_engine for url in _replica_urls]
+else:
+    _replica_binds = [_create_engine(url) for url in _replica_urls]
+replicas = ReplicaSet(_replica_urls, _replica_binds, interval=settings.DB_REPLICA_HEALTH_INTERVAL)
+
+
+def use_replica(db: Session | AsyncSession) -> bool:
+    """Направить чтения сессии на здоровую реплику; False — реплик нет, читаем с primary"""
+    if not isinstance(db, (Session, AsyncSession)):
+        return False
+    bind = replicas.pick()
+    if bind is None:
+        return False
+    db.info[REPLICA_BIND] = bind
+    return True
+
+
+def use_primary(db: Session | AsyncSession) -> None:
+    """Вернуть чтения сессии на primary (отменить use_replica)"""
+    db.info.pop(REPLICA_BIND, None)
+
+
+async def get_db():
+    if AsyncSessionLocal is not None:
+        # Соединение берётся из пула только при первом запросе к БД
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    # Async-зависимость не уходит в threadpool: сессия ленивая и не берёт соединение,
+    # пока к ней не обратились, поэтому попадание в кэш обходится без переключения потоков
     db = SessionLocal()
     try: yield db
-    finally: db.close()
+    finally:
+        if db.in_transaction():
+            # Возврат соединения в пул делает ROLLBACK — это I/O, не блокируем event loop
+            await run_in_threadpool(db.close)
+        else:
+            db.close()
+
+
+async def run_db(db: Session | AsyncSession, fn: Callable[..., T], *args) -> T:
+    """Выполнить fn(db, *args), не блокируя event loop, и сразу вернуть соединение в пул.
+
+    С AsyncSession fn получает её синхронный фасад через run_sync и ходит в БД
+    асинхронным драйвером прямо в event loop; с обычной Session — в threadpool.
+    Сессия закрывается в том же потоке: если ждать teardown зависимости, которому
+    самому нужен поток, занятые ожиданием пула потоки блокируют возврат соединений.
+    Возвращённые объекты остаются с загруженными атрибутами.
+    """
+    if isinstance(db, AsyncSession):
+        try:
+            return await db.run_sync(fn, *args)
+        finally:
+            await db.close()
+
+    def call() -> T:
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    return await run_in_threadpool(call)
+
+
+def get_session_factory():
+    """Фабрика сессий для потоковых эндпоинтов: их тело отдаётся после закрытия сессии запроса"""
+    return SessionLocal
+
+
+def get_fill_session_factory():
+    """Фабрика сессий для заполнения кэша: single-flight разделяет загрузку между
+    запросами, и сессия запроса, начавшего её, может закрыться раньше, чем она закончится"""
+    return AsyncSessionLocal or SessionLocal
+
+
+async def arun_in_session(session_factory, fn: Callable[..., T], *args, replica: bool = False) -> T:
+    """Выполнить fn(db, *args) в собственной сессии фабрики (Session или AsyncSession).
+
+    replica=True направляет чтения сессии на здоровую реплику, если она есть.
+    """
+    db = session_factory()
+    if replica:
+        use_replica(db)
+    return await run_db(db, fn, *args)
+
+
+def run_with_session(fn, *args):
+    """Выполнить fn(db, *args) в собственной сессии — для фоновых задач вне запроса"""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+async def arun_with_session(fn: Callable[..., T], *args) -> T:
+    """Асинхронная версия run_with_session: сессия из того же движка, что и у запросов"""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+    return await run_in_threadpool(run_with_session, fn, *args)
@@ -18,10 +18,28 @@ http_request_duration_seconds = Histogram(
 # Метрики для кэша
 cache_hits_total = Counter('cache_hits_total', 'Total cache hits')
 cache_misses_total = Counter('cache_misses_total', 'Total cache misses')
+cache_tier_hits_total = Counter('cache_tier_hits_total', 'Cache hits per tier', ['tier'])
+cache_tier_misses_total = Counter('cache_tier_misses_total', 'Cache misses per tier', ['tier'])
+cache_coalesced_waiters_total = Counter(
+    'cache_coalesced_waiters_total',
+    'Requests that waited for a concurrent recomputation instead of querying the DB',
+    ['scope']
+)
+cache_refreshes_total = Counter(
+    'cache_refreshes_total',
+    'Background cache refreshes (stale-while-revalidate or early XFetch)',
+    ['reason']
+)
+cache_warmed_total = Counter('cache_warmed_total', 'Cache entries preloaded by the warmer', ['trigger'])
+
+# Метрики кэша проверенных JWT
+jwt_cache_hits_total = Counter('jwt_cache_hits_total', 'Bearer tokens served from the verified-token cache')
+jwt_cache_misses_total = Counter('jwt_cache_misses_total', 'Bearer tokens verified with a full JWT decode')
 
 # Метрики для БД
 db_queries_total = Counter('db_queries_total', 'Total database queries')
 db_query_duration_seconds = Histogram('db_query_duration_seconds', 'Database query duration in seconds')
+db_read_routing_total = Counter('db_read_routing_total', 'Read requests routed to the primary or a replica', ['target'])
 
 # Метрики для активных соединений
 active_connections = Gauge('active_connections', 'Active database connections')
@@ -1,7 +1,9 @@
 # src/infrastructure/models.py
 from __future__ import annotations
 
-from sqlalchemy import String, Text, ForeignKey, Integer
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, String, Text, ForeignKey, Integer
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column, relationship
 
 Base = declarative_base()
@@ -13,6 +15,14 @@ class CourseORM(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Агрегаты по урокам: обновляются при записи уроков, а не считаются на чтении
+    lesson_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    content_length: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        default=lambda: datetime.now(timezone.utc),
+    )
 
     lessons: Mapped[list["LessonORM"]] = relationship(
         "LessonORM",
@@ -0,0 +1,59 @@
+import asyncio
+import time
+from collections import Counter
+
+import structlog
+
+from .cache import get_async_redis
+
+logger = structlog.get_logger()
+
+
+class HitCounter:
+    """Дешёвый счётчик обращений: инкремент в памяти процесса, сброс в Redis ZSET пачкой.
+
+    Запрос не ходит в Redis: накопленные счётчики уходят одним pipeline не чаще
+    раза в flush_interval секунд. В ZSET хранятся только keep самых частых
+    членов, поэтому он не растёт с каталогом; рейтинг переживает рестарт и
+    общий для всех реплик сервиса.
+    """
+
+    def __init__(self, key: str, flush_interval: float = 10.0, keep: int = 1000):
+        self.key = key
+        self._flush_interval = flush_interval
+        self._keep = keep
+        self._counts: Counter[str] = Counter()
+        self._last_flush = time.monotonic()
+        self._flushing: set[asyncio.Task] = set()
+
+    def hit(self, member: str) -> None:
+        self._counts[member] += 1
+        if not self._flushing and time.monotonic() - self._last_flush >= self._flush_interval:
+            task = asyncio.ensure_future(self.flush())
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            for member, count in counts.items():
+                pipe.zincrby(self.key, count, member)
+            pipe.zremrangebyrank(self.key, 0, -self._keep - 1)
+            await pipe.execute()
+        except Exception as e:
+            # Счётчики приблизительные: потеря одной пачки не критична
+            logger.warning("Hit counter flush failed", key=self.key, error=str(e))
+
+    async def top(self, k: int) -> list[str]:
+        """k самых частых членов; без Redis — по счётчикам этого процесса"""
+        if k <= 0:
+            return []
+        try:
+            members = await get_async_redis().zrevrange(self.key, 0, k - 1)
+            return [m.decode() if isinstance(m, bytes) else m for m in members]
+        except Exception:
+            return [member for member, _ in self._counts.most_common(k)]
@@ -0,0 +1,79 @@
+import itertools
+import threading
+from typing import Generic, Optional, Sequence, TypeVar
+
+import structlog
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class ReplicaSet(Generic[T]):
+    """Round-robin по здоровым репликам чтения.
+
+    Здоровье проверяет фоновый поток: раз в interval секунд выполняет SELECT 1
+    на каждой реплике через отдельное соединение без пула. Упавшая реплика
+    исключается из ротации до первой успешной проверки; если здоровых нет,
+    pick() возвращает None и чтение уходит на primary.
+    """
+
+    def __init__(self, urls: Sequence[str], binds: Sequence[T], interval: float = 5.0, timeout: float = 2.0):
+        self._urls = list(urls)
+        self._binds = list(binds)
+        self._healthy = [True] * len(self._binds)
+        self._counter = itertools.count()
+        self._interval = interval
+        self._timeout = timeout
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._binds)
+
+    def pick(self) -> Optional[T]:
+        healthy = [bind for bind, ok in zip(self._binds, self._healthy) if ok]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def check(self) -> None:
+        """Один проход проверок здоровья (вызывается фоновым потоком)"""
+        for i, url in enumerate(self._urls):
+            ok = self._probe(url)
+            if ok != self._healthy[i]:
+                logger.warning("Read replica health changed", replica=i, healthy=ok)
+            self._healthy[i] = ok
+
+    def _probe(self, url: str) -> bool:
+        connect_args = {"connect_timeout": int(self._timeout)} if url.startswith("postgresql") else {}
+        probe = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+        try:
+            with probe.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+        finally:
+            probe.dispose()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self._interval)
+
+    def start(self) -> None:
+        """Запустить фоновый поток проверок здоровья"""
+        if not self._binds or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,156 @@
+import re
+from typing import Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from .metrics import db_queries_total
+
+logger = structlog.get_logger()
+
+# Полнотекстовый поиск по курсам и урокам.
+# PostgreSQL: GIN-индексы по выражениям to_tsvector (без новых колонок, create_all не нужен).
+# SQLite (тесты/dev): FTS5-таблицы с внешним содержимым, синхронизируемые триггерами.
+
+if not re.fullmatch(r"[a-z_]+", settings.SEARCH_TS_CONFIG):
+    raise ValueError(f"invalid SEARCH_TS_CONFIG: {settings.SEARCH_TS_CONFIG!r}")
+
+_CFG = f"'{settings.SEARCH_TS_CONFIG}'::regconfig"
+
+
+def _weighted_vector(prefix: str, *columns: tuple[str, str]) -> str:
+    return " || ".join(
+        f"setweight(to_tsvector({_CFG}, coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+# Выражения в запросе должны совпадать с индексными, иначе планировщик не возьмёт GIN
+_COURSE_COLUMNS = (("title", "A"), ("description", "B"))
+_LESSON_COLUMNS = (("title", "C"), ("content", "D"))
+_COURSE_VECTOR = _weighted_vector("c.", *_COURSE_COLUMNS)
+_LESSON_VECTOR = _weighted_vector("l.", *_LESSON_COLUMNS)
+
+_PG_SETUP = [
+    f"CREATE INDEX IF NOT EXISTS ix_courses_fts ON courses USING GIN (({_weighted_vector('', *_COURSE_COLUMNS)}))",
+    f"CREATE INDEX IF NOT EXISTS ix_lessons_fts ON lessons USING GIN (({_weighted_vector('', *_LESSON_COLUMNS)}))",
+]
+
+_SQLITE_TABLES = {
+    "courses_fts": ("courses", ("title", "description")),
+    "lessons_fts": ("lessons", ("title", "content")),
+}
+
+# Совпадения в уроках весят меньше, чем в самом курсе
+_LESSON_WEIGHT = 0.5
+
+_PAGE = """
+ranked AS (SELECT course_id, max(score) AS rank FROM hits GROUP BY course_id)
+SELECT c.id, c.title, c.description, r.rank
+FROM ranked r JOIN courses c ON c.id = r.course_id
+WHERE :after_rank IS NULL OR r.rank < :after_rank OR (r.rank = :after_rank AND c.id > :after_id)
+ORDER BY r.rank DESC, c.id
+LIMIT :limit
+"""
+
+_PG_SEARCH = text(f"""
+WITH query AS (SELECT websearch_to_tsquery({_CFG}, :q) AS q),
+hits AS (
+    SELECT c.id AS course_id, CAST(ts_rank({_COURSE_VECTOR}, query.q) AS double precision) AS score
+    FROM courses c, query WHERE {_COURSE_VECTOR} @@ query.q
+    UNION ALL
+    SELECT l.course_id, CAST(ts_rank({_LESSON_VECTOR}, query.q) * {_LESSON_WEIGHT} AS double precision)
+    FROM lessons l, query WHERE {_LESSON_VECTOR} @@ query.q
+),
+{_PAGE}""")
+
+_SQLITE_SEARCH = text(f"""
+WITH hits AS (
+    SELECT rowid AS course_id, -bm25(courses_fts, 2.0, 1.0) AS score
+    FROM courses_fts WHERE courses_fts MATCH :q
+    UNION ALL
+    SELECT l.course_id, -bm25(lessons_fts, 1.0, 0.5) * {_LESSON_WEIGHT}
+    FROM lessons_fts JOIN lessons l ON l.id = lessons_fts.rowid WHERE lessons_fts MATCH :q
+),
+{_PAGE}""")
+
+
+def _setup_sqlite(conn: Connection) -> None:
+    for fts, (table, columns) in _SQLITE_TABLES.items():
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+        ).first()
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+        ))
+        if not exists:
+            # Таблица появилась поверх существующих данных — индексируем их
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def setup_search(engine: Engine) -> None:
+    """Создать индексы полнотекстового поиска (идемпотентно, вызывается на старте)"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for statement in _PG_SETUP:
+                conn.execute(text(statement))
+        elif engine.dialect.name == "sqlite":
+            _setup_sqlite(conn)
+        else:
+            logger.warning("Full-text search is not supported", dialect=engine.dialect.name)
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    """Слова запроса как фразы FTS5 через AND: пользовательский ввод не трактуется как синтаксис"""
+    tokens = re.findall(r"\w+", q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def search_courses(
+    db: Session,
+    q: str,
+    limit: int,
+    after: Optional[tuple[float, int]] = None,
+) -> list[dict]:
+    """Курсы, у которых запрос находится в самом курсе или в его уроках.
+
+    Сортировка по релевантности (rank по убыванию, затем id); after — позиция
+    (rank, id) последнего результата предыдущей страницы.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement, query = _PG_SEARCH, q
+    elif dialect == "sqlite":
+        statement, query = _SQLITE_SEARCH, _fts5_query(q)
+        if query is None:
+            return []
+    else:
+        raise RuntimeError(f"full-text search is not supported for {dialect}")
+
+    after_rank, after_id = after if after is not None else (None, None)
+    db_queries_total.inc()
+    rows = db.execute(statement, {
+        "q": query, "limit": limit, "after_rank": after_rank, "after_id": after_id,
+    }).mappings().all()
+    return [dict(row) for row in rows]
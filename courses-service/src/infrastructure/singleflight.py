@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from .metrics import cache_coalesced_waiters_total
+
+
+class SingleFlight:
+    """Объединяет конкурентные вычисления одного ключа внутри процесса.
+
+    Первый запрос запускает вычисление отдельной задачей, остальные ждут её
+    результата. Задача не отменяется вместе с запросом-инициатором, поэтому
+    отключение одного клиента не роняет запросы остальных.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            cache_coalesced_waiters_total.labels(scope="local").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Если все ожидающие отменены, исключение никто не заберёт — не шумим в лог
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
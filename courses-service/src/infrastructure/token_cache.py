@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ..config import settings
+from .metrics import jwt_cache_hits_total, jwt_cache_misses_total
+
+
+def token_digest(token: str) -> bytes:
+    # Ключ — дайджест, а не сам токен: в памяти процесса не лежат годные bearer-токены
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """LRU уже проверенных JWT: дайджест токена → claims, запись живёт до exp токена.
+
+    Один и тот же токен приходит с каждым запросом сессии; попадание избавляет
+    от проверки HMAC и разбора claims. Кэшируются только валидные токены с exp —
+    неверная подпись или истёкший токен каждый раз проверяются заново.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, tuple[float, dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        if self.maxsize <= 0:
+            return None
+        key = token_digest(token)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] <= time.time():
+                del self._data[key]
+                item = None
+            if item is None:
+                jwt_cache_misses_total.inc()
+                return None
+            self._data.move_to_end(key)
+        jwt_cache_hits_total.inc()
+        # Копия: зависимости не должны менять общую запись
+        return dict(item[1])
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = token_digest(token)
+        with self._lock:
+            self._data[key] = (float(exp), dict(claims))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+token_cache = TokenCache(settings.JWT_CACHE_MAXSIZE)
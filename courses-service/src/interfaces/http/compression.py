@@ -0,0 +1,61 @@
+import gzip
+from typing import Optional
+
+from fastapi import Request
+
+from ...config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него отдаём только gzip
+    brotli = None
+
+# Порядок — предпочтение сервера при равных q в Accept-Encoding
+ENCODINGS = ("br", "gzip")
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    """Сжатые варианты тела; считаются один раз при заполнении кэша.
+
+    Маленькие тела и варианты, не ставшие меньше, не сохраняются.
+    """
+    if len(body) < settings.COMPRESS_MIN_SIZE:
+        return {}
+    variants = {}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=settings.COMPRESS_BROTLI_QUALITY)
+    # mtime=0: одинаковое тело даёт одинаковые байты на всех репликах
+    variants["gzip"] = gzip.compress(body, compresslevel=settings.COMPRESS_GZIP_LEVEL, mtime=0)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def choose_encoding(request: Request, available) -> Optional[str]:
+    """Лучшее из available по Accept-Encoding (RFC 9110 §12.5.3); None — без сжатия"""
+    header = request.headers.get("accept-encoding")
+    if not header or not available:
+        return None
+    weights = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding in available:
+            q = weights.get(encoding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """У каждого представления свой сильный ETag: "{digest}-gzip", "{digest}-br" """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
@@ -0,0 +1,26 @@
+import hashlib
+
+from fastapi import Request
+
+
+def make_etag(version_key: str, body: bytes) -> str:
+    """Сильный ETag: версия из ключа кэша (поколение пространства имён) плюс дайджест тела.
+
+    Поколение меняется при каждой записи через admin CRUD, дайджест страхует от
+    совпадения номеров поколений после сброса счётчиков в Redis.
+    """
+    digest = hashlib.blake2b(version_key.encode(), digest_size=16)
+    digest.update(body)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверка If-None-Match (слабое сравнение, RFC 9110 §13.1.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Прокси со сжатием ослабляют тег до W/"..." — сравниваем без префикса
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
@@ -0,0 +1,71 @@
+import hashlib
+import hmac
+import time
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...infrastructure.db import get_db, replicas, use_primary, use_replica
+from ...infrastructure.metrics import db_read_routing_total
+
+# Read-your-writes: после записи админ какое-то время читает с primary.
+# Состояние хранится в cookie клиента, поэтому работает на любой реплике сервиса.
+# Значение подписано SECRET_KEY: иначе любой клиент обходил бы кэш и реплики,
+# выставив себе далёкий срок.
+PRIMARY_STICKY_COOKIE = "courses_primary_until"
+
+
+def _sign(until: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"{PRIMARY_STICKY_COOKIE}:{until}".encode(), hashlib.sha256).hexdigest()
+
+
+def _read_your_writes_enabled() -> bool:
+    return settings.DB_READ_YOUR_WRITES_TTL > 0 and bool(len(replicas))
+
+
+def stick_to_primary(response: Response) -> None:
+    """Зависимость admin-записей: следующие DB_READ_YOUR_WRITES_TTL секунд клиент читает с primary"""
+    if not _read_your_writes_enabled():
+        return
+    ttl = settings.DB_READ_YOUR_WRITES_TTL
+    until = str(int(time.time()) + ttl)
+    response.set_cookie(PRIMARY_STICKY_COOKIE, f"{until}.{_sign(until)}",
+                        max_age=ttl, path="/api/courses", httponly=True, samesite="lax")
+
+
+def is_primary_sticky(request: Request) -> bool:
+    """Клиент недавно писал: cookie выдана этим сервисом и её срок не истёк"""
+    if not _read_your_writes_enabled():
+        return False
+    until, _, signature = request.cookies.get(PRIMARY_STICKY_COOKIE, "").partition(".")
+    if not hmac.compare_digest(signature.encode(), _sign(until).encode()):
+        return False
+    try:
+        return int(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request, db: Session | AsyncSession = Depends(get_db)) -> Session | AsyncSession:
+    """Сессия для чтения: на реплике, если клиент недавно ничего не записывал"""
+    if not is_primary_sticky(request) and use_replica(db):
+        request.state.replica_session = db
+        db_read_routing_total.labels(target="replica").inc()
+    else:
+        db_read_routing_total.labels(target="primary").inc()
+    return db
+
+
+def reads_from_replica(request: Request) -> bool:
+    return getattr(request.state, "replica_session", None) is not None
+
+
+def switch_to_primary(request: Request) -> None:
+    """Дальнейшие чтения запроса — с primary: реплика может ещё не видеть недавнюю запись"""
+    db = getattr(request.state, "replica_session", None)
+    if db is None:
+        return
+    use_primary(db)
+    request.state.replica_session = None
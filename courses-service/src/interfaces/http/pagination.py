@@ -0,0 +1,51 @@
+import base64
+import json
+
+from fastapi import HTTPException
+
+# Заголовок с курсором следующей страницы: тело ответа остаётся списком
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode(position: dict) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise HTTPException(400, "invalid cursor")
+    if not isinstance(position, dict):
+        raise HTTPException(400, "invalid cursor")
+    return position
+
+
+def _check_id(value) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise HTTPException(400, "invalid cursor")
+    return value
+
+
+def encode_cursor(last_id: int) -> str:
+    """Непрозрачный курсор: клиент передаёт его обратно в ?after= как есть"""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    return _check_id(_decode(cursor).get("id"))
+
+
+def encode_rank_cursor(rank: float, last_id: int) -> str:
+    """Курсор для выдачи, отсортированной по (rank DESC, id)"""
+    return _encode({"r": rank, "id": last_id})
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    position = _decode(cursor)
+    rank = position.get("r")
+    if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+        raise HTTPException(400, "invalid cursor")
+    return float(rank), _check_id(position.get("id"))
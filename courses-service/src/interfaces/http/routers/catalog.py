@@ -0,0 +1,163 @@
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from ....infrastructure.aggregates import recount_course_aggregates
+from ....infrastructure.db import get_session_factory
+from ....infrastructure.models import Course, Lesson
+from ....infrastructure.cache import invalidate_namespaces
+from ....infrastructure.metrics import db_queries_total
+from ....infrastructure.serialization import dumps, loads
+from ..authz import require_admin
+from ..consistency import stick_to_primary
+from ..schemas import CourseOut, LessonOut
+from .courses import COURSES_LIST_NS, COURSES_SEARCH_NS, course_ns, schedule_rewarm
+
+# Выгрузка и загрузка всего каталога в NDJSON для ночных синхронизаций.
+# Формат: строка {"type": "course", ...}, за ней строки {"type": "lesson", ...} её уроков.
+
+router = APIRouter(prefix="/api/courses", tags=["catalog"], dependencies=[Depends(require_admin)])
+
+NDJSON = "application/x-ndjson"
+# Сколько строк читаем из курсора и пишем в БД за раз: память не зависит от размера каталога
+EXPORT_BATCH = 1000
+IMPORT_BATCH = 500
+
+
+def _line(kind: str, item) -> bytes:
+    return dumps({"type": kind, **item.model_dump()}) + b"\n"
+
+
+def _export_lines(session_factory: sessionmaker) -> Iterator[bytes]:
+    """Два серверных курсора (курсы и уроки, оба по course_id) сливаются в один поток"""
+    with session_factory() as db:
+        db_queries_total.inc(2)
+        courses = db.execute(
+            select(Course.id, Course.title, Course.description)
+            .order_by(Course.id)
+            .execution_options(yield_per=EXPORT_BATCH)
+        )
+        lessons = db.execute(
+            select(Lesson.id, Lesson.course_id, Lesson.title, Lesson.content, Lesson.order)
+            .order_by(Lesson.course_id, Lesson.order, Lesson.id)
+            .execution_options(yield_per=EXPORT_BATCH)
+        )
+        lesson = next(lessons, None)
+        for course in courses:
+            yield _line("course", CourseOut.model_validate(course))
+            # Уроки, чей курс меньше текущего, принадлежат удалённым во время выгрузки курсам
+            while lesson is not None and lesson.course_id <= course.id:
+                if lesson.course_id == course.id:
+                    yield _line("lesson", LessonOut.model_validate(lesson))
+                lesson = next(lessons, None)
+
+
+@router.get("/export")
+def export_catalog(session_factory: sessionmaker = Depends(get_session_factory)):
+    # Своя сессия внутри генератора: сессия запроса закрывается до начала отдачи тела
+    return StreamingResponse(_export_lines(session_factory), media_type=NDJSON)
+
+
+def _upsert(db: Session, model, rows: list[dict]) -> None:
+    if not rows:
+        return
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model).values(rows)
+    columns = {c: stmt.excluded[c] for c in rows[0] if c != "id"}
+    db_queries_total.inc()
+    db.execute(stmt.on_conflict_do_update(index_elements=["id"], set_=columns))
+
+
+def _reset_sequences(db: Session) -> None:
+    """После вставки явных id в PostgreSQL сдвигаем последовательности, иначе новые записи упадут"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("courses", "lessons"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+        ))
+
+
+@router.post("/import", dependencies=[Depends(stick_to_primary)])
+async def import_catalog(request: Request, session_factory: sessionmaker = Depends(get_session_factory)):
+    # Тело читается потоком и пишется пачками UPSERT в одной транзакции
+    db = session_factory()
+    courses, lessons = [], []
+    touched: set[int] = set()
+    counts = {"courses": 0, "lessons": 0}
+
+    def flush() -> None:
+        # Курсы раньше уроков: урок может ссылаться на курс из той же пачки
+        _upsert(db, Course, courses)
+        _upsert(db, Lesson, lessons)
+        counts["courses"] += len(courses)
+        counts["lessons"] += len(lessons)
+        courses.clear()
+        lessons.clear()
+
+    def parse(line: bytes, number: int) -> None:
+        try:
+            record = loads(line)
+            kind = record.pop("type")
+            if kind == "course":
+                item = CourseOut.model_validate(record)
+                courses.append(item.model_dump())
+                touched.add(item.id)
+            elif kind == "lesson":
+                item = LessonOut.model_validate(record)
+                lessons.append(item.model_dump())
+                touched.add(item.course_id)
+            else:
+                raise ValueError(f"unknown type {kind!r}")
+        except (ValueError, KeyError, TypeError, AttributeError, ValidationError) as e:
+            raise HTTPException(400, f"line {number}: {e}")
+
+    try:
+        # Переносы ищутся только в новом куске, недописанная строка копится в bytearray:
+        # длинная строка из многих кусков не копируется и не просматривается заново на каждом
+        tail, number = bytearray(), 0
+        async for chunk in request.stream():
+            *lines, rest = chunk.split(b"\n")
+            if lines:
+                tail += lines[0]
+                lines[0] = bytes(tail)
+                tail = bytearray(rest)
+            else:
+                tail += rest
+            for line in lines:
+                number += 1
+                if line.strip():
+                    parse(line, number)
+            if len(courses) + len(lessons) >= IMPORT_BATCH:
+                await run_in_threadpool(flush)
+        if tail.strip():
+            parse(bytes(tail), number + 1)
+        await run_in_threadpool(flush)
+        await run_in_threadpool(recount_course_aggregates, db, touched)
+        await run_in_threadpool(_reset_sequences, db)
+        await run_in_threadpool(db.commit)
+    except IntegrityError as e:
+        await run_in_threadpool(db.rollback)
+        # Например, урок ссылается на курс, которого нет ни в БД, ни в выгрузке
+        raise HTTPException(409, f"integrity error: {e.orig}")
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+    finally:
+        await run_in_threadpool(db.close)
+
+    await run_in_threadpool(_invalidate, touched)
+    schedule_rewarm([COURSES_LIST_NS, *map(course_ns, touched)])
+    return counts
+
+
+def _invalidate(course_ids: set[int]) -> None:
+    invalidate_namespaces([COURSES_LIST_NS, COURSES_SEARCH_NS, *map(course_ns, sorted(course_ids))])
@@ -1,114 +1,525 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.orm import Session
-from ....infrastructure.db import get_db
+import asyncio
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime
+from functools import partial
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from typing import Iterable, Literal, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from starlette.concurrency import run_in_threadpool
+from ....config import settings
+from ....infrastructure.aggregates import bump_course_aggregates, recount_course_aggregates, utcnow
+from ....infrastructure.db import arun_in_session, arun_with_session, get_db, get_fill_session_factory, run_db
 from ....infrastructure.models import Course, Lesson
-from ....infrastructure.cache import get_cache, set_cache, delete_cache_pattern
-from ....infrastructure.metrics import cache_hits_total, cache_misses_total, db_queries_total
-from ..schemas import CourseOut, CourseCreate, CourseUpdate, LessonCreate, LessonUpdate, LessonOut
+from ....infrastructure.search import search_courses
+from ....infrastructure.cache import (
+    CachedPayload, aget_many, aget_or_load, arecently_written, aset_many, aversioned_key,
+    invalidate_namespace,
+)
+from ....infrastructure.metrics import cache_misses_total, cache_warmed_total, db_queries_total
+from ....infrastructure.popularity import HitCounter
+from ..schemas import CourseOut, CourseDetailOut, CourseSearchOut, CourseCreate, CourseUpdate, LessonCreate, LessonUpdate, LessonOut, LessonSummaryOut, LessonBulkRequest
 from ..authz import require_admin
+from ..consistency import get_read_db, is_primary_sticky, reads_from_replica, stick_to_primary, switch_to_primary
+from ..compression import choose_encoding, compress_variants, variant_etag
+from ..conditional import etag_matches, make_etag
+from ..pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, decode_rank_cursor, encode_rank_cursor,
+)
 
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
+# Пространства имён кэша: запись инвалидирует их целиком сменой поколения
+COURSES_LIST_NS = "courses:list"
+# Результаты поиска зависят от любых курсов и уроков — сбрасываются при каждой записи
+COURSES_SEARCH_NS = "courses:search"
+
+def course_ns(course_id: int) -> str:
+    return f"course:{course_id}"
+
+# Обращения к урокам курсов ("{course_id}:{view}") — по ним прогреваются популярные курсы
+lesson_hits = HitCounter("courses:lessons:hits", flush_interval=settings.CACHE_HITS_FLUSH_INTERVAL)
+
 @router.get("/health")
 def health(): return {"status":"ok"}
 
-@router.get("", response_model=list[CourseOut])
-def list_courses(db: Session = Depends(get_db),
-                 limit: int = Query(10, ge=1, le=100),
-                 offset: int = Query(0, ge=0)):
-    # Кэширование списка курсов
-    cache_key = f"courses:list:{limit}:{offset}"
-    cached = get_cache(cache_key)
-    if cached:
-        cache_hits_total.inc()
-        return cached
-    
-    cache_misses_total.inc()
+# Ответы кэшируются готовыми JSON-байтами: сериализация — один проход pydantic-core на промахе
+_courses_adapter = TypeAdapter(list[CourseOut])
+_lessons_adapter = TypeAdapter(list[LessonOut])
+_lesson_summaries_adapter = TypeAdapter(list[LessonSummaryOut])
+_lesson_adapter = TypeAdapter(LessonOut)
+_course_adapter = TypeAdapter(CourseOut)
+_course_detail_adapter = TypeAdapter(CourseDetailOut)
+_search_adapter = TypeAdapter(list[CourseSearchOut])
+
+def _load_courses(db: Session, limit: int, offset: int, after_id: int | None = None) -> CachedPayload:
     db_queries_total.inc()
-    rows = db.query(Course).order_by(Course.id).limit(limit).offset(offset).all()
-    result = [CourseOut.model_validate(row) for row in rows]
-    set_cache(cache_key, [r.model_dump() for r in result])
-    return result
-
-@router.get("/{course_id}/lessons", response_model=list[LessonOut])
-def course_lessons(course_id: int, db: Session = Depends(get_db)):
-    # Кэширование уроков курса
-    cache_key = f"course:{course_id}:lessons"
-    cached = get_cache(cache_key)
-    if cached:
-        cache_hits_total.inc()
-        return cached
-    
-    cache_misses_total.inc()
+    query = db.query(Course).order_by(Course.id)
+    if after_id is not None:
+        # Keyset: поиск по первичному ключу вместо пропуска offset строк
+        query = query.filter(Course.id > after_id)
+    else:
+        query = query.offset(offset)
+    rows = query.limit(limit).all()
+    items = _courses_adapter.validate_python(rows, from_attributes=True)
+    headers = {}
+    # Неполная страница — последняя, курсор не нужен
+    if len(items) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].id)
+    return CachedPayload(_courses_adapter.dump_json(items), {"headers": headers})
+
+def _load_course(db: Session, course_id: int) -> CachedPayload:
+    db_queries_total.inc()
+    row = db.query(Course).filter(Course.id==course_id).first()
+    if not row: raise HTTPException(404, "course not found")
+    item = _course_detail_adapter.validate_python(row, from_attributes=True)
+    headers = {}
+    if item.updated_at is not None:
+        headers["Last-Modified"] = format_datetime(item.updated_at.astimezone(timezone.utc), usegmt=True)
+    return CachedPayload(_course_detail_adapter.dump_json(item), {"headers": headers})
+
+def _load_lessons(db: Session, course_id: int, summary: bool = False) -> CachedPayload:
     db_queries_total.inc()
     exists = db.query(Course.id).filter(Course.id==course_id).first()
     if not exists: raise HTTPException(404, "course not found")
-    rows = db.query(Lesson).filter(Lesson.course_id==course_id).order_by(Lesson.order).all()
-    result = [LessonOut.model_validate(row) for row in rows]
-    set_cache(cache_key, [r.model_dump() for r in result])
-    return result
+    query = db.query(Lesson).filter(Lesson.course_id==course_id).order_by(Lesson.order)
+    adapter = _lessons_adapter
+    if summary:
+        # content (Text) не читается из БД: остальные колонки отложены
+        query = query.options(load_only(Lesson.id, Lesson.title, Lesson.order))
+        adapter = _lesson_summaries_adapter
+    items = adapter.validate_python(query.all(), from_attributes=True)
+    return CachedPayload(adapter.dump_json(items))
+
+def _load_lesson(db: Session, course_id: int, lesson_id: int) -> CachedPayload:
+    db_queries_total.inc()
+    row = db.query(Lesson).filter(Lesson.id==lesson_id, Lesson.course_id==course_id).first()
+    if not row: raise HTTPException(404, "lesson not found")
+    return CachedPayload(_lesson_adapter.dump_json(_lesson_adapter.validate_python(row, from_attributes=True)))
+
+def _search(db: Session, q: str, limit: int, after: tuple[float, int] | None) -> CachedPayload:
+    items = _search_adapter.validate_python(search_courses(db, q, limit, after))
+    headers = {}
+    if len(items) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_rank_cursor(items[-1].rank, items[-1].id)
+    return CachedPayload(_search_adapter.dump_json(items), {"headers": headers})
+
+def _json_response(payload: CachedPayload, etag: str, encoding: str | None = None) -> Response:
+    """Отдаём байты как есть: FastAPI не валидирует и не сериализует Response повторно"""
+    headers = {**payload.meta.get("headers", {}), "ETag": etag}
+    body = payload.body
+    if payload.encoded:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        body = payload.encoded[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+def _with_etag(load, version_key: str | None):
+    """ETag считается один раз при заполнении и хранится в метаданных записи"""
+    async def tagged() -> CachedPayload:
+        payload = await load()
+        etag = make_etag(version_key or "", payload.body)
+        return CachedPayload(payload.body, {**payload.meta, "etag": etag}, payload.encoded)
+    return tagged
+
+def _for_cache(load, version_key: str):
+    """Загрузчик для заполнения кэша: ETag и сжатые варианты тела считаются здесь, а не на попадании"""
+    tagged = _with_etag(load, version_key)
+    async def filled() -> CachedPayload:
+        payload = await tagged()
+        encoded = await run_in_threadpool(compress_variants, payload.body)
+        return CachedPayload(payload.body, payload.meta, encoded)
+    return filled
+
+async def _fill_from_primary(request: Request, namespace: str) -> None:
+    """Промах в поколении моложе DB_READ_YOUR_WRITES_TTL читается с primary, а не с реплики"""
+    if reads_from_replica(request) and await arecently_written(namespace):
+        switch_to_primary(request)
+
+def _fill_loader(request: Request, sessions, namespace: str, fn, *args):
+    """Загрузчик промаха в собственной сессии, а не в сессии запроса: его результат ждут
+    все конкурентные промахи по ключу, а первый запрос может отключиться раньше"""
+    replica = reads_from_replica(request)
+    async def load() -> CachedPayload:
+        # Кэш нового поколения заполняется с primary, пока реплики могут отставать
+        from_replica = replica and not await arecently_written(namespace)
+        return await arun_in_session(sessions, fn, *args, replica=from_replica)
+    return load
+
+async def _cached(request: Request, db: Session | AsyncSession, sessions, namespace: str,
+                  cache_key: str | None, fn, *args) -> Response:
+    """Ответ fn(db, *args) через кэш; sessions — фабрика сессий для заполнения и фонового обновления"""
+    # Админ после записи читает мимо кэша: его запись ещё могла не дойти до реплик
+    if cache_key is None or is_primary_sticky(request):
+        cache_misses_total.inc()
+        payload = await _with_etag(lambda: run_db(db, fn, *args), None)()
+    else:
+        payload = await aget_or_load(cache_key, _for_cache(_fill_loader(request, sessions, namespace, fn, *args), cache_key),
+                                     refresh_loader=_for_cache(lambda: arun_in_session(sessions, fn, *args), cache_key))
+    # Записи, положенные до появления ETag, получают его на лету
+    etag = payload.meta.get("etag") or make_etag(cache_key or "", payload.body)
+    encoding = choose_encoding(request, payload.encoded)
+    etag = variant_etag(etag, encoding)
+    if etag_matches(request, etag):
+        # 304 без тела: ни БД, ни сериализации на попадании
+        headers = {"ETag": etag}
+        if payload.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return _json_response(payload, etag, encoding)
+
+async def _list_key(limit: int, offset: int, after_id: int | None = None) -> str | None:
+    if after_id is not None:
+        return await aversioned_key(COURSES_LIST_NS, "after", after_id, limit)
+    return await aversioned_key(COURSES_LIST_NS, limit, offset)
+
+async def _lessons_key(course_id: int, summary: bool) -> str | None:
+    return await aversioned_key(course_ns(course_id), "lessons", *(("summary",) if summary else ()))
+
+# Чтение из кэша выполняется в event loop; запрос к БД при промахе идёт через run_db:
+# в threadpool для Session или асинхронным драйвером для AsyncSession (DB_ASYNC).
+# Заполнение кэша открывает свою сессию из get_fill_session_factory
+
+@router.get("", response_model=list[CourseOut])
+async def list_courses(request: Request,
+                       db: Session | AsyncSession = Depends(get_read_db), sessions=Depends(get_fill_session_factory),
+                       limit: int = Query(10, ge=1, le=100),
+                       offset: int = Query(0, ge=0),
+                       after: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor")):
+    # Режим курсора (after=) или совместимый offset; курсор следующей страницы — в заголовке
+    after_id = decode_cursor(after) if after is not None else None
+    cache_key = await _list_key(limit, offset, after_id)
+    return await _cached(
+        request,
+        db,
+        sessions,
+        COURSES_LIST_NS,
+        cache_key,
+        _load_courses, limit, offset, after_id,
+    )
+
+@router.get("/search", response_model=list[CourseSearchOut])
+async def search(request: Request,
+                 db: Session | AsyncSession = Depends(get_read_db), sessions=Depends(get_fill_session_factory),
+                 q: str = Query(..., min_length=1, max_length=200),
+                 limit: int = Query(10, ge=1, le=100),
+                 after: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor")):
+    # Полнотекстовый поиск по курсам и урокам, по убыванию релевантности
+    position = decode_rank_cursor(after) if after is not None else None
+    query = " ".join(q.split())
+    # Текст запроса произвольный — в ключ кладём его дайджест
+    digest = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+    cache_key = await aversioned_key(COURSES_SEARCH_NS, digest, limit, *(position or ()))
+    return await _cached(
+        request,
+        db,
+        sessions,
+        COURSES_SEARCH_NS,
+        cache_key,
+        _search, query, limit, position,
+    )
+
+# Пакетная выдача: каждый курс — своя запись в поколении списка курсов,
+# поэтому все ключи пачки известны после одного чтения поколения
+BATCH_MAX_IDS = 100
+
+def _parse_ids(raw: str) -> list[int]:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(400, "invalid ids")
+    # Без повторов, в порядке первого вхождения
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(400, f"ids must contain 1 to {BATCH_MAX_IDS} course ids")
+    return ids
+
+def _load_course_items(db: Session, ids: list[int]) -> dict[int, CachedPayload]:
+    db_queries_total.inc()
+    rows = db.query(Course).filter(Course.id.in_(ids)).all()
+    return {
+        row.id: CachedPayload(_course_adapter.dump_json(_course_adapter.validate_python(row, from_attributes=True)))
+        for row in rows
+    }
+
+@router.get("/batch", response_model=list[CourseOut])
+async def batch_courses(request: Request,
+                        db: Session | AsyncSession = Depends(get_read_db),
+                        ids: str = Query(..., description=f"id курсов через запятую, не больше {BATCH_MAX_IDS}")):
+    # Попадания — один MGET, промахи — один SELECT ... IN и один pipeline в Redis.
+    # Курсы в порядке ids, несуществующие пропускаются
+    ids = _parse_ids(ids)
+    prefix = None if is_primary_sticky(request) else await aversioned_key(COURSES_LIST_NS, "item")
+    found: dict[int, CachedPayload] = {}
+    if prefix is None:
+        cache_misses_total.inc(len(ids))
+    else:
+        keys = {course_id: f"{prefix}:{course_id}" for course_id in ids}
+        cached = await aget_many(list(keys.values()))
+        found = {course_id: cached[key] for course_id, key in keys.items() if key in cached}
+    missing = [course_id for course_id in ids if course_id not in found]
+    if missing:
+        if prefix is not None:
+            await _fill_from_primary(request, COURSES_LIST_NS)
+        loaded = await run_db(db, _load_course_items, missing)
+        found.update(loaded)
+        if prefix is not None:
+            await aset_many({keys[course_id]: payload for course_id, payload in loaded.items()})
+    body = b"[" + b",".join(found[course_id].body for course_id in ids if course_id in found) + b"]"
+    etag = make_etag(prefix or "", body)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+@router.get("/{course_id}", response_model=CourseDetailOut)
+async def get_course(course_id: int, request: Request, db: Session | AsyncSession = Depends(get_read_db), sessions=Depends(get_fill_session_factory)):
+    # Курс с агрегатами по урокам; запись в пространстве имён курса сбрасывается любой записью его уроков
+    cache_key = await aversioned_key(course_ns(course_id), "detail")
+    return await _cached(
+        request,
+        db,
+        sessions,
+        course_ns(course_id),
+        cache_key,
+        _load_course, course_id,
+    )
+
+@router.get("/{course_id}/lessons", response_model=list[LessonOut] | list[LessonSummaryOut])
+async def course_lessons(course_id: int, request: Request, db: Session | AsyncSession = Depends(get_read_db), sessions=Depends(get_fill_session_factory),
+                         view: Literal["full", "summary"] = Query("full", description="summary — без content")):
+    # Кэширование уроков курса; summary-страница — отдельная, много меньшая запись
+    summary = view == "summary"
+    cache_key = await _lessons_key(course_id, summary)
+    response = await _cached(
+        request,
+        db,
+        sessions,
+        course_ns(course_id),
+        cache_key,
+        _load_lessons, course_id, summary,
+    )
+    # Считаем только существующие курсы: 404 не попадает в рейтинг прогрева
+    lesson_hits.hit(f"{course_id}:{view}")
+    return response
+
+@router.get("/{course_id}/lessons/{lesson_id}", response_model=LessonOut)
+async def get_lesson(course_id: int, lesson_id: int, request: Request, db: Session | AsyncSession = Depends(get_read_db), sessions=Depends(get_fill_session_factory)):
+    # Свой ключ на урок в пространстве имён курса: инвалидируется вместе с уроками курса
+    cache_key = await aversioned_key(course_ns(course_id), "lesson", lesson_id)
+    return await _cached(
+        request,
+        db,
+        sessions,
+        course_ns(course_id),
+        cache_key,
+        _load_lesson, course_id, lesson_id,
+    )
+
+# --- Прогрев кэша:
+# Первые страницы каталога и уроки самых запрашиваемых курсов — на старте сервиса
+# и сразу после того, как admin-запись инвалидировала их пространства имён
+
+_warm_tasks: set[asyncio.Task] = set()
+
+def _warm_page_sizes() -> list[int]:
+    return [int(size) for size in settings.CACHE_WARM_PAGE_SIZES.split(",") if size.strip()]
+
+async def _popular_lessons() -> list[tuple[int, bool]]:
+    popular = []
+    for member in await lesson_hits.top(settings.CACHE_WARM_TOP_LESSONS):
+        course_id, _, view = member.partition(":")
+        if course_id.isdigit() and view in ("full", "summary"):
+            popular.append((int(course_id), view == "summary"))
+    return popular
+
+async def warm_cache(namespaces: Optional[Iterable[str]] = None, trigger: str = "startup") -> int:
+    """Заполнить кэш первыми страницами каталога и уроками популярных курсов.
+
+    namespaces ограничивает прогрев только что инвалидированными пространствами
+    имён. Данные читаются с primary. Возвращает число прогретых записей.
+    """
+    namespaces = None if namespaces is None else set(namespaces)
+    jobs = []
+    if namespaces is None or COURSES_LIST_NS in namespaces:
+        for limit in _warm_page_sizes():
+            for page in range(settings.CACHE_WARM_PAGES):
+                offset = page * limit
+                jobs.append((partial(_list_key, limit, offset), partial(_load_courses, limit=limit, offset=offset)))
+    for course_id, summary in await _popular_lessons():
+        if namespaces is None or course_ns(course_id) in namespaces:
+            jobs.append((partial(_lessons_key, course_id, summary),
+                         partial(_load_lessons, course_id=course_id, summary=summary)))
+
+    slots = asyncio.Semaphore(settings.CACHE_WARM_CONCURRENCY)
+
+    async def warm(make_key, load) -> bool:
+        async with slots:
+            cache_key = await make_key()
+            if cache_key is None:
+                return False
+            await aget_or_load(cache_key, _for_cache(lambda: arun_with_session(load), cache_key))
+            return True
+
+    # Ошибки отдельных записей (например, курс уже удалён) не мешают остальным
+    results = await asyncio.gather(*(warm(*job) for job in jobs), return_exceptions=True)
+    warmed = sum(result is True for result in results)
+    cache_warmed_total.labels(trigger=trigger).inc(warmed)
+    return warmed
+
+def schedule_rewarm(namespaces: Iterable[str]) -> None:
+    """Прогреть инвалидированные пространства имён в фоне, не задерживая ответ записи"""
+    task = asyncio.ensure_future(warm_cache(list(namespaces), trigger="write"))
+    _warm_tasks.add(task)
+    task.add_done_callback(_warm_tasks.discard)
 
 # --- Admin-only CRUD:
+# Транзакция целиком выполняется одним run_db; инвалидация — синхронный Redis, поэтому в threadpool
+
+def _invalidate(*namespaces: str) -> None:
+    for namespace in namespaces:
+        invalidate_namespace(namespace)
+
+async def _invalidate_and_rewarm(*namespaces: str) -> None:
+    await run_in_threadpool(_invalidate, *namespaces)
+    schedule_rewarm(namespaces)
 
-@router.post("", response_model=CourseOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
-def create_course(payload: CourseCreate, db: Session = Depends(get_db)):
+def _create_course(db: Session, payload: CourseCreate) -> Course:
     row = Course(title=payload.title, description=payload.description)
     db.add(row); db.commit(); db.refresh(row)
-    # Инвалидируем кэш списка курсов
-    delete_cache_pattern("courses:list:*")
     return row
 
-@router.put("/{course_id}", response_model=CourseOut, dependencies=[Depends(require_admin)])
-def update_course(course_id: int, payload: CourseUpdate, db: Session = Depends(get_db)):
+def _update_course(db: Session, course_id: int, payload: CourseUpdate) -> Course:
     row = db.query(Course).filter(Course.id==course_id).first()
     if not row: raise HTTPException(404, "course not found")
     if payload.title is not None: row.title = payload.title
     if payload.description is not None: row.description = payload.description
+    row.updated_at = utcnow()
     db.commit(); db.refresh(row)
-    # Инвалидируем кэш
-    delete_cache_pattern("courses:list:*")
-    delete_cache_pattern(f"course:{course_id}:*")
     return row
 
-@router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
-def delete_course(course_id: int, db: Session = Depends(get_db)):
+def _delete_course(db: Session, course_id: int) -> None:
     row = db.query(Course).filter(Course.id==course_id).first()
     if not row: raise HTTPException(404, "course not found")
     db.delete(row); db.commit()
+
+@router.post("", response_model=CourseOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def create_course(payload: CourseCreate, db: Session | AsyncSession = Depends(get_db)):
+    row = await run_db(db, _create_course, payload)
+    # Инвалидируем кэш списка курсов и поиска
+    await _invalidate_and_rewarm(COURSES_LIST_NS, COURSES_SEARCH_NS)
+    return row
+
+@router.put("/{course_id}", response_model=CourseOut, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def update_course(course_id: int, payload: CourseUpdate, db: Session | AsyncSession = Depends(get_db)):
+    row = await run_db(db, _update_course, course_id, payload)
+    # Инвалидируем кэш
+    await _invalidate_and_rewarm(COURSES_LIST_NS, COURSES_SEARCH_NS, course_ns(course_id))
+    return row
+
+@router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def delete_course(course_id: int, db: Session | AsyncSession = Depends(get_db)):
+    await run_db(db, _delete_course, course_id)
     # Инвалидируем кэш
-    delete_cache_pattern("courses:list:*")
-    delete_cache_pattern(f"course:{course_id}:*")
+    await _invalidate_and_rewarm(COURSES_LIST_NS, COURSES_SEARCH_NS, course_ns(course_id))
     return {"ok": True}
 
 # --- Lesson CRUD:
 
-@router.post("/{course_id}/lessons", response_model=LessonOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
-def create_lesson(course_id: int, payload: LessonCreate, db: Session = Depends(get_db)):
+def _create_lesson(db: Session, course_id: int, payload: LessonCreate) -> Lesson:
     exists = db.query(Course.id).filter(Course.id==course_id).first()
     if not exists: raise HTTPException(404, "course not found")
     row = Lesson(course_id=course_id, title=payload.title, content=payload.content, order=payload.order)
-    db.add(row); db.commit(); db.refresh(row)
-    # Инвалидируем кэш уроков курса
-    delete_cache_pattern(f"course:{course_id}:lessons")
+    db.add(row)
+    bump_course_aggregates(db, course_id, lessons=1, length=len(payload.content))
+    db.commit(); db.refresh(row)
     return row
 
-@router.put("/{course_id}/lessons/{lesson_id}", response_model=LessonOut, dependencies=[Depends(require_admin)])
-def update_lesson(course_id: int, lesson_id: int, payload: LessonUpdate, db: Session = Depends(get_db)):
-    row = db.query(Lesson).filter(Lesson.id==lesson_id, Lesson.course_id==course_id).first()
+def _bulk_lessons(db: Session, course_id: int, payload: LessonBulkRequest) -> list[Lesson]:
+    exists = db.query(Course.id).filter(Course.id==course_id).first()
+    if not exists: raise HTTPException(404, "course not found")
+
+    creates, updates, ids = [], [], []
+    for item in payload.lessons:
+        if item.id is None:
+            if item.title is None or item.content is None:
+                raise HTTPException(422, "title and content are required for new lessons")
+            creates.append({"course_id": course_id, "title": item.title,
+                            "content": item.content, "order": item.order or 0})
+        else:
+            ids.append(item.id)
+            # null — «не менять», как в PUT одного урока
+            fields = item.model_dump(exclude_none=True)
+            if len(fields) > 1:
+                updates.append(fields)
+
+    if ids:
+        if len(set(ids)) != len(ids): raise HTTPException(422, "duplicate lesson ids")
+        found = set(db.scalars(select(Lesson.id).where(Lesson.course_id==course_id, Lesson.id.in_(ids))))
+        if found != set(ids): raise HTTPException(404, "lesson not found")
+    if updates:
+        db.execute(update(Lesson), updates)
+    if creates:
+        db.execute(insert(Lesson), creates)
+    # Старые длины правленых уроков не читаем — пересчёт по курсу одним UPDATE
+    recount_course_aggregates(db, [course_id])
+    db.commit()
+    return db.query(Lesson).filter(Lesson.course_id==course_id).order_by(Lesson.order).all()
+
+def _locked_lesson(db: Session, course_id: int, lesson_id: int) -> Lesson | None:
+    # Строка урока блокируется до commit: дельта content_length считается от текущего текста,
+    # а не от прочитанного до конкурентной правки того же урока
+    return db.query(Lesson).filter(Lesson.id==lesson_id, Lesson.course_id==course_id).with_for_update().first()
+
+def _update_lesson(db: Session, course_id: int, lesson_id: int, payload: LessonUpdate) -> Lesson:
+    row = _locked_lesson(db, course_id, lesson_id)
     if not row: raise HTTPException(404, "lesson not found")
+    length = 0
     if payload.title is not None: row.title = payload.title
-    if payload.content is not None: row.content = payload.content
+    if payload.content is not None:
+        length = len(payload.content) - len(row.content)
+        row.content = payload.content
     if payload.order is not None: row.order = payload.order
+    bump_course_aggregates(db, course_id, length=length)
     db.commit(); db.refresh(row)
-    # Инвалидируем кэш уроков курса
-    delete_cache_pattern(f"course:{course_id}:lessons")
     return row
 
-@router.delete("/{course_id}/lessons/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
-def delete_lesson(course_id: int, lesson_id: int, db: Session = Depends(get_db)):
-    row = db.query(Lesson).filter(Lesson.id==lesson_id, Lesson.course_id==course_id).first()
+def _delete_lesson(db: Session, course_id: int, lesson_id: int) -> None:
+    row = _locked_lesson(db, course_id, lesson_id)
     if not row: raise HTTPException(404, "lesson not found")
-    db.delete(row); db.commit()
-    # Инвалидируем кэш уроков курса
-    delete_cache_pattern(f"course:{course_id}:lessons")
+    db.delete(row)
+    bump_course_aggregates(db, course_id, lessons=-1, length=-len(row.content))
+    db.commit()
+
+@router.post("/{course_id}/lessons", response_model=LessonOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def create_lesson(course_id: int, payload: LessonCreate, db: Session | AsyncSession = Depends(get_db)):
+    row = await run_db(db, _create_lesson, course_id, payload)
+    # Инвалидируем кэш уроков курса и поиска
+    await _invalidate_and_rewarm(course_ns(course_id), COURSES_SEARCH_NS)
+    return row
+
+@router.post("/{course_id}/lessons/bulk", response_model=list[LessonOut], dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def bulk_lessons(course_id: int, payload: LessonBulkRequest, db: Session | AsyncSession = Depends(get_db)):
+    # Импорт/правка/перестановка уроков одной транзакцией: INSERT ... RETURNING пачкой,
+    # UPDATE через executemany, одна инвалидация на весь запрос
+    rows = await run_db(db, _bulk_lessons, course_id, payload)
+    # Инвалидируем кэш уроков курса и поиска один раз на весь импорт
+    await _invalidate_and_rewarm(course_ns(course_id), COURSES_SEARCH_NS)
+    return rows
+
+@router.put("/{course_id}/lessons/{lesson_id}", response_model=LessonOut, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def update_lesson(course_id: int, lesson_id: int, payload: LessonUpdate, db: Session | AsyncSession = Depends(get_db)):
+    row = await run_db(db, _update_lesson, course_id, lesson_id, payload)
+    # Инвалидируем кэш уроков курса и поиска
+    await _invalidate_and_rewarm(course_ns(course_id), COURSES_SEARCH_NS)
+    return row
+
+@router.delete("/{course_id}/lessons/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin), Depends(stick_to_primary)])
+async def delete_lesson(course_id: int, lesson_id: int, db: Session | AsyncSession = Depends(get_db)):
+    await run_db(db, _delete_lesson, course_id, lesson_id)
+    # Инвалидируем кэш уроков курса и поиска
+    await _invalidate_and_rewarm(course_ns(course_id), COURSES_SEARCH_NS)
     return {"ok": True}
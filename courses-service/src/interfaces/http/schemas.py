@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, Field, field_validator
 
 class CourseCreate(BaseModel):
     title: str
@@ -14,6 +16,22 @@ class CourseOut(BaseModel):
     description: str | None = None
     class Config: from_attributes = True
 
+class CourseDetailOut(CourseOut):
+    lesson_count: int
+    content_length: int
+    updated_at: datetime | None = None
+
+    @field_validator("updated_at")
+    @classmethod
+    def _utc(cls, value: datetime | None) -> datetime | None:
+        # SQLite возвращает время без зоны; пишется оно всегда в UTC
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+class CourseSearchOut(CourseOut):
+    rank: float
+
 class LessonCreate(BaseModel):
     title: str
     content: str
@@ -24,10 +42,26 @@ class LessonUpdate(BaseModel):
     content: str | None = None
     order: int | None = None
 
+class LessonBulkItem(BaseModel):
+    # Без id — новый урок (title и content обязательны), с id — изменение существующего
+    id: int | None = None
+    title: str | None = None
+    content: str | None = None
+    order: int | None = None
+
+class LessonBulkRequest(BaseModel):
+    lessons: list[LessonBulkItem] = Field(..., min_length=1, max_length=5000)
+
 class LessonOut(BaseModel):
     id: int
     course_id: int
     title: str
     content: str
     order: int
-    class Config: from_attributes = True
\ No newline at end of file
+    class Config: from_attributes = True
+
+class LessonSummaryOut(BaseModel):
+    id: int
+    title: str
+    order: int
+    class Config: from_attributes = True
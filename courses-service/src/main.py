@@ -1,3 +1,4 @@
+import asyncio
 import time
 import logging
 import structlog
@@ -6,14 +7,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
-from .infrastructure.db import engine
+from .infrastructure.aggregates import setup_aggregates
+from .infrastructure.db import engine, async_engine, replicas
+from .infrastructure.cache import start_invalidation_listener, stop_invalidation_listener, close_async_redis
+from .infrastructure.jwks import jwks_client
 from .infrastructure.models import Base
+from .infrastructure.serialization import FastJSONResponse
+from .infrastructure.search import setup_search
 from .infrastructure.metrics import (
     metrics_endpoint,
     http_requests_total,
     http_request_duration_seconds
 )
 from .interfaces.http.routers import courses as courses_router
+from .interfaces.http.routers import catalog as catalog_router
 from .config import settings
 
 # Настройка структурированного логирования
@@ -32,7 +39,7 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-app = FastAPI(title="Courses Service", version="0.1.0")
+app = FastAPI(title="Courses Service", version="0.1.0", default_response_class=FastJSONResponse)
 
 # Добавляем middleware для правильной кодировки и метрик
 @app.middleware("http")
@@ -68,21 +75,77 @@ async def add_charset_header(request: Request, call_next):
 def on_startup():
     logger.info("Starting courses service", version="0.1.0")
     Base.metadata.create_all(bind=engine)
+    setup_aggregates(engine)
+    setup_search(engine)
 
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
     logger.info("Database connection established")
 
+    start_invalidation_listener()
+    replicas.start()
+
+
+# Готовность выставляется после прогрева кэша (или по истечении CACHE_WARM_BUDGET)
+app.state.ready = False
+_warmup_task: asyncio.Task | None = None
+
+
+async def _warm_up() -> None:
+    started = time.perf_counter()
+    try:
+        warmed = await asyncio.wait_for(courses_router.warm_cache(), settings.CACHE_WARM_BUDGET)
+        logger.info("Cache warmed", entries=warmed, duration_ms=round((time.perf_counter() - started) * 1000, 2))
+    except asyncio.TimeoutError:
+        logger.warning("Cache warming exceeded budget", budget_s=settings.CACHE_WARM_BUDGET)
+    except Exception as e:
+        logger.warning("Cache warming failed", error=str(e))
+    finally:
+        app.state.ready = True
+
+
+@app.on_event("startup")
+async def start_cache_warming():
+    global _warmup_task
+    _warmup_task = asyncio.ensure_future(_warm_up())
+
+
+@app.on_event("startup")
+async def start_jwks_refresh():
+    jwks_client.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+    stop_invalidation_listener()
+    replicas.stop()
+    await jwks_client.stop()
+    await close_async_redis()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness: 503, пока идёт прогрев кэша после старта"""
+    if not app.state.ready:
+        return JSONResponse({"status": "warming"}, status_code=503)
+    return {"status": "ready"}
+
+
 @app.get("/metrics")
 def metrics():
     """Prometheus metrics endpoint"""
     return metrics_endpoint()
 
 
+# Статические пути (/export, /import) раньше параметризованных путей курсов
+app.include_router(catalog_router.router)
 app.include_router(courses_router.router)
@@ -15,3 +15,59 @@ def setup_test_environment(monkeypatch):
     # Используем тестовую БД
     monkeypatch.setenv("DATABASE_URL", "sqlite:///./test.db")
 
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """Изолируем тесты друг от друга: L1 живёт в памяти процесса"""
+    from src.infrastructure.cache import local_cache
+    local_cache.clear()
+    yield
+    local_cache.clear()
+
+
+@pytest.fixture
+def engine():
+    """Настоящая SQLite в памяти со схемой; StaticPool — все сессии теста видят одну БД"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from src.infrastructure.models import Base
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Фабрика сессий тестовой БД; тест с другой БД переопределяет эту фикстуру"""
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def client(session_factory):
+    """Клиент от имени админа: get_db и фабрики сессий отдают сессии тестовой БД"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from src.infrastructure.db import get_db, get_fill_session_factory, get_session_factory
+    from src.interfaces.http.authz import require_admin
+    from src.main import app
+
+    if isinstance(session_factory, async_sessionmaker):
+        async def override_get_db():
+            async with session_factory() as db:
+                yield db
+    else:
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_fill_session_factory] = lambda: session_factory
+    app.dependency_overrides[require_admin] = lambda: {"sub": "admin@example.com", "role": "admin"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.db import async_database_url
+from src.infrastructure.models import Base
+
+
+@pytest.fixture
+def session_factory():
+    """AsyncSession поверх aiosqlite в памяти вместо синхронной SQLite из conftest"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    asyncio.run(_create_tables(engine))
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+async def _create_tables(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def test_async_database_url():
+    """Синхронный URL переводится на асинхронный драйвер"""
+    assert async_database_url("postgresql://u:p@db:5432/courses") == "postgresql+asyncpg://u:p@db:5432/courses"
+    assert async_database_url("postgresql+psycopg2://u:p@db/courses") == "postgresql+asyncpg://u:p@db/courses"
+    assert async_database_url("sqlite:///./courses.db") == "sqlite+aiosqlite:///./courses.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/courses")
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+@patch('src.interfaces.http.routers.courses.aversioned_key', return_value=None)
+def test_course_crud_on_async_session(mock_key, mock_invalidate, client):
+    """Чтение и запись курсов и уроков через AsyncSession"""
+    course = client.post("/api/courses", json={"title": "Async", "description": "aiosqlite"})
+    assert course.status_code == 201
+    course_id = course.json()["id"]
+
+    lesson = client.post(f"/api/courses/{course_id}/lessons", json={"title": "L1", "content": "c", "order": 1})
+    assert lesson.status_code == 201
+    bulk = client.post(f"/api/courses/{course_id}/lessons/bulk",
+                       json={"lessons": [{"title": "L2", "content": "c", "order": 2}]})
+    assert [l["title"] for l in bulk.json()] == ["L1", "L2"]
+
+    assert client.put(f"/api/courses/{course_id}", json={"title": "Renamed"}).json()["title"] == "Renamed"
+    assert [c["title"] for c in client.get("/api/courses").json()] == ["Renamed"]
+    summary = client.get(f"/api/courses/{course_id}/lessons?view=summary").json()
+    assert [l["title"] for l in summary] == ["L1", "L2"]
+
+    assert client.delete(f"/api/courses/{course_id}/lessons/{lesson.json()['id']}").status_code == 204
+    assert client.get(f"/api/courses/{course_id}/lessons/{lesson.json()['id']}").status_code == 404
+    assert client.delete(f"/api/courses/{course_id}").status_code == 204
+    assert client.get(f"/api/courses/{course_id}/lessons").status_code == 404
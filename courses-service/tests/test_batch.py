@@ -0,0 +1,72 @@
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from sqlalchemy import event
+
+from src.infrastructure.cache import local_cache
+from src.infrastructure.models import Course
+
+
+@pytest.fixture(autouse=True)
+def seed(session_factory):
+    with session_factory() as db:
+        db.add_all([Course(id=i, title=f"Course {i}", description="Описание") for i in (1, 2, 5)])
+        db.commit()
+
+
+@pytest.fixture
+def redis():
+    """Redis в словаре: MGET и pipeline SETEX"""
+    store = {}
+    client = MagicMock()
+    client.mget = AsyncMock(side_effect=lambda keys: [store.get(key) for key in keys])
+    pipe = MagicMock()
+    pipe.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    pipe.execute = AsyncMock()
+    client.pipeline.return_value = pipe
+    client.store = store
+    return client
+
+
+@pytest.fixture
+def client(client, redis):
+    with patch('src.infrastructure.cache.get_async_redis', return_value=redis), \
+         patch('src.interfaces.http.routers.courses.aversioned_key', AsyncMock(return_value="courses:list:0:item")):
+        yield client
+
+
+def test_batch_loads_misses_with_one_query(client, engine, redis):
+    """Промахи — один SELECT ... IN и один pipeline; повторный запрос обходится одним MGET"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = client.get("/api/courses/batch?ids=5,1,404,1")
+    assert response.status_code == 200
+    assert [course["id"] for course in response.json()] == [5, 1]
+    assert len(statements) == 1 and " IN " in statements[0]
+    assert set(redis.store) == {"courses:list:0:item:5", "courses:list:0:item:1"}
+    redis.pipeline.return_value.execute.assert_awaited_once()
+
+    local_cache.clear()
+    statements.clear()
+    response = client.get("/api/courses/batch?ids=1,5,2")
+    assert [course["title"] for course in response.json()] == ["Course 1", "Course 5", "Course 2"]
+    # Из БД — только курс 2, которого не было в кэше
+    assert len(statements) == 1
+    assert redis.mget.await_count == 2
+
+    again = client.get("/api/courses/batch?ids=1,5,2", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_batch_rejects_bad_ids(client):
+    assert client.get("/api/courses/batch?ids=1,x").status_code == 400
+    assert client.get("/api/courses/batch?ids=,").status_code == 400
+    ids = ",".join(map(str, range(1, 102)))
+    assert client.get(f"/api/courses/batch?ids={ids}").status_code == 400
@@ -0,0 +1,72 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.models import Course, Lesson
+
+
+@pytest.fixture(autouse=True)
+def seed(session_factory):
+    with session_factory() as db:
+        db.add(Course(id=1, title="Course"))
+        db.add(Lesson(id=10, course_id=1, title="Intro", content="...", order=1))
+        db.add(Course(id=2, title="Other"))
+        db.add(Lesson(id=20, course_id=2, title="Foreign", content="...", order=1))
+        db.commit()
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+def test_bulk_create_update_and_reorder(mock_invalidate, client, engine):
+    """Создание, правка и перестановка одним запросом, одной транзакцией"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = client.post("/api/courses/1/lessons/bulk", json={"lessons": [
+        {"title": "Second", "content": "b", "order": 2},
+        {"title": "Third", "content": "c", "order": 3},
+        {"id": 10, "order": 5},
+    ]})
+    assert response.status_code == 200
+    assert [(l["title"], l["order"]) for l in response.json()] == [("Second", 2), ("Third", 3), ("Intro", 5)]
+    # Уроки вставляются одним INSERT, а не по запросу на урок
+    assert sum(s.startswith("INSERT INTO lessons") for s in statements) == 1
+    assert sorted(c.args[0] for c in mock_invalidate.call_args_list) == ["course:1", "courses:search"]
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+def test_bulk_rejects_foreign_lesson_atomically(mock_invalidate, client, engine):
+    """Урок другого курса — 404, и ничего из запроса не применяется"""
+    response = client.post("/api/courses/1/lessons/bulk", json={"lessons": [
+        {"title": "New", "content": "x"},
+        {"id": 20, "title": "Hijacked"},
+    ]})
+    assert response.status_code == 404
+    with sessionmaker(bind=engine)() as db:
+        assert db.get(Lesson, 20).title == "Foreign"
+        assert db.query(Lesson).filter(Lesson.course_id == 1).count() == 1
+    mock_invalidate.assert_not_called()
+
+
+def test_bulk_validation(client):
+    """Новый урок без content и пустой запрос отклоняются"""
+    assert client.post("/api/courses/1/lessons/bulk", json={"lessons": [{"title": "x"}]}).status_code == 422
+    assert client.post("/api/courses/1/lessons/bulk", json={"lessons": []}).status_code == 422
+    assert client.post("/api/courses/99/lessons/bulk", json={"lessons": [{"id": 10}]}).status_code == 404
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+def test_bulk_update_null_keeps_field(mock_invalidate, client, engine):
+    """Явный null в правке урока — «не менять», как в PUT, а не NOT NULL и 500"""
+    response = client.post("/api/courses/1/lessons/bulk", json={"lessons": [
+        {"id": 10, "title": None, "content": None, "order": 7},
+    ]})
+    assert response.status_code == 200
+    assert [(l["title"], l["content"], l["order"]) for l in response.json()] == [("Intro", "...", 7)]
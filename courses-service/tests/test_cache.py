@@ -1,81 +1,182 @@
+import asyncio
 import os
 import sys
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 CURRENT_DIR = os.path.dirname(__file__)
 SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
 if SERVICE_ROOT not in sys.path:
     sys.path.insert(0, SERVICE_ROOT)
 
-from src.infrastructure.cache import get_cache, set_cache, delete_cache, delete_cache_pattern
+from src.infrastructure.cache import (
+    CachedPayload, aget_generation, aget_many, aset_many, aversioned_key, invalidate_namespace, local_cache,
+)
+
+
+def _async_client(**methods) -> MagicMock:
+    client = MagicMock()
+    for name, value in methods.items():
+        setattr(client, name, AsyncMock(**value))
+    return client
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_many_hit_and_miss(mock_redis):
+    """Записи из Redis возвращаются по ключам, промахи в ответ не попадают"""
+    pipe = _async_client(execute={})
+    writer = MagicMock(pipeline=MagicMock(return_value=pipe))
+    mock_redis.return_value = writer
+    assert asyncio.run(aset_many({"k1": CachedPayload(b"[1]")}, ttl=300)) is True
+    raw = pipe.setex.call_args.args[2]
+    local_cache.clear()
+
+    mock_redis.return_value = _async_client(mget={"return_value": [raw, None]})
+    result = asyncio.run(aget_many(["k1", "k2"]))
+    assert list(result) == ["k1"] and result["k1"].body == b"[1]"
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_many_error(mock_redis):
+    """Ошибка Redis — промах, а не исключение"""
+    mock_redis.side_effect = Exception("Redis error")
+    assert asyncio.run(aget_many(["k1"])) == {}
+    assert asyncio.run(aset_many({"k1": CachedPayload(b"[]")})) is False
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_many_l1_hit_skips_redis(mock_redis):
+    """Повторное чтение обслуживается L1 без обращения к Redis"""
+    mock_redis.return_value = MagicMock(pipeline=MagicMock(return_value=_async_client(execute={})))
+    asyncio.run(aset_many({"k1": CachedPayload(b"[1]")}))
+    client = _async_client(mget={"return_value": []})
+    mock_redis.return_value = client
+
+    assert asyncio.run(aget_many(["k1"]))["k1"].body == b"[1]"
+    client.mget.assert_not_called()
 
 @patch('src.infrastructure.cache.get_redis')
-def test_get_cache_hit(mock_redis):
-    """Тест получения значения из кэша (hit)"""
+def test_invalidate_namespace_clears_l1(mock_redis):
+    """Инвалидация чистит L1 пространства имён и рассылается остальным репликам"""
     mock_client = MagicMock()
-    mock_client.get.return_value = '{"key": "value"}'
     mock_redis.return_value = mock_client
-    
-    result = get_cache("test_key")
-    assert result == {"key": "value"}
-    mock_client.get.assert_called_once_with("test_key")
+    local_cache.set("courses:list:0:10:0", 1)
+    local_cache.set("course:1:0:lessons", 2)
 
-@patch('src.infrastructure.cache.get_redis')
-def test_get_cache_miss(mock_redis):
-    """Тест получения значения из кэша (miss)"""
-    mock_client = MagicMock()
-    mock_client.get.return_value = None
+    invalidate_namespace("courses:list")
+
+    assert local_cache.get("courses:list:0:10:0") is None
+    assert local_cache.get("course:1:0:lessons") == 2
+    mock_client.publish.assert_called_once_with("courses:cache:invalidate", "courses:list:*")
+
+def test_local_cache_lru_eviction():
+    """L1 вытесняет давно не использованные ключи"""
+    from src.infrastructure.local_cache import LocalCache
+    cache = LocalCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_local_cache_ttl(monkeypatch):
+    """Записи L1 истекают по TTL"""
+    from src.infrastructure import local_cache as lc
+    now = [1000.0]
+    monkeypatch.setattr(lc.time, "monotonic", lambda: now[0])
+    cache = lc.LocalCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a") is None
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aversioned_key_uses_generation(mock_redis):
+    """Поколение встраивается в ключ и кэшируется в L1"""
+    mock_client = _async_client(get={"return_value": "7"})
     mock_redis.return_value = mock_client
-    
-    result = get_cache("test_key")
-    assert result is None
 
-@patch('src.infrastructure.cache.get_redis')
-def test_get_cache_error(mock_redis):
-    """Тест обработки ошибки при получении из кэша"""
-    mock_redis.side_effect = Exception("Redis error")
-    
-    result = get_cache("test_key")
-    assert result is None
+    assert asyncio.run(aversioned_key("courses:list", 10, 0)) == "courses:list:7:10:0"
+    assert asyncio.run(aget_generation("courses:list")) == 7
+    mock_client.get.assert_called_once_with("courses:list:gen")
 
 @patch('src.infrastructure.cache.get_redis')
-def test_set_cache(mock_redis):
-    """Тест сохранения значения в кэш"""
+@patch('src.infrastructure.cache.get_async_redis')
+def test_invalidate_namespace_is_o1(mock_async_redis, mock_redis):
+    """Инвалидация — один INCR без обхода ключей"""
+    mock_async_redis.return_value = _async_client(get={"return_value": None})
     mock_client = MagicMock()
     mock_redis.return_value = mock_client
-    
-    result = set_cache("test_key", {"key": "value"}, ttl=300)
-    assert result is True
-    mock_client.setex.assert_called_once()
 
-@patch('src.infrastructure.cache.get_redis')
-def test_set_cache_error(mock_redis):
-    """Тест обработки ошибки при сохранении в кэш"""
+    assert asyncio.run(aversioned_key("course:1", "lessons")) == "course:1:0:lessons"
+    assert invalidate_namespace("course:1") is True
+    mock_client.incr.assert_called_once_with("course:1:gen")
+    mock_client.keys.assert_not_called()
+    mock_client.scan_iter.assert_not_called()
+    mock_client.publish.assert_called_once_with("courses:cache:invalidate", "course:1:*")
+
+    mock_async_redis.return_value = _async_client(get={"return_value": "1"})
+    assert asyncio.run(aversioned_key("course:1", "lessons")) == "course:1:1:lessons"
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_generation_read_before_invalidation_is_not_cached(mock_redis):
+    """Поколение, прочитанное до инвалидации, не ложится в L1 после неё"""
+    async def stale_get(key):
+        # Пока GET в пути, другая реплика подняла поколение и прислала инвалидацию
+        local_cache.delete_pattern("courses:list:*")
+        return "3"
+
+    mock_redis.return_value = _async_client(get={"side_effect": stale_get})
+    assert asyncio.run(aget_generation("courses:list")) == 3
+    assert local_cache.get("courses:list:gen") is None
+
+    mock_redis.return_value = _async_client(get={"return_value": "4"})
+    assert asyncio.run(aget_generation("courses:list")) == 4
+    assert local_cache.get("courses:list:gen") == 4
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aversioned_key_error(mock_redis):
+    """Ошибка асинхронного Redis: ключа поколения нет, кэш обходится"""
     mock_redis.side_effect = Exception("Redis error")
-    
-    result = set_cache("test_key", {"key": "value"})
-    assert result is False
 
-@patch('src.infrastructure.cache.get_redis')
-def test_delete_cache(mock_redis):
-    """Тест удаления значения из кэша"""
-    mock_client = MagicMock()
-    mock_redis.return_value = mock_client
-    
-    result = delete_cache("test_key")
-    assert result is True
-    mock_client.delete.assert_called_once_with("test_key")
+    assert asyncio.run(aversioned_key("courses:list", 10, 0)) is None
+
+def test_bounded_pool_releases_slot_on_connect_error():
+    """Неудачное подключение возвращает слот пула и не ждёт таймаута"""
+    import time
+    import redis.asyncio as aioredis
+    from src.infrastructure.cache import _BoundedConnectionPool
+
+    async def scenario():
+        pool = _BoundedConnectionPool.from_url(
+            "redis://127.0.0.1:1/0", max_connections=1, pool_timeout=5, socket_connect_timeout=1
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        started = time.perf_counter()
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await client.get("key")
+        return time.perf_counter() - started, pool._slots._value
+
+    elapsed, free_slots = asyncio.run(scenario())
+    assert elapsed < 2
+    assert free_slots == 1
+
 
 @patch('src.infrastructure.cache.get_redis')
-def test_delete_cache_pattern(mock_redis):
-    """Тест удаления по паттерну"""
-    mock_client = MagicMock()
-    mock_client.keys.return_value = ["key1", "key2", "key3"]
-    mock_client.delete.return_value = 3
-    mock_redis.return_value = mock_client
-    
-    result = delete_cache_pattern("key*")
-    assert result == 3
-    mock_client.keys.assert_called_once_with("key*")
+def test_invalidate_namespaces_uses_single_pipeline(mock_redis):
+    """Пакетная инвалидация: один pipeline, при большом числе пространств L1 сбрасывается целиком"""
+    from src.infrastructure.cache import invalidate_namespaces
+    client = MagicMock()
+    pipe = MagicMock()
+    client.pipeline.return_value = pipe
+    mock_redis.return_value = client
+    local_cache.set("unrelated:0:key", 1)
+
+    assert invalidate_namespaces(["course:1", "course:2"]) is True
+    assert pipe.incr.call_count == 2
+    pipe.execute.assert_called_once()
+    assert local_cache.get("unrelated:0:key") == 1
 
+    assert invalidate_namespaces([f"course:{i}" for i in range(500)]) is True
+    assert local_cache.get("unrelated:0:key") is None
+    client.publish.assert_called_with("courses:cache:invalidate", "*")
@@ -0,0 +1,61 @@
+import os
+import sys
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure import cache
+from src.infrastructure.cache import CachedPayload, _decode_entry, _encode_entry
+
+BODY = ('[{"id":1,"content":"' + "Длинный текст урока. " * 200 + '"}]').encode()
+ENTRY = {"v": CachedPayload(BODY, {"etag": '"x"'}, {"gzip": b"\x1f\x8b\n"}), "s": 1.5, "d": 0.25}
+
+
+@pytest.fixture
+def binary(monkeypatch):
+    monkeypatch.setattr(cache.settings, "CACHE_VALUE_FORMAT", "binary")
+
+
+def test_binary_frame_compresses_large_body(binary):
+    raw = _encode_entry(ENTRY)
+    assert raw[:3] == bytes((0, 1, cache._CODEC_ZSTD))
+    assert len(raw) < len(BODY) // 4
+    assert _decode_entry(raw) == ENTRY
+
+
+def test_binary_frame_small_body_and_zlib_fallback(binary, monkeypatch):
+    small = {"v": CachedPayload(b"[]"), "s": 1.0, "d": 0.0}
+    raw = _encode_entry(small)
+    assert raw[2] == cache._CODEC_NONE
+    assert _decode_entry(raw) == {"v": CachedPayload(b"[]", {}, {}), "s": 1.0, "d": 0.0}
+    monkeypatch.setattr(cache, "zstandard", None)
+    raw = _encode_entry(ENTRY)
+    assert raw[2] == cache._CODEC_ZLIB
+    assert _decode_entry(raw) == ENTRY
+
+
+def test_formats_read_each_other(binary, monkeypatch):
+    """Записи старого формата читаются после переключения, и наоборот"""
+    binary_raw = _encode_entry(ENTRY)
+    monkeypatch.setattr(cache.settings, "CACHE_VALUE_FORMAT", "json")
+    json_raw = _encode_entry(ENTRY)
+    assert json_raw.startswith(b"{")
+    assert _decode_entry(binary_raw) == _decode_entry(json_raw) == ENTRY
+
+
+def test_unknown_frame_version_is_rejected(binary):
+    raw = bytearray(_encode_entry(ENTRY))
+    raw[1] = 99
+    with pytest.raises(ValueError):
+        _decode_entry(bytes(raw))
+
+def test_cached_payload_defaults_are_not_shared():
+    """У каждого CachedPayload свои пустые meta и encoded"""
+    first, second = CachedPayload(b"a"), CachedPayload(b"b")
+    first.meta["etag"] = '"x"'
+    first.encoded["gzip"] = b"z"
+    assert second.meta == {} and second.encoded == {}
+    assert CachedPayload(b"a") == CachedPayload(b"a", {}, {})
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+
+from src.infrastructure.models import Base, Course, Lesson
+from src.main import app
+
+
+@pytest.fixture
+def source(session_factory):
+    with session_factory() as db:
+        db.add_all([Course(id=1, title="Первый"), Course(id=2, title="Второй", description="Описание")])
+        db.add_all([
+            Lesson(id=1, course_id=2, title="B", content="b", order=2),
+            Lesson(id=2, course_id=1, title="A", content="a", order=1),
+            Lesson(id=3, course_id=2, title="A", content="a", order=1),
+        ])
+        db.commit()
+
+
+def test_export_requires_admin():
+    """Выгрузка каталога доступна только админу"""
+    assert TestClient(app).get("/api/courses/export").status_code in (401, 403)
+
+
+def test_export_streams_courses_with_their_lessons(source, client):
+    """Курс и сразу за ним его уроки по порядку"""
+    response = client.get("/api/courses/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["type"], r["id"]) for r in records] == [
+        ("course", 1), ("lesson", 2), ("course", 2), ("lesson", 3), ("lesson", 1),
+    ]
+
+
+@patch('src.interfaces.http.routers.catalog.invalidate_namespaces')
+def test_import_round_trip(mock_invalidate, source, client, engine, session_factory):
+    """Выгрузка загружается в пустую БД и повторно — без дублей (UPSERT)"""
+    dump = client.get("/api/courses/export").content
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    for _ in range(2):
+        response = client.post("/api/courses/import", content=dump)
+        assert response.status_code == 200
+        assert response.json() == {"courses": 2, "lessons": 3}
+
+    with session_factory() as db:
+        assert db.query(Course).count() == 2
+        assert db.get(Lesson, 1).course_id == 2
+    assert mock_invalidate.call_args.args[0] == ["courses:list", "courses:search", "course:1", "course:2"]
+
+
+@patch('src.interfaces.http.routers.catalog.invalidate_namespaces')
+def test_import_rejects_bad_line_atomically(mock_invalidate, client, session_factory):
+    """Ошибка в строке — 400 с её номером, ничего не записано"""
+    body = b'{"type": "course", "id": 1, "title": "ok"}\n{"type": "course", "id": "x"}\n'
+    response = client.post("/api/courses/import", content=body)
+    assert response.status_code == 400
+    assert "line 2" in response.json()["detail"]
+    with session_factory() as db:
+        assert db.query(Course).count() == 0
+    mock_invalidate.assert_not_called()
+
+
+@patch('src.interfaces.http.routers.catalog.invalidate_namespaces')
+def test_import_lines_split_across_chunks(mock_invalidate, client, session_factory):
+    """Строки, разрезанные между кусками тела, и последняя строка без перевода строки"""
+    body = (b'{"type": "course", "id": 1, "title": "ok", "description": "' + b"x" * 5000 + b'"}\n\n'
+            b'{"type": "lesson", "id": 1, "course_id": 1, "title": "A", "content": "a", "order": 1}')
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))
+    response = client.post("/api/courses/import", content=chunks)
+    assert response.json() == {"courses": 1, "lessons": 1}
+    with session_factory() as db:
+        assert len(db.get(Course, 1).description) == 5000
@@ -0,0 +1,84 @@
+import gzip
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from starlette.requests import Request
+
+from src.infrastructure.cache import CachedPayload, _decode_entry, _encode_entry
+from src.infrastructure.models import Course
+from src.interfaces.http.compression import choose_encoding, compress_variants
+
+
+def _request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+def test_choose_encoding():
+    """q-значения Accept-Encoding; при равных — br раньше gzip"""
+    both = {"br": b"", "gzip": b""}
+    assert choose_encoding(_request("gzip, deflate, br"), both) == "br"
+    assert choose_encoding(_request("br;q=0.5, gzip"), both) == "gzip"
+    assert choose_encoding(_request("*"), {"gzip": b""}) == "gzip"
+    assert choose_encoding(_request("gzip;q=0, identity"), both) is None
+    assert choose_encoding(_request("gzip"), {}) is None
+
+
+def test_small_bodies_are_not_compressed():
+    assert compress_variants(b"[]") == {}
+    variants = compress_variants(b'{"title":"Course"}' * 200)
+    assert gzip.decompress(variants["gzip"]) == b'{"title":"Course"}' * 200
+
+
+def test_entry_frame_keeps_variants():
+    """Сжатые варианты лежат в кадре Redis сразу за телом"""
+    payload = CachedPayload(b"body\nwith newline", {"etag": '"x"'}, {"br": b"\x00br", "gzip": b"\x1f\x8b\n"})
+    entry = _decode_entry(_encode_entry({"v": payload, "s": 1.0, "d": 0.0}))
+    assert entry["v"] == payload
+    plain = _decode_entry(_encode_entry({"v": CachedPayload(b"[]"), "s": 1.0, "d": 0.0}))
+    assert plain["v"] == CachedPayload(b"[]", {}, {})
+
+
+@pytest.fixture
+def courses(session_factory):
+    with session_factory() as db:
+        db.add_all([Course(id=i, title=f"Course {i}", description="Description " * 5) for i in range(1, 51)])
+        db.commit()
+
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=None)
+    redis.set = AsyncMock(return_value=True)
+    redis.setex = AsyncMock()
+    redis.eval = AsyncMock()
+    with patch('src.infrastructure.cache.get_async_redis', return_value=redis):
+        yield redis
+
+
+def test_hit_serves_precompressed_variant(courses, redis, client):
+    """Сжатие — один раз на промахе; попадание отдаёт готовый вариант по Accept-Encoding"""
+    first = client.get("/api/courses?limit=50", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["Vary"] == "Accept-Encoding"
+    assert len(first.json()) == 50
+
+    with patch('src.interfaces.http.routers.courses.compress_variants') as compress:
+        plain = client.get("/api/courses?limit=50", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+        assert plain.json() == first.json()
+        # У каждого представления свой ETag
+        assert plain.headers["ETag"] != first.headers["ETag"]
+
+        response = client.get("/api/courses?limit=50",
+                              headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+        assert response.status_code == 304
+    compress.assert_not_called()
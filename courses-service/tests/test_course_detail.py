@@ -0,0 +1,89 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.infrastructure.aggregates import setup_aggregates
+from src.infrastructure.models import Course
+
+
+@pytest.fixture
+def client(client):
+    """Кэш обходится"""
+    with patch('src.interfaces.http.routers.courses.aversioned_key', return_value=None), \
+         patch('src.interfaces.http.routers.courses.schedule_rewarm'):
+        yield client
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+def test_aggregates_follow_lesson_writes(mock_invalidate, client):
+    """Число уроков и длина текста меняются вместе с записями уроков, без пересчёта на чтении"""
+    course_id = client.post("/api/courses", json={"title": "Курс"}).json()["id"]
+    first = client.post(f"/api/courses/{course_id}/lessons", json={"title": "1", "content": "абвгд"}).json()
+    client.post(f"/api/courses/{course_id}/lessons", json={"title": "2", "content": "еж"})
+    client.put(f"/api/courses/{course_id}/lessons/{first['id']}", json={"content": "абв"})
+    mock_invalidate.assert_any_call(f"course:{course_id}")
+
+    detail = client.get(f"/api/courses/{course_id}")
+    assert detail.status_code == 200
+    body = detail.json()
+    assert (body["title"], body["lesson_count"], body["content_length"]) == ("Курс", 2, 5)
+    assert body["updated_at"].endswith(("Z", "+00:00"))
+    assert detail.headers["Last-Modified"].endswith("GMT")
+
+    client.delete(f"/api/courses/{course_id}/lessons/{first['id']}")
+    client.post(f"/api/courses/{course_id}/lessons/bulk", json={"lessons": [{"title": "3", "content": "зийк"}]})
+    body = client.get(f"/api/courses/{course_id}").json()
+    assert (body["lesson_count"], body["content_length"]) == (2, 6)
+
+    assert client.get("/api/courses/999").status_code == 404
+
+
+def test_lesson_edits_lock_the_row(client, session_factory):
+    """Правка и удаление урока читают его с FOR UPDATE: дельта длины не считается от устаревшего текста"""
+    course_id = client.post("/api/courses", json={"title": "Курс"}).json()["id"]
+    lesson = client.post(f"/api/courses/{course_id}/lessons", json={"title": "1", "content": "абв"}).json()
+    selects = []
+
+    def record(state):
+        if state.is_select:
+            selects.append(str(state.statement.compile(dialect=postgresql.dialect())))
+
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        client.put(f"/api/courses/{course_id}/lessons/{lesson['id']}", json={"content": "абвгд"})
+        client.delete(f"/api/courses/{course_id}/lessons/{lesson['id']}")
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+
+    # refresh после commit читает урок по ключу, без блокировки
+    lookups = [s for s in selects if "lessons.course_id = " in s]
+    assert len(lookups) == 2 and all(s.endswith("FOR UPDATE") for s in lookups)
+    assert client.get(f"/api/courses/{course_id}").json()["content_length"] == 0
+
+
+def test_setup_aggregates_backfills_existing_table():
+    """В базе без колонок агрегатов они добавляются на старте и заполняются по урокам"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE courses (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, description TEXT)"))
+        conn.execute(text("CREATE TABLE lessons (id INTEGER PRIMARY KEY, course_id INTEGER NOT NULL, "
+                          "title VARCHAR(255) NOT NULL, content TEXT NOT NULL, \"order\" INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO courses (id, title) VALUES (1, 'a'), (2, 'b')"))
+        conn.execute(text("INSERT INTO lessons VALUES (1, 1, 't', 'текст', 0), (2, 1, 't', 'ab', 1)"))
+    setup_aggregates(engine)
+    setup_aggregates(engine)
+    with sessionmaker(bind=engine)() as db:
+        courses = {row.id: row for row in db.query(Course)}
+        assert (courses[1].lesson_count, courses[1].content_length) == (2, 7)
+        assert (courses[2].lesson_count, courses[2].content_length) == (0, 0)
+        assert courses[1].updated_at is not None
@@ -91,6 +91,104 @@ def test_list_courses_with_pagination(client, mock_db):
     assert len(data) == 1
     assert data[0]["title"] == "Test Course"
 
+def test_list_courses_cursor_pagination(client, mock_db):
+    """Полная страница отдаёт курсор, а after= переключает запрос на keyset"""
+    from src.infrastructure.models import Course
+    courses = []
+    for i in (5, 6):
+        course = Mock(spec=Course)
+        course.id = i
+        course.title = f"Course {i}"
+        course.description = None
+        courses.append(course)
+
+    mock_query = MagicMock()
+    mock_query.order_by.return_value = mock_query
+    mock_query.filter.return_value = mock_query
+    mock_query.limit.return_value = mock_query
+    mock_query.offset.return_value = mock_query
+    mock_query.all.return_value = courses
+    mock_db.query.return_value = mock_query
+
+    first = client.get("/api/courses?limit=2")
+    cursor = first.headers["X-Next-Cursor"]
+    mock_query.filter.assert_not_called()
+
+    response = client.get(f"/api/courses?limit=2&after={cursor}")
+    assert response.status_code == 200
+    mock_query.filter.assert_called_once()
+    assert str(mock_query.filter.call_args.args[0].right.value) == "6"
+
+    mock_query.all.return_value = courses[:1]
+    response = client.get(f"/api/courses?limit=2&after={cursor}")
+    assert "X-Next-Cursor" not in response.headers
+
+def test_list_courses_invalid_cursor(client):
+    """Повреждённый курсор — 400, а не 500"""
+    response = client.get("/api/courses?after=not-a-cursor")
+    assert response.status_code == 400
+
+def test_list_courses_cache_hit_skips_db(client, mock_db):
+    """Попадание в кэш обслуживается без обращения к БД"""
+    from unittest.mock import AsyncMock, patch
+    cached = {
+        "courses:list:gen": "3",
+        "courses:list:3:10:0": b'{"s":9999999999,"d":0,"m":{"headers":{"X-Next-Cursor":"abc"}}}\n[{"id":1,"title":"Cached","description":null}]',
+    }
+    mock_redis = MagicMock()
+    mock_redis.get = AsyncMock(side_effect=lambda key: cached.get(key))
+    with patch('src.infrastructure.cache.get_async_redis', return_value=mock_redis):
+        response = client.get("/api/courses?limit=10&offset=0")
+    assert response.status_code == 200
+    assert response.content == b'[{"id":1,"title":"Cached","description":null}]'
+    assert response.headers["X-Next-Cursor"] == "abc"
+    mock_db.query.assert_not_called()
+
+def test_list_courses_not_modified_from_cache(client, mock_db):
+    """If-None-Match с текущим ETag — 304 из кэша без обращения к БД"""
+    from unittest.mock import AsyncMock, patch
+    cached = {
+        "courses:list:gen": "3",
+        "courses:list:3:10:0": b'{"s":9999999999,"d":0,"m":{"etag":"\\"abc\\""}}\n[]',
+    }
+    mock_redis = MagicMock()
+    mock_redis.get = AsyncMock(side_effect=lambda key: cached.get(key))
+    with patch('src.infrastructure.cache.get_async_redis', return_value=mock_redis):
+        response = client.get("/api/courses", headers={"If-None-Match": 'W/"abc"'})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"abc"'
+        assert response.content == b""
+
+        response = client.get("/api/courses", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+    mock_db.query.assert_not_called()
+
+def test_course_lessons_etag_changes_with_data(client, mock_db):
+    """Без кэша ETag считается по телу ответа и меняется вместе с данными"""
+    from src.infrastructure.models import Lesson
+    lesson = Mock(spec=Lesson)
+    lesson.id = 1
+    lesson.course_id = 1
+    lesson.title = "Lesson"
+    lesson.content = "Content"
+    lesson.order = 1
+
+    mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.order_by.return_value = mock_query
+    mock_query.first.return_value = (1,)
+    mock_query.all.return_value = [lesson]
+    mock_db.query.return_value = mock_query
+
+    first = client.get("/api/courses/1/lessons")
+    etag = first.headers["ETag"]
+    assert client.get("/api/courses/1/lessons", headers={"If-None-Match": etag}).status_code == 304
+
+    lesson.title = "Renamed"
+    response = client.get("/api/courses/1/lessons", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
 def test_list_courses_invalid_pagination(client):
     """Тест невалидной пагинации"""
     response = client.get("/api/courses?limit=0")
@@ -151,6 +249,56 @@ def test_get_course_lessons_empty(client, mock_db):
     assert response.status_code == 200
     assert response.json() == []
 
+def test_get_course_lessons_summary(client, mock_db):
+    """summary-режим не читает content и отдаёт только id, title, order"""
+    from src.infrastructure.models import Lesson
+    lesson = Mock(spec=Lesson)
+    lesson.id = 1
+    lesson.title = "Lesson"
+    lesson.order = 1
+
+    mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.order_by.return_value = mock_query
+    mock_query.options.return_value = mock_query
+    mock_query.first.return_value = (1,)
+    mock_query.all.return_value = [lesson]
+    mock_db.query.return_value = mock_query
+
+    response = client.get("/api/courses/1/lessons?view=summary")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "title": "Lesson", "order": 1}]
+    mock_query.options.assert_called_once()
+
+def test_get_lesson(client, mock_db):
+    """Отдельный урок отдаётся целиком"""
+    from src.infrastructure.models import Lesson
+    lesson = Mock(spec=Lesson)
+    lesson.id = 2
+    lesson.course_id = 1
+    lesson.title = "Lesson"
+    lesson.content = "Content"
+    lesson.order = 1
+
+    mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.first.return_value = lesson
+    mock_db.query.return_value = mock_query
+
+    response = client.get("/api/courses/1/lessons/2")
+    assert response.status_code == 200
+    assert response.json()["content"] == "Content"
+
+def test_get_lesson_not_found(client, mock_db):
+    """Урок другого курса или несуществующий — 404"""
+    mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.first.return_value = None
+    mock_db.query.return_value = mock_query
+
+    response = client.get("/api/courses/1/lessons/999")
+    assert response.status_code == 404
+
 def test_create_course_unauthorized(client):
     """Тест создания курса без авторизации"""
     response = client.post(
@@ -0,0 +1,142 @@
+import asyncio
+import base64
+import os
+import sys
+import time
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from src.config import settings
+from src.infrastructure import jwks
+from src.infrastructure.jwks import JwksClient
+from src.infrastructure.token_cache import token_cache
+from src.interfaces.http import authz
+
+
+def make_key(kid: str) -> tuple[str, dict]:
+    """(PEM закрытого ключа, публичный JWK) — как их публикует auth-service"""
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption()).decode()
+    return pem, {**jwk.construct(pem, "RS256").public_key().to_dict(), "kid": kid, "use": "sig"}
+
+
+KEY1, KEY2 = make_key("k1"), make_key("k2")
+
+
+def sign(key: tuple[str, dict], **claims) -> str:
+    payload = {"sub": "user@example.com", "role": "student", "exp": int(time.time() + 3600), **claims}
+    return jwt.encode(payload, key[0], algorithm="RS256", headers={"kid": key[1]["kid"]})
+
+
+class JwksServer:
+    """JWKS auth-service на httpx.MockTransport: набор ключей можно менять, запросы считаются"""
+
+    def __init__(self, *keys):
+        self.keys = [key[1] for key in keys]
+        self.requests = 0
+        self.fail = False
+        self.delay = 0.0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": self.keys})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = JwksServer(KEY1)
+    monkeypatch.setattr(settings, "JWT_JWKS_URL", "http://auth/.well-known/jwks.json")
+    monkeypatch.setattr(jwks, "jwks_client", JwksClient(settings.JWT_JWKS_URL, min_refresh_interval=0,
+                                                        transport=httpx.MockTransport(server.handler)))
+    token_cache.clear()
+    yield server
+    token_cache.clear()
+
+
+def claims(token: str) -> dict:
+    return asyncio.run(authz.get_claims(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+
+
+def rejected(token: str) -> bool:
+    with pytest.raises(HTTPException) as exc:
+        claims(token)
+    return exc.value.status_code == 401
+
+
+def test_token_is_verified_with_jwks_key(server):
+    assert claims(sign(KEY1))["sub"] == "user@example.com"
+    assert claims(sign(KEY1, sub="other@example.com"))["sub"] == "other@example.com"
+    # Ключи загружены один раз, дальше проверка локальная
+    assert server.requests == 1
+
+
+def test_rotated_key_is_fetched_by_kid(server):
+    claims(sign(KEY1))
+    server.keys = [KEY2[1], KEY1[1]]
+    assert claims(sign(KEY2))["sub"] == "user@example.com"
+    assert server.requests == 2
+    # Прежний ключ остаётся в JWKS — его токены всё ещё проходят
+    assert claims(sign(KEY1, sub="old@example.com"))["sub"] == "old@example.com"
+
+
+def test_unknown_kid_refreshes_at_most_once_per_interval(server):
+    jwks.jwks_client.min_refresh_interval = 60
+    claims(sign(KEY1))
+    unknown = make_key("k9")
+    assert rejected(sign(unknown))
+    assert rejected(sign(unknown, sub="again@example.com"))
+    # Ключи только что загружены — выдуманные kid не ходят в auth-service
+    assert server.requests == 1
+
+
+def test_forged_tokens_are_rejected(server):
+    claims(sign(KEY1))
+    # Подпись чужим ключом с известным kid
+    assert rejected(sign((KEY2[0], KEY1[1])))
+    # HS256 с публичным ключом в роли секрета
+    forged = jwt.encode({"sub": "admin@example.com", "role": "admin", "exp": int(time.time() + 60)},
+                        base64.b64encode(KEY1[1]["n"].encode()).decode(), algorithm="HS256", headers={"kid": "k1"})
+    assert rejected(forged)
+    assert rejected("not-a-jwt")
+
+
+def test_failed_refresh_keeps_known_keys(server):
+    client = jwks.jwks_client
+    asyncio.run(client.refresh())
+    server.fail = True
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.refresh())
+    assert claims(sign(KEY1))["sub"] == "user@example.com"
+
+
+def test_request_waits_for_background_refresh_in_flight(server):
+    client = jwks.jwks_client
+    client.min_refresh_interval = 60
+    server.delay = 0.1
+    token = sign(KEY1)
+
+    async def scenario():
+        client.start()
+        await asyncio.sleep(0.01)  # фоновая загрузка на старте ещё идёт
+        try:
+            return await authz.get_claims(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+        finally:
+            await client.stop()
+
+    assert asyncio.run(scenario())["sub"] == "user@example.com"
+    assert server.requests == 1
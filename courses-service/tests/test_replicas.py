@@ -0,0 +1,215 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from sqlalchemy import create_engine
+from starlette.requests import Request
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.cache import invalidate_namespace, local_cache
+from src.infrastructure.db import RoutingSession
+from src.infrastructure.models import Base, Course
+from src.infrastructure.replicas import ReplicaSet
+from src.interfaces.http.consistency import PRIMARY_STICKY_COOKIE
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary и реплика — два файла SQLite; «репликация» отстаёт: реплика не видит записей"""
+    urls = [f"sqlite:///{tmp_path}/primary.db", f"sqlite:///{tmp_path}/replica.db"]
+    engines = [create_engine(url, connect_args={"check_same_thread": False}) for url in urls]
+    for engine in engines:
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Course(id=1, title="Course"))
+            db.commit()
+    yield urls, engines
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(databases):
+    """Сессии запросов открываются на primary, use_replica переводит чтения на реплику"""
+    _, (primary, _) = databases
+    return sessionmaker(bind=primary, class_=RoutingSession, autoflush=False)
+
+
+@pytest.fixture
+def client(client, databases):
+    """Клиент из conftest с одной здоровой репликой"""
+    (_, replica_url), (_, replica) = databases
+    with patch('src.infrastructure.db.replicas', ReplicaSet([replica_url], [replica])), \
+         patch('src.interfaces.http.consistency.replicas', [replica]), \
+         patch('src.interfaces.http.routers.courses.invalidate_namespace'):
+        yield client
+
+
+def test_routing_session_reads_replica_writes_primary(databases):
+    """Чтение идёт на назначенную реплику, flush — на primary"""
+    _, (primary, replica) = databases
+    with RoutingSession(bind=primary) as db:
+        db.info["replica_bind"] = replica
+        db.add(Course(id=2, title="New"))
+        db.commit()
+        assert [c.id for c in db.query(Course).order_by(Course.id)] == [1]
+    with sessionmaker(bind=primary)() as db:
+        assert db.get(Course, 2).title == "New"
+
+
+def test_reads_go_to_replica_until_admin_writes(client):
+    """После записи админ читает с primary, остальные клиенты — с реплики"""
+    assert client.get("/api/courses").json() == [{"id": 1, "title": "Course", "description": None}]
+
+    response = client.put("/api/courses/1", json={"title": "Renamed"})
+    assert response.status_code == 200
+    assert PRIMARY_STICKY_COOKIE in response.cookies
+    assert client.get("/api/courses").json()[0]["title"] == "Renamed"
+
+    client.cookies.clear()
+    assert client.get("/api/courses").json()[0]["title"] == "Course"
+
+
+class FakeRedis:
+    """Redis в словаре: то, что нужно поколениям, меткам записи и aget_or_load"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def publish(self, channel, message):
+        return 0
+
+    def eval(self, script, numkeys, key, token):
+        return int(self.store.pop(key, None) is not None)
+
+
+class AsyncFakeRedis:
+    def __init__(self, sync):
+        self._sync = sync
+
+    def __getattr__(self, name):
+        method = getattr(self._sync, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def redis_client(client):
+    redis = FakeRedis()
+    with patch('src.infrastructure.cache.get_redis', return_value=redis), \
+         patch('src.infrastructure.cache.get_async_redis', return_value=AsyncFakeRedis(redis)), \
+         patch('src.interfaces.http.routers.courses.invalidate_namespace', invalidate_namespace), \
+         patch('src.interfaces.http.routers.courses.schedule_rewarm'):
+        yield client, redis
+
+
+def test_cache_is_filled_from_primary_after_write(redis_client):
+    """Промах чужого клиента сразу после записи не кладёт в новое поколение строки отстающей реплики"""
+    client, redis = redis_client
+    assert client.put("/api/courses/1", json={"title": "Renamed"}).status_code == 200
+    client.cookies.clear()
+    local_cache.clear()
+
+    assert client.get("/api/courses").json()[0]["title"] == "Renamed"
+    cached = [value for key, value in redis.store.items() if key.startswith("courses:list:1:")]
+    assert len(cached) == 1 and b"Renamed" in cached[0] and b'"Course"' not in cached[0]
+
+    # Окно прошло: реплика снова заполняет кэш
+    redis.store.pop("courses:list:written")
+    local_cache.clear()
+    assert client.get("/api/courses?limit=5").json()[0]["title"] == "Course"
+
+
+def test_replica_set_skips_unhealthy(tmp_path):
+    """Round-robin по здоровым репликам; без здоровых — None (читаем с primary)"""
+    good = f"sqlite:///{tmp_path}/good.db"
+    bad = f"sqlite:///{tmp_path}/missing/bad.db"
+    replicas = ReplicaSet([good, bad, good], ["a", "b", "c"])
+    assert [replicas.pick() for _ in range(3)] == ["a", "b", "c"]
+
+    replicas.check()
+    assert [replicas.pick() for _ in range(4)] == ["c", "a", "c", "a"]
+
+    replicas = ReplicaSet([bad], ["b"])
+    replicas.check()
+    assert replicas.pick() is None
+
+
+def test_forged_sticky_cookie_does_not_bypass_cache(redis_client):
+    """Cookie без подписи сервиса не уводит чтения на primary мимо кэша"""
+    client, redis = redis_client
+    for forged in ("9999999999", "9999999999.deadbeef"):
+        client.cookies.set(PRIMARY_STICKY_COOKIE, forged, path="/api/courses")
+        assert client.get("/api/courses").json()[0]["title"] == "Course"
+    # Первый запрос заполнил кэш, второй отдан из него
+    assert [key for key in redis.store if key.startswith("courses:list:0:")] == ["courses:list:0:10:0"]
+
+
+def test_sticky_cookie_ignored_without_replicas(client):
+    """Без реплик cookie не выдаётся и не учитывается"""
+    from src.interfaces.http import consistency
+    response = client.put("/api/courses/1", json={"title": "Renamed"})
+    cookie = response.cookies[PRIMARY_STICKY_COOKIE]
+    request = Request({"type": "http", "headers": [(b"cookie", f"{PRIMARY_STICKY_COOKIE}={cookie}".encode())]})
+    assert consistency.is_primary_sticky(request)
+    with patch.object(consistency, "replicas", []):
+        assert not consistency.is_primary_sticky(request)
+        response = client.put("/api/courses/1", json={"title": "Again"})
+        assert PRIMARY_STICKY_COOKIE not in response.cookies
+
+
+def test_cache_fill_does_not_use_request_session(redis_client):
+    """Промах заполняет кэш в своей сессии: её результат ждут другие запросы, а сессию запроса закрывает его teardown"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from src.infrastructure.db import get_db
+    from src.main import app
+
+    client, _ = redis_client
+    original = app.dependency_overrides[get_db]
+    request_sessions, used = [], []
+
+    def tracked():
+        for db in original():
+            request_sessions.append(db)
+            yield db
+
+    def record(state):
+        used.append(state.session)
+
+    app.dependency_overrides[get_db] = tracked
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        assert client.get("/api/courses/1/lessons").status_code == 200
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+
+    assert request_sessions and used
+    assert not any(db is request for db in used for request in request_sessions)
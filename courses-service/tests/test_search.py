@@ -0,0 +1,102 @@
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+
+from src.infrastructure.db import get_db
+from src.infrastructure.models import Course, Lesson
+from src.infrastructure.search import setup_search, search_courses
+from src.main import app
+
+
+@pytest.fixture
+def db(engine, session_factory):
+    """Настоящая SQLite в памяти: проверяем FTS5-индекс и триггеры"""
+    session = session_factory()
+    session.add_all([
+        Course(id=1, title="Основы Python", description="Переменные и функции"),
+        Course(id=2, title="Базы данных", description="SQL и индексы"),
+        Course(id=3, title="Веб-разработка", description="HTTP и REST"),
+    ])
+    session.add(Lesson(course_id=3, title="Бэкенд на Python", content="FastAPI", order=1))
+    session.commit()
+    # Индекс создаётся поверх уже существующих строк
+    setup_search(engine)
+    yield session
+    session.close()
+
+
+def test_search_ranks_course_matches_above_lesson_matches(db):
+    """Совпадение в названии курса выше совпадения в уроке"""
+    results = search_courses(db, "python", limit=10)
+    assert [r["id"] for r in results] == [1, 3]
+    assert results[0]["rank"] > results[1]["rank"]
+
+
+def test_search_follows_writes(db):
+    """Триггеры поддерживают индекс при вставке, изменении и удалении"""
+    db.add(Course(id=4, title="Python для анализа данных"))
+    db.commit()
+    assert 4 in [r["id"] for r in search_courses(db, "анализа", limit=10)]
+
+    course = db.get(Course, 2)
+    course.title = "Хранилища"
+    db.commit()
+    assert search_courses(db, "базы", limit=10) == []
+
+    db.delete(db.get(Course, 1))
+    db.commit()
+    assert 1 not in [r["id"] for r in search_courses(db, "python", limit=10)]
+
+
+def test_search_cursor_pagination(db):
+    """Страницы по курсору (rank, id) не пересекаются и покрывают всю выдачу"""
+    first = search_courses(db, "python", limit=1)
+    second = search_courses(db, "python", limit=1, after=(first[0]["rank"], first[0]["id"]))
+    assert [r["id"] for r in first + second] == [1, 3]
+    assert search_courses(db, "python", limit=1, after=(second[0]["rank"], second[0]["id"])) == []
+
+
+def test_search_ignores_query_syntax(db):
+    """Пользовательский ввод не ломает запрос FTS5"""
+    assert [r["id"] for r in search_courses(db, 'python" (NEAR', limit=10)] == []
+    assert [r["id"] for r in search_courses(db, 'python" (', limit=10)] == [1, 3]
+    assert search_courses(db, "***", limit=10) == []
+
+
+def test_search_endpoint(db, client):
+    """Эндпоинт отдаёт выдачу с rank и курсором следующей страницы"""
+    response = client.get("/api/courses/search?q=python&limit=1")
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == 1
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/courses/search?q=python&limit=1&after={cursor}")
+    assert [r["id"] for r in response.json()] == [3]
+    assert client.get("/api/courses/search?q=").status_code == 422
+
+
+@patch('src.interfaces.http.routers.courses.invalidate_namespace')
+def test_crud_invalidates_search_cache(mock_invalidate):
+    """Запись в курсы и уроки сбрасывает поколение кэша поиска"""
+    from src.interfaces.http.authz import require_admin
+    mock_db = MagicMock()
+    mock_db.refresh.side_effect = lambda row: setattr(row, "id", 1)
+    def override_get_db():
+        yield mock_db
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[require_admin] = lambda: {"sub": "admin@example.com", "role": "admin"}
+    try:
+        client = TestClient(app)
+        client.post("/api/courses", json={"title": "New"})
+    finally:
+        app.dependency_overrides.clear()
+    namespaces = [c.args[0] for c in mock_invalidate.call_args_list]
+    assert "courses:search" in namespaces
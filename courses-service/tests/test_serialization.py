@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure.serialization import FastJSONResponse, select_backend
+from src.main import app
+
+
+def _backends():
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            yield select_backend(name)
+        except ImportError:
+            continue
+
+
+@pytest.mark.parametrize("backend", list(_backends()), ids=lambda b: b[0])
+def test_backends_are_interchangeable(backend):
+    """Любой бэкенд читает то, что записал другой: кэш в Redis переживает смену JSON_BACKEND"""
+    _, dumps, loads = backend
+    value = {"id": 1, "title": "Курс", "lessons": [{"order": 1, "content": "текст"}], "score": 0.5}
+    raw = dumps(value)
+    assert isinstance(raw, bytes)
+    # Без пробелов и \u-экранирования: тело ответа совпадает со stdlib
+    assert raw == select_backend("json")[1](value)
+    assert loads(raw) == loads(raw.decode()) == value
+    with pytest.raises(ValueError):
+        loads(b"{broken")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        select_backend("yaml")
+
+
+def test_app_renders_with_fast_serializer():
+    assert app.router.default_response_class is FastJSONResponse
+    assert FastJSONResponse({"title": "Курс"}).body == '{"title":"Курс"}'.encode()
@@ -0,0 +1,192 @@
+import os
+import sys
+import asyncio
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from src.infrastructure.singleflight import SingleFlight
+from src.infrastructure.cache import CachedPayload, aget_or_load, _encode_entry
+from src.infrastructure.metrics import cache_coalesced_waiters_total, cache_refreshes_total
+
+
+ONE = CachedPayload(b'[{"id":1}]')
+TWO = CachedPayload(b'[{"id":2}]')
+
+
+def _frame(payload: CachedPayload, soft_expires_at: float, compute_time: float) -> bytes:
+    return _encode_entry({"v": payload, "s": soft_expires_at, "d": compute_time})
+
+
+def _waiters(scope: str) -> float:
+    return cache_coalesced_waiters_total.labels(scope=scope)._value.get()
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """Конкурентные вызовы по одному ключу выполняют функцию один раз"""
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [{"id": 1}]
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+
+    before = _waiters("local")
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(r == [{"id": 1}] for r in results)
+    assert _waiters("local") - before == 9
+    assert len(flight) == 0
+
+
+def test_singleflight_propagates_errors():
+    """Ошибка вычисления получают все ожидающие, следующий вызов пересчитывает"""
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert asyncio.run(flight.do("key", AsyncMock(return_value=42))) == 42
+
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_leader_fills_cache(mock_redis):
+    """Получивший блокировку вычисляет значение, кладёт в кэш и снимает блокировку"""
+    client = MagicMock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock(return_value=True)
+    client.setex = AsyncMock()
+    client.eval = AsyncMock()
+    mock_redis.return_value = client
+    loader = AsyncMock(return_value=ONE)
+
+    assert asyncio.run(aget_or_load("courses:list:0:10:0", loader)) == ONE
+    loader.assert_awaited_once()
+    client.set.assert_awaited_once()
+    assert client.set.await_args.args[0] == "courses:list:0:10:0:lock"
+    client.setex.assert_awaited_once()
+    client.eval.assert_awaited_once()
+
+
+@patch('src.infrastructure.cache.settings.CACHE_LOCK_POLL_INTERVAL', 0.001)
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_waits_for_other_replica(mock_redis):
+    """Без блокировки ждём, пока другая реплика заполнит кэш, и не идём в БД"""
+    filled = _frame(TWO, time.time() + 60, 0.01)
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[None, None, filled])
+    client.set = AsyncMock(return_value=False)
+    client.exists = AsyncMock(return_value=1)
+    mock_redis.return_value = client
+    loader = AsyncMock()
+
+    before = _waiters("distributed")
+    assert asyncio.run(aget_or_load("course:1:0:lessons", loader)) == TWO
+    loader.assert_not_awaited()
+    assert _waiters("distributed") - before == 1
+
+
+@patch('src.infrastructure.cache.settings.CACHE_LOCK_POLL_INTERVAL', 0.001)
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_recomputes_when_lock_released_without_value(mock_redis):
+    """Если лидер снял блокировку, не заполнив кэш, вычисляем сами"""
+    client = MagicMock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock(return_value=False)
+    client.exists = AsyncMock(return_value=0)
+    client.setex = AsyncMock()
+    mock_redis.return_value = client
+    loader = AsyncMock(return_value=CachedPayload(b"[]"))
+
+    assert asyncio.run(aget_or_load("course:1:0:lessons", loader)).body == b"[]"
+    loader.assert_awaited_once()
+
+
+def _refreshes(reason: str) -> float:
+    return cache_refreshes_total.labels(reason=reason)._value.get()
+
+
+def _entry_client(raw: bytes) -> MagicMock:
+    client = MagicMock()
+    client.get = AsyncMock(return_value=raw)
+    client.set = AsyncMock(return_value=True)
+    client.setex = AsyncMock()
+    client.eval = AsyncMock()
+    return client
+
+
+async def _get_and_drain(key, loader, refresh_loader=None):
+    value = await aget_or_load(key, loader, refresh_loader=refresh_loader)
+    # Даём фоновому обновлению завершиться внутри того же цикла
+    for _ in range(5):
+        await asyncio.sleep(0)
+    return value
+
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_serves_stale_and_refreshes_in_background(mock_redis):
+    """После мягкого срока отдаём старое значение и обновляем запись в фоне"""
+    client = _entry_client(_frame(ONE, time.time() - 1, 0.01))
+    mock_redis.return_value = client
+    loader = AsyncMock()
+    refresh_loader = AsyncMock(return_value=TWO)
+
+    before = _refreshes("stale")
+    assert asyncio.run(_get_and_drain("courses:list:0:10:0", loader, refresh_loader)) == ONE
+    loader.assert_not_awaited()
+    refresh_loader.assert_awaited_once()
+    assert _refreshes("stale") - before == 1
+    assert client.setex.await_args.args[2].endswith(b'\n[{"id":2}]')
+
+
+@patch('src.infrastructure.cache.random.random', return_value=0.999999)
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_xfetch_refreshes_early(mock_redis, _random):
+    """XFetch: дорогая запись рядом со сроком обновляется досрочно"""
+    client = _entry_client(_frame(ONE, time.time() + 1, 0.5))
+    mock_redis.return_value = client
+    refresh_loader = AsyncMock(return_value=TWO)
+
+    before = _refreshes("early")
+    assert asyncio.run(_get_and_drain("courses:list:0:10:0", AsyncMock(), refresh_loader)) == ONE
+    refresh_loader.assert_awaited_once()
+    assert _refreshes("early") - before == 1
+
+
+@patch('src.infrastructure.cache.random.random', return_value=0.5)
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_fresh_entry_not_refreshed(mock_redis, _random):
+    """Свежая запись далеко от срока отдаётся без обновления"""
+    client = _entry_client(_frame(ONE, time.time() + 300, 0.01))
+    mock_redis.return_value = client
+    refresh_loader = AsyncMock()
+
+    assert asyncio.run(_get_and_drain("courses:list:0:10:0", AsyncMock(), refresh_loader)) == ONE
+    refresh_loader.assert_not_awaited()
+    client.setex.assert_not_awaited()
+
+
+@patch('src.infrastructure.cache.get_async_redis')
+def test_aget_or_load_skips_refresh_when_locked(mock_redis):
+    """Если запись уже обновляет другая реплика, в фоне ничего не считаем"""
+    client = _entry_client(_frame(ONE, time.time() - 1, 0.01))
+    client.set = AsyncMock(return_value=False)
+    mock_redis.return_value = client
+    refresh_loader = AsyncMock()
+
+    assert asyncio.run(_get_and_drain("courses:list:0:10:0", AsyncMock(), refresh_loader)) == ONE
+    refresh_loader.assert_not_awaited()
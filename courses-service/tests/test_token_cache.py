@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import time
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from src.config import settings
+from src.infrastructure.token_cache import TokenCache, token_cache
+from src.interfaces.http import authz
+
+
+def make_token(exp_offset: float = 3600, **claims) -> str:
+    payload = {"sub": "user@example.com", "role": "student", "exp": int(time.time() + exp_offset), **claims}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_JWKS_URL", "")
+    token_cache.clear()
+    calls = []
+    real_decode = authz.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(authz.jwt, "decode", counting_decode)
+    yield calls
+    token_cache.clear()
+
+
+def test_repeated_token_is_decoded_once(decode_calls):
+    token = make_token()
+    first = asyncio.run(authz.get_claims(bearer(token)))
+    second = asyncio.run(authz.get_claims(bearer(token)))
+    assert first == second and first["sub"] == "user@example.com"
+    assert len(decode_calls) == 1
+
+
+def test_cached_claims_are_copies(decode_calls):
+    token = make_token()
+    asyncio.run(authz.get_claims(bearer(token)))["role"] = "admin"
+    assert asyncio.run(authz.get_claims(bearer(token)))["role"] == "student"
+
+
+def test_invalid_token_is_not_cached(decode_calls):
+    token = make_token()[:-2] + "xx"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(authz.get_claims(bearer(token)))
+        assert exc.value.status_code == 401
+    assert len(decode_calls) == 2
+    assert len(token_cache) == 0
+
+
+def test_entry_expires_with_token():
+    cache = TokenCache(maxsize=10)
+    cache.set("expired", {"sub": "a", "exp": time.time() - 1})
+    cache.set("no-exp", {"sub": "b"})
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+    assert len(cache) == 0
+
+
+def test_lru_is_bounded():
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.set("a", {"sub": "a", "exp": exp})
+    cache.set("b", {"sub": "b", "exp": exp})
+    cache.get("a")
+    cache.set("c", {"sub": "c", "exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a")["sub"] == "a" and cache.get("c")["sub"] == "c"
+
+
+def test_disabled_cache_always_decodes(decode_calls, monkeypatch):
+    monkeypatch.setattr(token_cache, "maxsize", 0)
+    token = make_token()
+    asyncio.run(authz.get_claims(bearer(token)))
+    asyncio.run(authz.get_claims(bearer(token)))
+    assert len(decode_calls) == 2
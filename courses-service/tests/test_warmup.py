@@ -0,0 +1,108 @@
+import os
+import sys
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi.testclient import TestClient
+from src.infrastructure.cache import CachedPayload
+from src.infrastructure.popularity import HitCounter
+from src.interfaces.http.routers import courses
+from src.main import app
+
+
+def _key(namespace, *parts):
+    return ":".join([namespace, "0", *map(str, parts)])
+
+
+@pytest.fixture
+def warm_env(monkeypatch):
+    """Кэш и БД подменены: фиксируем, какие ключи и какими загрузчиками прогреты"""
+    monkeypatch.setattr(courses.settings, "CACHE_WARM_PAGES", 2)
+    monkeypatch.setattr(courses.settings, "CACHE_WARM_PAGE_SIZES", "10,50")
+    filled = {}
+
+    async def fake_get_or_load(key, loader, **kwargs):
+        filled[key] = await loader()
+        return filled[key]
+
+    async def fake_session(load):
+        if load.func is courses._load_lessons and load.keywords["course_id"] == 404:
+            raise courses.HTTPException(404, "course not found")
+        return CachedPayload(repr(load.keywords).encode())
+
+    with patch.object(courses, "aversioned_key", AsyncMock(side_effect=_key)), \
+         patch.object(courses, "aget_or_load", side_effect=fake_get_or_load), \
+         patch.object(courses, "arun_with_session", side_effect=fake_session), \
+         patch.object(courses.lesson_hits, "top", AsyncMock(return_value=["7:summary", "404:full", "bad", "8:full"])):
+        yield filled
+
+
+def test_warm_cache_on_startup(warm_env):
+    """Первые страницы каждого размера и уроки популярных курсов; сбой одной записи не мешает остальным"""
+    warmed = asyncio.run(courses.warm_cache())
+    assert warmed == 6
+    assert set(warm_env) == {
+        "courses:list:0:10:0", "courses:list:0:10:10", "courses:list:0:50:0", "courses:list:0:50:50",
+        "course:7:0:lessons:summary", "course:8:0:lessons",
+    }
+    # ETag считается при заполнении, как и на обычном промахе
+    assert "etag" in warm_env["course:7:0:lessons:summary"].meta
+
+
+def test_rewarm_only_invalidated_namespaces(warm_env):
+    """После записи прогреваются только инвалидированные пространства имён"""
+    warmed = asyncio.run(courses.warm_cache([courses.course_ns(8), courses.COURSES_SEARCH_NS], trigger="write"))
+    assert warmed == 1
+    assert set(warm_env) == {"course:8:0:lessons"}
+
+
+def test_hit_counter_flushes_in_one_pipeline():
+    """Обращения копятся в памяти и уходят в Redis одним pipeline"""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis = MagicMock()
+    redis.pipeline.return_value = pipe
+    redis.zrevrange = AsyncMock(side_effect=ConnectionError)
+    counter = HitCounter("hits", flush_interval=3600)
+
+    async def scenario():
+        for member in ("1:full", "2:summary", "1:full"):
+            counter.hit(member)
+        # Без Redis рейтинг берётся из счётчиков процесса
+        assert await counter.top(1) == ["1:full"]
+        await counter.flush()
+
+    with patch("src.infrastructure.popularity.get_async_redis", return_value=redis):
+        asyncio.run(scenario())
+    pipe.zincrby.assert_any_call("hits", 2, "1:full")
+    pipe.zincrby.assert_any_call("hits", 1, "2:summary")
+    pipe.zremrangebyrank.assert_called_once_with("hits", 0, -1001)
+    pipe.execute.assert_awaited_once()
+
+
+def test_ready_waits_for_warmup(monkeypatch):
+    """/ready отвечает 503, пока не закончился прогрев"""
+    client = TestClient(app)
+    monkeypatch.setattr(app.state, "ready", False)
+    assert client.get("/ready").status_code == 503
+    monkeypatch.setattr(app.state, "ready", True)
+    assert client.get("/ready").json() == {"status": "ready"}
+
+
+def test_lesson_hits_count_only_existing_courses(client, session_factory):
+    """Обращение к урокам несуществующего курса не попадает в рейтинг прогрева"""
+    from src.infrastructure.models import Course
+    with session_factory() as db:
+        db.add(Course(id=1, title="Course"))
+        db.commit()
+    with patch.object(courses.lesson_hits, "hit") as hit:
+        assert client.get("/api/courses/404/lessons").status_code == 404
+        hit.assert_not_called()
+        assert client.get("/api/courses/1/lessons?view=summary").status_code == 200
+        hit.assert_called_once_with("1:summary")
@@ -12,6 +12,12 @@ function getToken() {
   return localStorage.getItem("access_token");
 }
 
+// Каталог курсов отдаётся с ETag: браузер хранит копию и перепроверяет её
+// через If-None-Match, получая 304 без тела, пока данные не изменились
+function catalogFetch(url) {
+  return fetch(url, { cache: "no-cache" });
+}
+
 async function authFetch(url, options = {}) {
   const token = getToken();
   const headers = options.headers ? { ...options.headers } : {};
@@ -117,7 +123,7 @@ function initIndexPage() {
     if (!coursesList) return;
     coursesList.innerHTML = "Загружаем курсы...";
     try {
-      const res = await fetch(`${API.courses}?limit=20&offset=0`);
+      const res = await catalogFetch(`${API.courses}?limit=20&offset=0`);
       if (!res.ok) throw new Error("Ошибка загрузки курсов");
       const data = await res.json();
       if (!data.length) {
@@ -172,14 +178,16 @@ function initCoursePage() {
   async function loadLessons() {
     lessonsList.innerHTML = "Загружаем уроки...";
     try {
-      const coursesRes = await fetch(`${API.courses}?limit=50&offset=0`);
-      const courses = await coursesRes.json();
-      const course = courses.find((c) => String(c.id) === String(courseId));
-      if (courseTitleEl && course) {
+      // Карточка курса и уроки — параллельно
+      const [courseRes, res] = await Promise.all([
+        catalogFetch(`${API.courses}/${courseId}`),
+        catalogFetch(`${API.courses}/${courseId}/lessons?view=summary`),
+      ]);
+      if (courseTitleEl && courseRes.ok) {
+        const course = await courseRes.json();
         courseTitleEl.textContent = course.title;
       }
 
-      const res = await fetch(`${API.courses}/${courseId}/lessons`);
       if (!res.ok) throw new Error("Ошибка загрузки уроков");
       const data = await res.json();
       if (!data.length) {
@@ -5,8 +5,15 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./progress.db"
     REDIS_URL: str = "redis://localhost:6379/2"
     SECRET_KEY: str = "dev-secret-progress"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # только без JWT_JWKS_URL, вместе с SECRET_KEY
+    # JWKS auth-service: токены проверяются локально ключом с kid из заголовка; пусто — HS256 с SECRET_KEY
+    JWT_JWKS_URL: str = "http://localhost:8000/.well-known/jwks.json"
+    JWT_JWKS_REFRESH_INTERVAL: float = 300.0  # seconds, фоновое обновление ключей
+    JWT_JWKS_MIN_REFRESH_INTERVAL: float = 5.0  # seconds, не чаще — внеочередное обновление на неизвестный kid
+    JWT_JWKS_TIMEOUT: float = 2.0  # seconds
+    JWT_CACHE_MAXSIZE: int = 10000  # проверенных токенов в in-process LRU; 0 отключает
     LOG_LEVEL: str = "INFO"
+    JSON_BACKEND: str = "auto"  # auto | orjson | msgspec | json — сериализатор кэша и HTTP-ответов
 
     class Config:
         env_file = ".env"
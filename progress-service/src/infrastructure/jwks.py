@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+import httpx
+import structlog
+from jose import JWTError, jwt
+
+from ..config import settings
+
+logger = structlog.get_logger()
+
+# Из JWKS принимаются только алгоритмы с открытым ключом: HS* с публичным ключом как секретом — подделка
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+
+class JwksClient:
+    """Ключи проверки JWT из JWKS auth-service, закэшированные в процессе.
+
+    Набор ключей обновляется в фоне раз в refresh_interval секунд. Токен с
+    неизвестным kid (auth-service сменил ключ) вызывает внеочередное обновление,
+    но не чаще min_refresh_interval — поток токенов с выдуманными kid не
+    превращается в поток запросов к auth. Ошибка обновления оставляет прежние ключи.
+    """
+
+    def __init__(self, url: str, refresh_interval: float = 300.0, min_refresh_interval: float = 5.0,
+                 timeout: float = 2.0, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._transport = transport
+        self._keys: dict[str, dict[str, Any]] = {}
+        self._attempted_at = float("-inf")
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        self._attempted_at = time.monotonic()
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self._transport) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json()["keys"]
+                    if key.get("kid") and key.get("alg") in ASYMMETRIC_ALGORITHMS}
+        if keys.keys() != self._keys.keys():
+            logger.info("JWKS keys updated", kids=sorted(keys))
+        self._keys = keys
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict[str, Any]]:
+        if not kid:
+            return None
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        # Одновременные запросы с новым kid (и фоновое обновление) ждут одно обновление
+        async with self._get_lock():
+            if kid not in self._keys and time.monotonic() - self._attempted_at >= self.min_refresh_interval:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning("JWKS refresh failed", url=self.url, error=str(e))
+        return self._keys.get(kid)
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Под тем же замком: запрос, пришедший во время загрузки, дождётся её, а не получит 401
+                async with self._get_lock():
+                    await self.refresh()
+            except Exception as e:
+                logger.warning("JWKS refresh failed", url=self.url, error=str(e))
+            # Пока ключей нет (auth ещё не поднялся), пробуем чаще
+            await asyncio.sleep(self.refresh_interval if self._keys else self.min_refresh_interval)
+
+    def start(self) -> None:
+        """Запустить фоновое обновление (из startup-хука, в работающем event loop)"""
+        if self.url and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+jwks_client = JwksClient(settings.JWT_JWKS_URL, settings.JWT_JWKS_REFRESH_INTERVAL,
+                         settings.JWT_JWKS_MIN_REFRESH_INTERVAL, settings.JWT_JWKS_TIMEOUT)
+
+
+async def verification_key(token: str) -> tuple[Any, list[str]]:
+    """Ключ и допустимые алгоритмы для jwt.decode; без JWT_JWKS_URL — общий SECRET_KEY"""
+    if not settings.JWT_JWKS_URL:
+        return settings.SECRET_KEY, [settings.JWT_ALGORITHM]
+    key = await jwks_client.get_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return key, [key["alg"]]
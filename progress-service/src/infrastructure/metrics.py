@@ -0,0 +1,10 @@
+from prometheus_client import Counter, generate_latest
+from fastapi import Response
+
+# Метрики кэша проверенных JWT
+jwt_cache_hits_total = Counter('jwt_cache_hits_total', 'Bearer tokens served from the verified-token cache')
+jwt_cache_misses_total = Counter('jwt_cache_misses_total', 'Bearer tokens verified with a full JWT decode')
+
+def metrics_endpoint():
+    """Endpoint для Prometheus метрик"""
+    return Response(content=generate_latest(), media_type="text/plain")
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+from ..config import settings
+
+Dumps = Callable[[Any], bytes]
+Loads = Callable[[Any], Any]
+
+
+def _stdlib() -> tuple[str, Dumps, Loads]:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    return "json", dumps, json.loads
+
+
+def _orjson() -> tuple[str, Dumps, Loads]:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        # Ключи-числа (id → ...) допускаются, как в json.dumps
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    return "orjson", dumps, orjson.loads
+
+
+def _msgspec() -> tuple[str, Dumps, Loads]:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Any) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Вызывающий код ловит ValueError, как от json.loads
+            raise ValueError(str(e)) from None
+
+    return "msgspec", encoder.encode, loads
+
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+
+def select_backend(name: str) -> tuple[str, Dumps, Loads]:
+    """(имя, dumps, loads) для JSON_BACKEND; auto — первый установленный из orjson, msgspec, json"""
+    if name == "auto":
+        for factory in _BACKENDS.values():
+            try:
+                return factory()
+            except ImportError:
+                continue
+    if name not in _BACKENDS:
+        raise ValueError(f"unknown JSON backend {name!r}")
+    return _BACKENDS[name]()
+
+
+BACKEND, dumps, loads = select_backend(settings.JSON_BACKEND)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse на выбранном сериализаторе; класс ответа по умолчанию для приложения"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,19 +1,25 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from ...config import settings
+from ...infrastructure.jwks import verification_key
+from ...infrastructure.token_cache import token_cache
 
 bearer = HTTPBearer()
 
-def get_claims(creds: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
-    try:
-        payload = jwt.decode(creds.credentials, settings.SECRET_KEY,
-                             algorithms=[settings.JWT_ALGORITHM])
+# async: проверка токена — микросекунды CPU, переход в threadpool на каждый запрос дороже её
+async def get_claims(creds: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
+    payload = token_cache.get(creds.credentials)
+    if payload is not None:
         return payload
+    try:
+        key, algorithms = await verification_key(creds.credentials)
+        payload = jwt.decode(creds.credentials, key, algorithms=algorithms)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    token_cache.set(creds.credentials, payload)
+    return payload
 
-def get_user_email(claims: dict = Depends(get_claims)) -> str:
+async def get_user_email(claims: dict = Depends(get_claims)) -> str:
     sub = claims.get("sub")
     if not sub:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
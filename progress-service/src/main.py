@@ -5,6 +5,9 @@ from fastapi import FastAPI, Request
 from sqlalchemy import text
 from .infrastructure.db import engine
 from .infrastructure.models import Base
+from .infrastructure.jwks import jwks_client
+from .infrastructure.metrics import metrics_endpoint
+from .infrastructure.serialization import FastJSONResponse
 from .interfaces.http.routers import progress as progress_router
 from .config import settings
 
@@ -24,7 +27,7 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-app = FastAPI(title="Progress Service", version="0.1.0")
+app = FastAPI(title="Progress Service", version="0.1.0", default_response_class=FastJSONResponse)
 
 # Добавляем middleware для правильной кодировки и логирования
 @app.middleware("http")
@@ -59,7 +62,23 @@ def on_startup():
         conn.execute(text("SELECT 1"))
     logger.info("Database connection established")
 
+
+@app.on_event("startup")
+async def start_jwks_refresh():
+    # Ключи проверки токенов из JWKS auth-service, обновляются в фоне
+    jwks_client.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await jwks_client.stop()
+
 @app.get("/health")
 def health(): return {"status":"ok"}
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics endpoint"""
+    return metrics_endpoint()
+
 app.include_router(progress_router.router)
@@ -7,6 +7,7 @@ if SERVICE_ROOT not in sys.path:
     sys.path.insert(0, SERVICE_ROOT)
 
 from fastapi.testclient import TestClient
+from src.infrastructure.serialization import FastJSONResponse
 from src.main import app
 
 client = TestClient(app)
@@ -16,3 +17,8 @@ def test_health():
     resp = client.get("/health")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+def test_responses_use_fast_serializer():
+    assert app.router.default_response_class is FastJSONResponse
+    assert client.get("/health").content == b'{"status":"ok"}'
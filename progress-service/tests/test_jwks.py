@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwk, jwt
+
+from src.config import settings
+from src.infrastructure import jwks
+from src.infrastructure.jwks import JwksClient
+from src.infrastructure.token_cache import token_cache
+from src.interfaces.http import authz
+
+
+def make_key(kid: str) -> tuple[str, dict]:
+    private = ec.generate_private_key(ec.SECP256R1())
+    pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption()).decode()
+    return pem, {**jwk.construct(pem, "ES256").public_key().to_dict(), "kid": kid, "use": "sig"}
+
+
+def test_progress_verifies_tokens_with_rotating_jwks(monkeypatch):
+    old, new = make_key("old"), make_key("new")
+    published = {"keys": [old[1]]}
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json=published)
+
+    monkeypatch.setattr(settings, "JWT_JWKS_URL", "http://auth/.well-known/jwks.json")
+    monkeypatch.setattr(jwks, "jwks_client", JwksClient(settings.JWT_JWKS_URL, min_refresh_interval=0,
+                                                        transport=httpx.MockTransport(handler)))
+    token_cache.clear()
+
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(email: str = Depends(authz.get_user_email)):
+        return {"email": email}
+
+    client = TestClient(app)
+
+    def whoami_with(key, sub: str):
+        token = jwt.encode({"sub": sub, "exp": int(time.time() + 60)}, key[0], algorithm="ES256",
+                           headers={"kid": key[1]["kid"]})
+        return client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+
+    assert whoami_with(old, "a@example.com").json() == {"email": "a@example.com"}
+    published["keys"] = [new[1], old[1]]
+    assert whoami_with(new, "b@example.com").json() == {"email": "b@example.com"}
+    assert whoami_with(old, "c@example.com").status_code == 200
+    assert requests == ["/.well-known/jwks.json"] * 2
+    token_cache.clear()
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(__file__)
+SERVICE_ROOT = os.path.dirname(CURRENT_DIR)
+if SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, SERVICE_ROOT)
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from src.config import settings
+from src.infrastructure.token_cache import token_cache
+from src.interfaces.http import authz
+
+
+def test_token_is_verified_once_per_lifetime(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_JWKS_URL", "")
+    token_cache.clear()
+    calls = []
+    real_decode = authz.jwt.decode
+    monkeypatch.setattr(authz.jwt, "decode", lambda *a, **k: calls.append(1) or real_decode(*a, **k))
+
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(email: str = Depends(authz.get_user_email)):
+        return {"email": email}
+
+    client = TestClient(app)
+    token = jwt.encode({"sub": "user@example.com", "exp": int(time.time() + 60)},
+                       settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    for _ in range(3):
+        response = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+        assert response.json() == {"email": "user@example.com"}
+    assert len(calls) == 1
+    assert client.get("/whoami", headers={"Authorization": "Bearer broken"}).status_code == 401
+    token_cache.clear()